@@ -0,0 +1,642 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = []
+# ///
+"""
+PreToolUse guard engine for Bash commands.
+
+One process evaluates every mr-sparkle Bash rule set from a single rule table,
+parsing the hook JSON once. It replaces three separate hooks that together
+forked ~30 processes (jq, python3 -c, echo | grep) per command:
+
+    direct      - direct tool invocations that should go through /mr-sparkle:lint
+                  (was block_direct_invocations.sh)
+    permission  - patterns that always trigger a permission prompt
+                  (was block_unneeded_permission_triggers.sh)
+    dangerous   - dangerous subcommands that should never run unattended
+                  (was block_dangerous_commands.sh)
+
+The .sh hooks remain as thin wrappers that run a single rule set.
+
+Rules are declared as data (FeatureSpec, CommandSpec) and compiled into a
+RuleMatcher: one combined regex finds every rule trigger in a single scan,
+and only rules whose triggers occurred are confirmed. Confirmation runs
+against shell_parse's structure of the command - parsed once and shared by
+every rule - so a rule fires on the command `sudo ls`, not on the word
+"sudo" inside a quoted commit message.
+
+Usage:
+    bash_guard.py                     # Read hook JSON from stdin, check all rule sets
+    bash_guard.py --rules dangerous   # Only check the named rule set(s)
+    bash_guard.py --explain           # Also print the fired rule and matched text to stdout
+
+Exit codes:
+    0: Allow
+    2: Block (reason printed to stderr)
+"""
+
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import shell_parse
+
+RULE_SETS = ("direct", "permission", "dangerous")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A guard rule: blocks the command with message when match finds evidence.
+
+    triggers are literal words or fragments, at least one of which must appear
+    in any command the rule blocks. The engine scans for all rules' triggers
+    in a single pass and only evaluates rules whose triggers occurred.
+    A rule with no triggers is always evaluated.
+    """
+
+    name: str
+    rule_set: str
+    triggers: tuple[str, ...]
+    match: Callable[[str], Optional[str]]
+    message: str
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Declarative rule: fires when the parsed command contains a shell construct.
+
+    find returns the occurrences of the construct in a shell_parse.Script;
+    the first one is the evidence.
+    """
+
+    name: str
+    triggers: tuple[str, ...]
+    find: Callable[[shell_parse.Script], Sequence[str]]
+    message: str
+
+    def match(self, command: str) -> Optional[str]:
+        found = self.find(shell_parse.parse(command))
+        return found[0] if found else None
+
+    def compile(self, rule_set: str) -> Rule:
+        return Rule(self.name, rule_set, self.triggers, self.match, self.message)
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """Declarative rule: fires on a simple command named one of commands whose
+    arguments satisfy check. With piped_into, the command must also feed a
+    later command of the same pipeline named one of those.
+
+    Commands anywhere count - after ;, &&, |, inside subshells and
+    substitutions - but words inside quotes are only ever arguments.
+    """
+
+    name: str
+    triggers: tuple[str, ...]
+    commands: tuple[str, ...]
+    message: str
+    check: Callable[[tuple[str, ...]], bool] = lambda args: True
+    piped_into: tuple[str, ...] = ()
+
+    def match(self, command: str) -> Optional[str]:
+        """Source text of the first offending command, or None if the rule doesn't fire."""
+        script = shell_parse.parse(command)
+        if not self.piped_into:
+            for cmd in script.commands:
+                if cmd.name in self.commands and self.check(cmd.args):
+                    return cmd.text
+            return None
+        for pipeline in script.pipelines:
+            for index, cmd in enumerate(pipeline):
+                if cmd.name in self.commands and self.check(cmd.args):
+                    if any(later.name in self.piped_into for later in pipeline[index + 1 :]):
+                        return cmd.text
+        return None
+
+    def compile(self, rule_set: str) -> Rule:
+        return Rule(self.name, rule_set, self.triggers, self.match, self.message)
+
+
+# =============================================================================
+# Argument Checks
+# =============================================================================
+
+def _checkout_discards(args: tuple[str, ...]) -> bool:
+    """git checkout . / git checkout -- . (or *) - pathspecs that reset the tree."""
+    subcommand, rest = shell_parse.git_subcommand(args)
+    if subcommand != "checkout" or not rest:
+        return False
+    if rest[0].startswith("."):
+        return True
+    if "--" in rest:
+        pathspecs = rest[rest.index("--") + 1 :]
+        return bool(pathspecs) and pathspecs[0].startswith((".", "*"))
+    return False
+
+
+def _stash_discards(args: tuple[str, ...]) -> bool:
+    subcommand, rest = shell_parse.git_subcommand(args)
+    return subcommand == "stash" and bool(rest) and rest[0] in ("drop", "clear")
+
+
+_WRITE_METHODS = ("DELETE", "PATCH", "POST", "PUT")
+# Options that add request parameters; gh api then defaults to POST
+_GH_FIELD_OPTIONS = ("-f", "-F", "--field", "--raw-field", "--input")
+
+
+# gh api options that take the next word as their value
+_GH_VALUE_OPTIONS = _GH_FIELD_OPTIONS + (
+    "-X", "--method", "-H", "--header", "-q", "--jq", "-t", "--template", "-p", "--preview", "--hostname", "--cache",
+)
+_GRAPHQL_MUTATION = re.compile(r"\bmutation\b")
+
+
+def _gh_api_endpoint(args: tuple[str, ...]) -> str:
+    """The endpoint argument of `gh api ...` (args[0] is "api")."""
+    index = 1
+    while index < len(args):
+        if args[index] in _GH_VALUE_OPTIONS:
+            index += 2
+        elif args[index].startswith("-"):
+            index += 1
+        else:
+            return args[index]
+    return ""
+
+
+def _gh_api_fields(args: tuple[str, ...]) -> list[tuple[str, str]]:
+    """(option, value) for each request parameter option, e.g. ("-F", "query=@q.graphql")."""
+    fields = []
+    for index, arg in enumerate(args):
+        name, eq, value = arg.partition("=")
+        if name in _GH_FIELD_OPTIONS and name.startswith("--") and eq:
+            fields.append((name, value))
+        elif arg in _GH_FIELD_OPTIONS:
+            fields.append((arg, args[index + 1] if index + 1 < len(args) else ""))
+        elif arg[:2] in ("-f", "-F"):
+            fields.append((arg[:2], arg[2:]))
+    return fields
+
+
+def _read_request_file(path: str) -> Optional[str]:
+    """Contents of a file gh would read into the request, or None (stdin, unreadable)."""
+    if path in ("", "-"):
+        return None
+    try:
+        return Path(path).expanduser().read_text(errors="replace")
+    except OSError:
+        return None
+
+
+def _graphql_mutates(fields: list[tuple[str, str]]) -> bool:
+    """gh api graphql always POSTs; only a mutation writes. A query gh reads
+    from stdin or a file that can't be read here counts as a mutation."""
+    for option, value in fields:
+        if option == "--input":
+            text = _read_request_file(value)
+        else:
+            key, _, text = value.partition("=")
+            if key != "query":
+                continue
+            if option in ("-F", "--field") and text.startswith("@"):
+                text = _read_request_file(text[1:])
+        if text is None or _GRAPHQL_MUTATION.search(text):
+            return True
+    return False
+
+
+def _gh_api_writes(args: tuple[str, ...]) -> bool:
+    if not args or args[0] != "api":
+        return False
+    fields = _gh_api_fields(args)
+    if _gh_api_endpoint(args) == "graphql":
+        return _graphql_mutates(fields)
+    methods = []
+    for index, arg in enumerate(args):
+        if arg in ("-X", "--method"):
+            methods.append(args[index + 1] if index + 1 < len(args) else "")
+        elif arg.startswith("--method="):
+            methods.append(arg.split("=", 1)[1])
+        elif arg.startswith("-X"):
+            methods.append(arg[2:])
+    if not methods:
+        return bool(fields)
+    return any(method.upper() in _WRITE_METHODS for method in methods)
+
+
+# Exact targets that are broad, plus the home directory and everything under
+# it ($HOME must end the word or be followed by "/", so $HOMEBREW_PREFIX isn't)
+_BROAD_TARGETS = ("/", "/*", "~", ".", "./", "*")
+_BROAD_PREFIX = re.compile(r"(?:~|\$HOME|\$\{HOME\})(?:/|$)")
+
+
+def _rm_recursive_broad(args: tuple[str, ...]) -> bool:
+    options, targets = [], []
+    for index, arg in enumerate(args):
+        if arg == "--":
+            targets.extend(args[index + 1 :])
+            break
+        (options if arg.startswith("-") and arg != "-" else targets).append(arg)
+    recursive = any(
+        opt == "--recursive" or (not opt.startswith("--") and ("r" in opt or "R" in opt)) for opt in options
+    )
+    return recursive and any(t in _BROAD_TARGETS or _BROAD_PREFIX.match(t) for t in targets)
+
+
+_XARGS_SAFE_COMMANDS = frozenset(
+    "echo grep cat head tail wc file stat ls basename dirname realpath readlink md5 shasum sha256sum".split()
+)
+# xargs options that take a separate value
+_XARGS_VALUE_OPTIONS = ("-I", "-L", "-n", "-P", "-s", "-d", "-E", "-a")
+
+
+def _xargs_unsafe(args: tuple[str, ...]) -> bool:
+    """xargs running anything but a read-only command (bare xargs runs echo)."""
+    index = 0
+    while index < len(args) and args[index].startswith("-"):
+        if args[index] == "--":
+            index += 1
+            break
+        index += 2 if args[index] in _XARGS_VALUE_OPTIONS else 1
+    if index >= len(args):
+        return False
+    return Path(args[index]).name not in _XARGS_SAFE_COMMANDS
+
+
+# =============================================================================
+# Rule Table
+# =============================================================================
+
+# Constructs that ALWAYS trigger a permission prompt. See the header of
+# block_unneeded_permission_triggers.sh for how each was verified.
+# KEEP IN SYNC: bash_guidance.sh (SessionStart) proactively tells Claude about these.
+PERMISSION_SPECS = [
+    FeatureSpec(
+        "command-substitution",
+        ("$(",),
+        lambda script: [sub.text for sub in script.substitutions if sub.kind in ("$(", "$((")],
+        "Command contains $() substitution, which always triggers a permission prompt (cannot be statically analyzed). Rewrite using pipes, temporary variables, or separate commands instead.",
+    ),
+    FeatureSpec(
+        "backtick-substitution",
+        ("`",),
+        lambda script: [sub.text for sub in script.substitutions if sub.kind == "`"],
+        "Command contains backtick substitution, which always triggers a permission prompt (cannot be statically analyzed). Rewrite using pipes, temporary variables, or separate commands instead.",
+    ),
+    FeatureSpec(
+        "braced-expansion",
+        ("${",),
+        lambda script: script.expansions,
+        'Command contains ${...} braced parameter expansion, which always triggers a permission prompt ("Contains expansion" — only offers Allow-once, cannot be allowlisted). Use bare $VAR instead ($HOME, not ${HOME}). If braces are unavoidable (${VAR:-default}, ${VAR/a/b}, ${VAR}suffix), assign to a plain variable on a separate line or restructure the command.',
+    ),
+    FeatureSpec(
+        "shell-loop",
+        ("for", "while", "until"),
+        # Loop keyword at command position - not the word "for" inside an argument
+        lambda script: [kw for kw in script.keywords if kw in ("for", "while", "until")],
+        "Command uses a for/while/until loop, which always triggers a permission prompt (the loop body cannot be statically analyzed). Use the Grep/Glob/Read tools or run separate commands instead of a shell loop.",
+    ),
+]
+
+# Dangerous subcommands - a global safety net even when a project allows a
+# broad command like "rm:*" or "find:*". Each rule names the base command,
+# checks its arguments for the dangerous flag/subcommand, and says what to do
+# instead. Triggers are the rarest word every match must contain.
+DANGEROUS_SPECS = [
+    FeatureSpec(
+        "too-deep",
+        ("(", "`", "-c", "eval", "ssh", "watch", "doas"),
+        # The parser stopped, so nothing past this point was checked - fail closed
+        lambda script: ["nesting"] if script.too_deep else [],
+        f"Command nests subshells or substitutions more than {shell_parse.MAX_DEPTH} levels deep, so it cannot be checked. Split it into simpler commands.",
+    ),
+    CommandSpec(
+        "sudo",
+        ("sudo", "doas"),
+        ("sudo", "doas"),
+        "sudo is not allowed, nor is doas. Ask the user to run privileged commands manually.",
+    ),
+    CommandSpec(
+        "find-delete-exec",
+        ("find",),
+        ("find",),
+        "find with -delete, -exec, or -execdir is not allowed. Use find for searching and rm for targeted removal.",
+        check=lambda args: any(arg in ("-delete", "-exec", "-execdir", "-ok", "-okdir") for arg in args),
+    ),
+    CommandSpec(
+        "xargs-unsafe",
+        ("xargs",),
+        ("xargs",),
+        "xargs is only allowed with safe read-only commands (echo, grep, cat, head, tail, wc, file, stat, ls, basename, dirname, realpath). Use explicit, targeted commands instead.",
+        check=_xargs_unsafe,
+    ),
+    CommandSpec(
+        "git-checkout-discard",
+        ("checkout",),
+        ("git",),
+        "git checkout that discards working tree changes is not allowed. Use git stash or ask the user.",
+        check=_checkout_discards,
+    ),
+    CommandSpec(
+        "gh-api-write",
+        ("api",),
+        ("gh",),
+        "gh api with write methods (POST/PATCH/PUT/DELETE, including the POST that -f/-F/--input imply) is not allowed. Use gh api for reading only, or use specific gh subcommands.",
+        check=_gh_api_writes,
+    ),
+    CommandSpec(
+        "rm-recursive-broad",
+        ("rm",),
+        ("rm",),
+        "rm -r on broad paths (/, ~, ., $HOME) is not allowed. Be specific about what you are deleting.",
+        check=_rm_recursive_broad,
+    ),
+    CommandSpec(
+        "dd",
+        ("dd",),
+        ("dd",),
+        "dd is not allowed. Use cp or standard file tools instead.",
+    ),
+    CommandSpec(
+        "curl-pipe-shell",
+        ("curl", "wget"),
+        ("curl", "wget"),
+        "Piping downloads to shell is not allowed. Download the script first, then ask the user to review and run it.",
+        piped_into=("sh", "bash", "zsh"),
+    ),
+    CommandSpec(
+        "git-stash-drop",
+        ("stash",),
+        ("git",),
+        "git stash drop/clear is not allowed. Stashed work should be preserved. Ask the user to clean up stashes manually.",
+        check=_stash_discards,
+    ),
+]
+
+PERMISSION_RULES = [spec.compile("permission") for spec in PERMISSION_SPECS]
+DANGEROUS_RULES = [spec.compile("dangerous") for spec in DANGEROUS_SPECS]
+
+
+# =============================================================================
+# Direct Invocation Rules
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class DirectSpec:
+    """A block_direct rule: running prefix (one or more command words) with
+    arguments is blocked unless one of them is the unless flag.
+
+    unless matches a whole argument, either the flag alone or as "flag=value"
+    ("--config" and "--config=x.js", not "--config-dir" or a quoted string
+    that mentions it). message is shown verbatim.
+    """
+
+    prefix: tuple[str, ...]
+    unless: str
+    message: str
+
+    @property
+    def name(self) -> str:
+        return "direct:" + " ".join(self.prefix)
+
+
+class _TrieNode:
+    __slots__ = ("children", "specs")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.specs: list[DirectSpec] = []
+
+
+class DirectRuleTrie:
+    """block_direct rules compiled into a prefix trie over command words.
+
+    Each simple command in the parsed command walks the trie once, word by
+    word, so checking a command costs the same for one rule or fifty. The
+    result is cached per command and shared by the per-rule Rule objects,
+    which exist so each rule keeps its own name and message.
+    """
+
+    def __init__(self, specs: list[DirectSpec]):
+        self.specs = specs
+        self._root = _TrieNode()
+        self._cache: dict[str, dict[DirectSpec, str]] = {}
+        for spec in specs:
+            node = self._root
+            for word in spec.prefix:
+                node = node.children.setdefault(word, _TrieNode())
+            node.specs.append(spec)
+
+    def violations(self, command: str) -> dict[DirectSpec, str]:
+        """Rules the command violates, each with the offending command's text."""
+        if command in self._cache:
+            return self._cache[command]
+        found: dict[DirectSpec, str] = {}
+        for cmd in shell_parse.parse(command).commands:
+            words = (cmd.name, *cmd.args) if cmd.argv else ()
+            node = self._root
+            for depth, word in enumerate(words):
+                node = node.children.get(word)
+                if node is None:
+                    break
+                rest = words[depth + 1 :]
+                for spec in node.specs:
+                    # Bare invocations (no arguments) are allowed
+                    if not rest or spec in found:
+                        continue
+                    if spec.unless and any(arg == spec.unless or arg.startswith(spec.unless + "=") for arg in rest):
+                        continue
+                    found[spec] = cmd.text
+        self._cache[command] = found
+        return found
+
+    def rules(self) -> list[Rule]:
+        """One Rule per spec, in config order, all answered by a single trie walk."""
+
+        def rule(spec: DirectSpec) -> Rule:
+            return Rule(
+                spec.name,
+                "direct",
+                (spec.prefix[0],),
+                lambda command: self.violations(command).get(spec),
+                spec.message,
+            )
+
+        return [rule(spec) for spec in self.specs]
+
+
+# Tools that should go through mr-sparkle's lint skill for proper config resolution
+DEFAULT_DIRECT_SPECS = [
+    DirectSpec(("markdownlint-cli2",), "--config", "markdownlint-cli2 requires --config. Use /mr-sparkle:lint instead."),
+]
+# Appended to the prefix for rules that don't configure a message
+DEFAULT_DIRECT_MESSAGE = "should not be run directly. Use /mr-sparkle:lint instead."
+
+DEFAULT_DIRECT_RULES = DirectRuleTrie(DEFAULT_DIRECT_SPECS).rules()
+
+
+def parse_direct_specs(block_direct) -> list[DirectSpec]:
+    """Rules from the block_direct config value.
+
+    Entries are mappings with prefix (required), unless and message, or the
+    string "default" for the built-in rules. Malformed entries are skipped;
+    a value that isn't a list means the defaults.
+    """
+    if not isinstance(block_direct, list):
+        return DEFAULT_DIRECT_SPECS
+    specs: list[DirectSpec] = []
+    for item in block_direct:
+        if item == "default":
+            specs.extend(DEFAULT_DIRECT_SPECS)
+            continue
+        if not isinstance(item, dict) or not isinstance(item.get("prefix"), str):
+            continue
+        prefix = tuple(item["prefix"].split())
+        if not prefix:
+            continue
+        unless = item.get("unless") or ""
+        message = item.get("message") or f"{' '.join(prefix)} {DEFAULT_DIRECT_MESSAGE}"
+        specs.append(DirectSpec(prefix, str(unless), str(message)))
+    return specs
+
+
+def direct_rules(hook_input: dict) -> list[Rule]:
+    """Direct-invocation rules for this project (block_direct; [] disables them)."""
+    cwd = hook_input.get("cwd") or ""
+    if not cwd or not (Path(cwd) / ".claude").is_dir():
+        return DEFAULT_DIRECT_RULES
+
+    # Shared config loader lives with lint.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "skills" / "lint" / "scripts"))
+    import sparkle_config
+
+    try:
+        config = sparkle_config.load_strict(Path(cwd))
+    except Exception:
+        # Can't load the config (e.g. stale snapshot, no PyYAML) - honor the
+        # disable switch textually rather than ignoring it
+        config_file = sparkle_config.config_path(Path(cwd))
+        try:
+            text = config_file.read_text() if config_file else ""
+        except OSError:
+            text = ""
+        config = {"block_direct": []} if re.search(r"^\s*block_direct:\s*\[\s*\]", text, re.MULTILINE) else {}
+
+    if "block_direct" not in config:
+        return DEFAULT_DIRECT_RULES
+    return DirectRuleTrie(parse_direct_specs(config["block_direct"])).rules()
+
+
+# =============================================================================
+# Engine
+# =============================================================================
+
+
+def rules_for(hook_input: dict, rule_sets: tuple[str, ...] = RULE_SETS) -> list[Rule]:
+    """The rule table for a hook invocation, in evaluation order."""
+    rules: list[Rule] = []
+    for rule_set in RULE_SETS:
+        if rule_set not in rule_sets:
+            continue
+        if rule_set == "direct":
+            rules.extend(direct_rules(hook_input))
+        elif rule_set == "permission":
+            rules.extend(PERMISSION_RULES)
+        else:
+            rules.extend(DANGEROUS_RULES)
+    return rules
+
+
+def _trigger_pattern(trigger: str) -> str:
+    """Regex for a trigger: whole word for identifiers, literal fragment otherwise."""
+    escaped = re.escape(trigger)
+    if re.fullmatch(r"\w(?:[\w-]*\w)?", trigger):
+        return rf"\b{escaped}\b"
+    return escaped
+
+
+class RuleMatcher:
+    """Rules compiled into one combined trigger regex plus per-rule confirmation.
+
+    A single finditer over the command collects every trigger that occurs;
+    only rules owning one of those triggers are then confirmed, in table
+    order. Most commands contain no trigger at all, so adding rules doesn't
+    add per-rule scans over every command.
+    """
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+        self._by_trigger: dict[str, list[int]] = {}
+        self._always: list[int] = []
+        for index, rule in enumerate(rules):
+            if not rule.triggers:
+                self._always.append(index)
+            for trigger in rule.triggers:
+                self._by_trigger.setdefault(trigger, []).append(index)
+        # Longest first so a fragment never shadows a longer one at the same position
+        alternatives = sorted(self._by_trigger, key=len, reverse=True)
+        self._scan = re.compile("|".join(_trigger_pattern(t) for t in alternatives)) if alternatives else None
+
+    def candidates(self, command: str) -> list[int]:
+        """Indexes of rules whose triggers occur in command, in table order."""
+        found = set(self._always)
+        if self._scan:
+            for m in self._scan.finditer(command):
+                found.update(self._by_trigger[m.group()])
+        return sorted(found)
+
+    def first_match(self, command: str) -> Optional[tuple[Rule, str]]:
+        """The first rule the command violates and the text that fired it."""
+        for index in self.candidates(command):
+            rule = self.rules[index]
+            evidence = rule.match(command)
+            if evidence is not None:
+                return rule, evidence
+        return None
+
+
+def check_command(command: str, rules: list[Rule]) -> Optional[Rule]:
+    """Return the first rule the command violates, or None to allow."""
+    found = RuleMatcher(rules).first_match(command)
+    return found[0] if found else None
+
+
+def main():
+    """Hook entry point."""
+    args = sys.argv[1:]
+    explain = "--explain" in args
+    if explain:
+        args.remove("--explain")
+    rule_sets = RULE_SETS
+    if len(args) == 2 and args[0] == "--rules":
+        rule_sets = tuple(args[1].split(","))
+
+    try:
+        hook_input = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        sys.exit(0)
+    if not isinstance(hook_input, dict) or hook_input.get("tool_name") != "Bash":
+        sys.exit(0)
+
+    tool_input = hook_input.get("tool_input")
+    command = tool_input.get("command") if isinstance(tool_input, dict) else None
+    if not command or not isinstance(command, str):
+        sys.exit(0)
+
+    found = RuleMatcher(rules_for(hook_input, rule_sets)).first_match(command)
+    if found:
+        rule, evidence = found
+        if explain:
+            print(json.dumps({"rule": rule.name, "rule_set": rule.rule_set, "matched": evidence}))
+        print(rule.message, file=sys.stderr)
+        sys.exit(2)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 #!/usr/bin/env bash
 # SessionStart hook - Proactive guidance for Bash patterns that always trigger permission prompts
 #
-# Companion to block_unneeded_permission_triggers.sh (PreToolUse), which reactively blocks
+# Companion to the "permission" rules in bash_guard.py (PreToolUse), which reactively block
 # these patterns. This hook proactively tells Claude what to avoid so it doesn't waste a
 # tool call getting blocked.
 #
-# KEEP IN SYNC: If you add/remove a pattern in block_unneeded_permission_triggers.sh,
+# KEEP IN SYNC: If you add/remove a pattern in bash_guard.py's PERMISSION_RULES,
 # update the guidance here too.
 
 cat <<'GUIDANCE'
@@ -18,44 +18,12 @@
 # forms. They were removed because they only blocked harmless commands. Re-test with the
 # test-permission-hooks skill if any of this ever feels wrong again.
 #
+# Rules live in bash_guard.py (PERMISSION_RULES), which hooks.json runs once for all
+# Bash guards. This wrapper runs just this rule set. Rules match the parsed command
+# (shell_parse.py), so a `$(` inside single quotes or the word "for" inside a quoted
+# commit message is text, not a construct, and doesn't block.
+#
 # KEEP IN SYNC: bash_guidance.sh (SessionStart) proactively tells Claude about these
-# rules. If you add/remove a pattern here, update the guidance there too.
-
-command=$(jq -r '.tool_input.command // empty')
-[[ -z "$command" ]] && exit 0
-
-block() {
-    echo "$1" >&2
-    exit 2
-}
-
-# $() command substitution — "cannot be statically analyzed" → always prompts
-# e.g. gh run view 123 --log --job $(gh run view 123 --json jobs --jq '...')
-if [[ "$command" == *'$('* ]]; then
-    block 'Command contains $() substitution, which always triggers a permission prompt (cannot be statically analyzed). Rewrite using pipes, temporary variables, or separate commands instead.'
-fi
-
-# Backtick command substitution — same
-if [[ "$command" == *'`'* ]]; then
-    block 'Command contains backtick substitution, which always triggers a permission prompt (cannot be statically analyzed). Rewrite using pipes, temporary variables, or separate commands instead.'
-fi
-
-# ${...} braced parameter expansion — reports as "Contains expansion" and only offers Allow-once,
-# so it can't be allowlisted (verified 2026-06-20, apples-to-apples: `cat ${HOME}/x` prompts
-# "Contains expansion"; `cat $HOME/x` only prompts for the out-of-project read). Bare $var runs
-# clean — so match the braces, not the variable. e.g. cat "${HOME}/.config/foo"
-if [[ "$command" == *'${'* ]]; then
-    block 'Command contains ${...} braced parameter expansion, which always triggers a permission prompt ("Contains expansion" — only offers Allow-once, cannot be allowlisted). Use bare $VAR instead ($HOME, not ${HOME}). If braces are unavoidable (${VAR:-default}, ${VAR/a/b}, ${VAR}suffix), assign to a plain variable on a separate line or restructure the command.'
-fi
+# rules. If you add/remove a pattern in bash_guard.py, update the guidance there too.
 
-# for/while/until loops — the loop construct can't reduce to a static command prefix, so
-# Claude Code flags any $var in the body as "simple_expansion" and ALWAYS prompts (verified
-# 2026-06-15, TUI). Bare $var outside a loop is fine (`echo "$HOME"` runs clean) — so match the
-# loop, not the variable. Discriminator: a loop keyword at statement position (start, or after
-# ; & | ( ) AND a literal `; do` (one-liner loops always have one). This avoids false-positives
-# on prose like `git commit -m "refactor for loop; do it later"` (the `for` isn't at statement
-# position). e.g. for f in apps/*/; do grep pat "$f"; done
-loop_kw='(^|[;&|(])[[:space:]]*(for|while|until)[[:space:]]'
-if [[ "$command" =~ $loop_kw ]] && [[ "$command" =~ \;[[:space:]]*do[[:space:]] ]]; then
-    block 'Command uses a for/while/until loop, which always triggers a permission prompt (the loop body cannot be statically analyzed). Use the Grep/Glob/Read tools or run separate commands instead of a shell loop.'
-fi
+exec python3 "$(dirname "$0")/bash_guard.py" --rules permission
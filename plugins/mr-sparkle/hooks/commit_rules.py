@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Commit-message rule engine for validate_commit_message.py.
+
+Rules are data - the defaults below use the same schema projects use in
+.claude/mr-sparkle.config.yml:
+
+    validate_commit_message:
+      rules:
+        - default                    # the built-in rules below
+        - name: ticket
+          type: regex                # regex | prefix | case | length
+          pattern: '^[A-Z]+-\\d+ '
+          require: true              # fire when the pattern is absent
+          message: must start with a ticket id
+
+Rule types:
+    regex   pattern (searched), ignore_case
+    prefix  values - the first word, minus a trailing ":", is one of them
+    case    first: lower|upper - required case of the first letter
+    length  max and/or min character count
+
+Every rule has a scope - "subject" (first line, the default) or "message" -
+and a message, where {match} and {length} are filled in. regex, prefix and
+case rules take require: true to fire when they don't match.
+
+A rule set compiles once per process (cached by its config) into one union
+regex per scope: each rule is a lookahead alternative, so a single finditer
+over the text reports every position where any rule matches. Rules shadowed
+by an earlier alternative are rechecked only at those positions.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+SCOPES = ("subject", "message")
+
+DEFAULT_RULES = [
+    {
+        "name": "emoji",
+        "type": "regex",
+        "scope": "message",
+        "pattern": "[\U0001f600-\U0001f64f\U0001f300-\U0001f5ff\U0001f680-\U0001f6ff\U0001f1e0-\U0001f1ff\U00002702-\U000027b0\U000024c2-\U0001f251]+",
+        "message": "contains emojis (user prefers none)",
+    },
+    {
+        "name": "attribution",
+        "type": "regex",
+        "scope": "message",
+        "pattern": r"Generated with.*Claude|Co-Authored-By:|🤖.*Claude Code",
+        "ignore_case": True,
+        "message": "contains attribution text (user prefers none)",
+    },
+    {
+        "name": "trailing-period",
+        "type": "regex",
+        "pattern": r"\.$",
+        "message": "ends with period (user prefers no period)",
+    },
+    {
+        "name": "capitalized-type",
+        "type": "prefix",
+        "values": ["Add", "Fix", "Update", "Remove", "Refactor", "Improve", "Prevent"],
+        "message": "starts with capitalized type '{match}' (user prefers lowercase)",
+    },
+    {
+        "name": "vague",
+        "type": "regex",
+        "pattern": r"^(?:(?:fix|update|change|modify)s?|bug\s*fix|(?:minor|small)\s+(?:change|fix|update)s?)$",
+        "ignore_case": True,
+        "message": "too vague (user prefers specific descriptions)",
+    },
+    {
+        "name": "length",
+        "type": "length",
+        "max": 200,
+        "message": "length {length} chars (user prefers max ~200)",
+    },
+]
+
+# Backreferences depend on group numbering, which the union regex shifts
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+@dataclass(frozen=True)
+class CommitRule:
+    """A compiled rule. pattern is None for length rules."""
+
+    index: int
+    name: str
+    scope: str
+    message: str
+    pattern: Optional[re.Pattern] = None
+    require: bool = False
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+
+    def describe(self, text: str, match: str) -> str:
+        return self.message.replace("{match}", match).replace("{length}", str(len(text)))
+
+
+def _pattern_for(spec: dict) -> Optional[str]:
+    """Regex source for a regex/prefix/case rule, or None if malformed."""
+    kind = spec.get("type")
+    if kind == "regex":
+        pattern = spec.get("pattern")
+        return pattern if isinstance(pattern, str) and pattern else None
+    if kind == "prefix":
+        values = spec.get("values")
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, list) or not values:
+            return None
+        alternatives = "|".join(re.escape(str(v)) for v in values)
+        return rf"^(?:{alternatives}):?(?=\s|$)"
+    if kind == "case":
+        first = spec.get("first")
+        # Fire on a first letter of the other case
+        return {"lower": r"^[A-Z]", "upper": r"^[a-z]"}.get(first)
+    return None
+
+
+def _compile_rule(index: int, spec) -> Optional[CommitRule]:
+    if not isinstance(spec, dict):
+        return None
+    scope = spec.get("scope", "subject")
+    if scope not in SCOPES:
+        return None
+    name = str(spec.get("name") or spec.get("type"))
+    message = str(spec.get("message") or f"violates {name}")
+
+    if spec.get("type") == "length":
+        low, high = spec.get("min"), spec.get("max")
+        if not isinstance(low, int) and not isinstance(high, int):
+            return None
+        return CommitRule(
+            index,
+            name,
+            scope,
+            message,
+            min_length=low if isinstance(low, int) else None,
+            max_length=high if isinstance(high, int) else None,
+        )
+
+    source = _pattern_for(spec)
+    if source is None:
+        return None
+    if spec.get("ignore_case"):
+        source = f"(?i:{source})"
+    try:
+        pattern = re.compile(source)
+    except re.error:
+        return None
+    return CommitRule(index, name, scope, message, pattern=pattern, require=bool(spec.get("require")))
+
+
+def expand_defaults(specs: list) -> list:
+    """Replace "default" entries with DEFAULT_RULES."""
+    expanded = []
+    for spec in specs:
+        if spec == "default":
+            expanded.extend(DEFAULT_RULES)
+        else:
+            expanded.append(spec)
+    return expanded
+
+
+class RuleSet:
+    """Compiled commit-message rules. check() evaluates them all."""
+
+    def __init__(self, specs: list):
+        compiled = (_compile_rule(i, spec) for i, spec in enumerate(expand_defaults(specs)))
+        self.rules = [rule for rule in compiled if rule is not None]
+        self._scans = {scope: self._build_scan(scope) for scope in SCOPES}
+        self._regex_scopes = {r.scope for r in self.rules if r.pattern is not None}
+
+    def _build_scan(self, scope: str) -> tuple[Optional[re.Pattern], list[CommitRule], list[CommitRule]]:
+        """(union regex, rules in it, rules searched on their own) for a scope."""
+        regex_rules = [r for r in self.rules if r.scope == scope and r.pattern is not None]
+        united, alone = [], []
+        for rule in regex_rules:
+            if _BACKREFERENCE.search(rule.pattern.pattern):
+                alone.append(rule)
+                continue
+            try:
+                re.compile(f"(?=(?P<_rule{rule.index}>{rule.pattern.pattern}))")
+            except re.error:
+                alone.append(rule)
+                continue
+            united.append(rule)
+        if not united:
+            return None, [], alone
+        try:
+            union = re.compile("|".join(f"(?=(?P<_rule{r.index}>{r.pattern.pattern}))" for r in united))
+        except re.error:
+            # e.g. two rules define the same named group
+            return None, [], alone + united
+        return union, united, alone
+
+    def _matches(self, scope: str, text: str) -> dict[int, str]:
+        """Matched text of every regex rule in scope that matches text, by index."""
+        union, united, alone = self._scans[scope]
+        found: dict[int, str] = {}
+        if union is not None:
+            for m in union.finditer(text):
+                for key, value in m.groupdict().items():
+                    if value is not None and key.startswith("_rule"):
+                        found.setdefault(int(key[5:]), value)
+                # Alternatives after the one that matched didn't get a chance here
+                for rule in united:
+                    if rule.index not in found:
+                        hit = rule.pattern.match(text, m.start())
+                        if hit:
+                            found[rule.index] = hit.group()
+                if len(found) == len(united):
+                    break
+        for rule in alone:
+            hit = rule.pattern.search(text)
+            if hit:
+                found[rule.index] = hit.group()
+        return found
+
+    def check(self, message: str) -> list[str]:
+        """Violation descriptions for message, in rule order."""
+        message = message.strip()
+        texts = {"subject": message.split("\n", 1)[0].strip(), "message": message}
+        matches = {scope: self._matches(scope, texts[scope]) for scope in self._regex_scopes}
+        violations = []
+        for rule in self.rules:
+            text = texts[rule.scope]
+            if rule.pattern is None:
+                too_long = rule.max_length is not None and len(text) > rule.max_length
+                too_short = rule.min_length is not None and len(text) < rule.min_length
+                if too_long or too_short:
+                    violations.append(rule.describe(text, ""))
+                continue
+            hit = matches.get(rule.scope, {}).get(rule.index)
+            if (hit is None) == rule.require:
+                violations.append(rule.describe(text, hit or ""))
+        return violations
+
+
+@lru_cache(maxsize=16)
+def _compiled(key: str) -> RuleSet:
+    return RuleSet(json.loads(key))
+
+
+def rule_set(specs: Optional[list] = None) -> RuleSet:
+    """The compiled rule set for specs (default rules when None), cached."""
+    specs = ["default"] if specs is None else specs
+    try:
+        key = json.dumps(specs, sort_keys=True)
+    except (TypeError, ValueError):
+        # YAML values JSON can't hold (dates, sets, mixed-type keys): compile uncached
+        return RuleSet(specs)
+    return _compiled(key)
+
+
+def rules_from_config(setting) -> Optional[list]:
+    """Rule specs from the validate_commit_message config value; None = disabled.
+
+    false disables; true or a missing key means the default rules; a mapping
+    may set enabled and rules.
+    """
+    if setting is False:
+        return None
+    if isinstance(setting, dict):
+        if setting.get("enabled", True) is False:
+            return None
+        rules = setting.get("rules")
+        if isinstance(rules, list):
+            return rules
+    return ["default"]
@@ -1,43 +1,52 @@
 #!/usr/bin/env -S uv run --quiet --script
 # /// script
-# dependencies = []
+# dependencies = ["pyyaml"]
 # ///
 """
 PostToolUse linting hook for Claude Code.
 
-Thin wrapper that delegates to skills/lint/scripts/lint.py --stdin-hook.
+Thin wrapper over skills/lint/scripts/lint.py. Imports it in-process rather
+than spawning a second interpreter, so a hook call costs one Python startup
+(see run_python.sh for how that startup is kept cheap).
 Respects per-project config from .claude/mr-sparkle.config.yml.
 """
 
-import subprocess
+import json
 import sys
+import traceback
 from pathlib import Path
 
 
 def main():
-    """Delegate to lint.py --stdin-hook."""
+    """Delegate to lint.py's hook handler."""
     # Locate lint.py relative to this hook
     hook_dir = Path(__file__).resolve().parent
-    lint_script = hook_dir.parent / "skills" / "lint" / "scripts" / "lint.py"
+    lint_dir = hook_dir.parent / "skills" / "lint" / "scripts"
 
-    if not lint_script.is_file():
+    if not (lint_dir / "lint.py").is_file():
         sys.exit(0)
 
-    # Read stdin and pass through to lint.py
-    # Config checking (disabled, output visibility) is now handled by lint.py
+    try:
+        hook_input = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        sys.exit(0)
+
+    # Config checking (disabled, output visibility) is handled by lint.py
     # via .claude/mr-sparkle.config.yml
-    stdin_data = sys.stdin.read()
-
-    result = subprocess.run(
-        ["uv", "run", "--quiet", "--script", str(lint_script), "--stdin-hook"],
-        input=stdin_data,
-        capture_output=True,
-        text=True,
-    )
-
-    # Print any output from lint.py
-    if result.stdout:
-        print(result.stdout, end="", flush=True)
+    try:
+        sys.path.insert(0, str(lint_dir))
+        import lint
+
+        output = lint.handle_hook_input(hook_input)
+    except Exception:
+        # Never block the edit, but don't hide a lint.py bug either: the
+        # traceback goes to stderr, where the hook log shows it
+        print("mr-sparkle lint_on_write: lint.py failed", file=sys.stderr)
+        traceback.print_exc()
+        output = ""
+
+    if output:
+        print(output, flush=True)
 
     # Hooks should not block - always exit 0
     sys.exit(0)
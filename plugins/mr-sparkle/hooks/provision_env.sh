@@ -0,0 +1,75 @@
+#!/usr/bin/env bash
+# SessionStart hook - provisions the pinned Python environment run_python.sh execs.
+#
+# Every Python hook used to start via `uv run --quiet --script`, which re-checks
+# inline script metadata and the cached environment on each call. Instead, this
+# builds one venv per dependency set, once, and points $MR_SPARKLE_DATA/python at
+# its interpreter. run_python.sh execs that interpreter directly on the hot path.
+#
+# Provisioning runs in the background so it never delays session start; until it
+# finishes, run_python.sh falls back to `uv run`. Always exits 0.
+#
+# Each session start touches its env's .ready marker. Envs from other dependency
+# sets are pruned only once no session has started on them for PRUNE_DAYS, since
+# a concurrent session (another plugin version or python3) may still be running
+# one.
+#
+# KEEP IN SYNC: DEPENDENCIES must cover the inline `dependencies` of every hook
+# and script run_python.sh launches (lint_on_write.py, validate_commit_message.py).
+
+DEPENDENCIES="pyyaml"
+PRUNE_DAYS=7
+
+data_dir="${CLAUDE_PLUGIN_DATA:-${XDG_CACHE_HOME:-$HOME/.cache}/mr-sparkle}"
+command -v uv >/dev/null 2>&1 || exit 0
+command -v python3 >/dev/null 2>&1 || exit 0
+
+# One env per (dependency set, python version)
+py_version=$(python3 -c 'import sys; print("%d.%d" % sys.version_info[:2])' 2>/dev/null) || exit 0
+stamp=$(printf '%s\n%s\n' "$DEPENDENCIES" "$py_version" | cksum | cut -d' ' -f1)
+env_dir="$data_dir/env-$stamp"
+
+# Already provisioned and pinned
+if [ -f "$env_dir/.ready" ] && [ "$(readlink "$data_dir/python" 2>/dev/null)" = "$env_dir/bin/python" ]; then
+    touch "$env_dir/.ready" 2>/dev/null
+    exit 0
+fi
+
+mkdir -p "$data_dir/pycache" 2>/dev/null || exit 0
+
+provision() {
+    # mkdir is atomic - only one session provisions at a time. Clear locks
+    # left behind by a provision that was killed mid-way.
+    find "$data_dir" -maxdepth 1 -name provision.lock -mmin +10 -exec rmdir {} \; 2>/dev/null
+    mkdir "$data_dir/provision.lock" 2>/dev/null || return 0
+    trap 'rmdir "$data_dir/provision.lock"' EXIT
+
+    if [ ! -f "$env_dir/.ready" ]; then
+        rm -rf "$env_dir"
+        # shellcheck disable=SC2086
+        uv venv --quiet --python "$py_version" "$env_dir" &&
+            uv pip install --quiet --python "$env_dir/bin/python" $DEPENDENCIES &&
+            touch "$env_dir/.ready" || {
+            rm -rf "$env_dir"
+            return 0
+        }
+    fi
+
+    # Pin the new env, then drop other envs no session has used lately
+    touch "$env_dir/.ready"
+    ln -sfn "$env_dir/bin/python" "$data_dir/python"
+    for env in "$data_dir"/env-*/; do
+        env="${env%/}"
+        [ "$env" = "$env_dir" ] && continue
+        # An env without .ready is a provision that was killed; age it by the directory
+        marker="$env/.ready"
+        [ -f "$marker" ] || marker="$env"
+        if [ -n "$(find "$marker" -maxdepth 0 -mtime +"$PRUNE_DAYS" 2>/dev/null)" ]; then
+            rm -rf "$env"
+        fi
+    done
+}
+
+provision </dev/null >/dev/null 2>&1 &
+disown 2>/dev/null
+exit 0
@@ -0,0 +1,28 @@
+#!/usr/bin/env bash
+# Fast launcher for mr-sparkle's Python hooks: run_python.sh <script> [args...]
+#
+# Execs the interpreter pinned by provision_env.sh (SessionStart) directly, so
+# the hot path costs a bare interpreter start instead of `uv run` resolving
+# inline metadata and its cached environment on every call. Bytecode goes to a
+# writable PYTHONPYCACHEPREFIX, since the plugin directory may be read-only and
+# imported modules would otherwise be recompiled each time.
+#
+# Fallbacks, in order: pinned interpreter -> `uv run --script` -> python3.
+
+script="$1"
+shift
+
+data_dir="${CLAUDE_PLUGIN_DATA:-${XDG_CACHE_HOME:-$HOME/.cache}/mr-sparkle}"
+python="$data_dir/python"
+
+if [ -d "$data_dir/pycache" ] && [ -w "$data_dir/pycache" ]; then
+    export PYTHONPYCACHEPREFIX="$data_dir/pycache"
+fi
+
+if [ -x "$python" ]; then
+    exec "$python" "$script" "$@"
+fi
+if command -v uv >/dev/null 2>&1; then
+    exec uv run --quiet --script "$script" "$@"
+fi
+exec python3 "$script" "$@"
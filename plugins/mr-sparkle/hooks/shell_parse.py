@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Shell command parser shared by the Bash guards and validate_commit_message.py.
+
+Turns a Bash tool command into the structure the guard rules reason about:
+simple commands (argv after quote removal), the pipelines they form, and the
+constructs Claude Code's permission analysis reacts to ($() and backtick
+substitutions, ${...} expansions, loop keywords). Rules then match where a
+construct actually is instead of rescanning the raw string, so quoted prose
+like `git commit -m "refactor for loop; do it later"` is just an argument.
+
+Covers what shows up in Bash tool commands: `|`, `&&`/`||`/`;`/`&` lists,
+newlines, single/double/ANSI-C quoting, backslash escapes, comments,
+redirections, heredocs, subshells, `{ }` groups, compound keywords, and
+nested $(...)/backtick/<(...) substitutions, including those inside
+$((...)) arithmetic. Commands inside substitutions and subshells are
+flattened into Script.commands, since they run too - as are the scripts
+other commands run from their arguments: `bash -c '...'`, `eval ...`,
+`ssh host '...'`, `watch '...'` and `doas ...`.
+
+Not a full shell grammar. The parser never raises: unterminated quotes and
+substitutions extend to the end of the input, and nesting deeper than
+MAX_DEPTH stops the parse with Script.too_deep set - callers must treat such
+a script as unchecked, not as clean.
+
+Usage:
+    from shell_parse import parse
+    script = parse(command)       # cached per command string
+    for cmd in script.commands:
+        cmd.name, cmd.args        # e.g. "git", ("stash", "drop")
+"""
+
+import os
+import re
+import shlex
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+# Characters that end an unquoted word
+_METACHARS = frozenset(" \t\n|&;()<>")
+
+# Control operators, longest first
+_OPERATORS = (";;&", ";;", ";&", "&&", "||", "|&", "|", ";", "&")
+
+# Redirection operators, longest first ("<(" and ">(" are process substitutions)
+_REDIRECTS = ("&>>", "<<<", "<<-", "&>", ">>", ">&", "<&", ">|", "<>", "<<", "<", ">")
+
+_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\[[^]]*\])?\+?=")
+
+# Keywords that leave the parser at command position
+_OPENERS = frozenset({"if", "then", "else", "elif", "do", "while", "until", "!", "{", "done", "fi", "}"})
+
+# Keywords reported in Script.keywords
+_REPORTED = frozenset({"for", "select", "while", "until", "if", "case", "function"})
+
+# Commands that run their arguments as a command
+_WRAPPERS = frozenset({"command", "builtin", "exec", "nohup", "time", "env", "nice", "timeout", "stdbuf", "ionice"})
+
+# Wrapper options that take the next word as their value
+_WRAPPER_VALUE_OPTIONS = {
+    "env": ("-u", "-C", "--unset", "--chdir"),
+    "nice": ("-n", "--adjustment"),
+    "timeout": ("-k", "-s", "--kill-after", "--signal"),
+    "stdbuf": ("-i", "-o", "-e", "--input", "--output", "--error"),
+    "ionice": ("-c", "-n", "-p", "-P", "-u", "--class", "--classdata", "--pid", "--pgid", "--uid"),
+}
+
+# Positional arguments a wrapper takes before the command (timeout's DURATION)
+_WRAPPER_POSITIONALS = {"timeout": 1}
+
+# Shells whose -c option runs its argument as a script
+_SHELLS = frozenset({"sh", "bash", "zsh", "dash", "ksh"})
+
+# ssh, watch and doas options that take the next word as their value
+_SSH_VALUE_OPTIONS = frozenset("BbcDEeFIiJLlmOoPpQRSWw")
+_WATCH_VALUE_OPTIONS = ("-n", "--interval", "-q", "--equexit")
+_DOAS_VALUE_OPTIONS = ("-u", "-C")
+
+# Words with meaning at command position (also after a wrapper: `time for ...`)
+_KEYWORDS = _OPENERS | _REPORTED | {"esac"}
+
+# Nesting levels of subshells and substitutions parsed before giving up
+MAX_DEPTH = 64
+
+
+@dataclass(frozen=True)
+class Word:
+    """A shell word after quote removal. Expansions are kept literally ("$HOME")."""
+
+    text: str
+    quoted: bool
+    start: int
+    end: int
+
+
+@dataclass
+class Heredoc:
+    """A heredoc attached to a command. quoted delimiters disable expansion."""
+
+    delimiter: str
+    quoted: bool
+    strip_tabs: bool
+    body: str = ""
+
+
+@dataclass(frozen=True)
+class Substitution:
+    """A substitution and its source text. kind is "$(", "$((", "`", "<(" or ">("."""
+
+    kind: str
+    text: str
+
+
+@dataclass(frozen=True)
+class Command:
+    """A simple command.
+
+    argv has leading assignments and transparent wrappers (env, command,
+    nohup, time, ...) stripped, so `env FOO=1 sudo ls` has name "sudo".
+    text is the command's source, for reporting.
+    """
+
+    words: tuple[Word, ...]
+    argv: tuple[str, ...]
+    heredocs: tuple[Heredoc, ...]
+    text: str
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.argv[0]) if self.argv else ""
+
+    @property
+    def args(self) -> tuple[str, ...]:
+        return self.argv[1:]
+
+
+@dataclass(frozen=True)
+class Script:
+    """A parsed command line. Treat as read-only - parse() results are shared."""
+
+    commands: tuple[Command, ...]
+    pipelines: tuple[tuple[Command, ...], ...]
+    substitutions: tuple[Substitution, ...]
+    expansions: tuple[str, ...]
+    keywords: tuple[str, ...]
+    # Nesting exceeded MAX_DEPTH; everything from there on was not parsed
+    too_deep: bool = False
+
+
+def _strip_wrappers(argv: list[str]) -> tuple[str, ...]:
+    """Drop leading assignments and wrapper commands to find the command that runs."""
+    while argv and _ASSIGNMENT.match(argv[0]):
+        argv = argv[1:]
+    while argv and os.path.basename(argv[0]) in _WRAPPERS:
+        wrapper = os.path.basename(argv[0])
+        argv = argv[1:]
+        while argv and (argv[0].startswith("-") or (wrapper == "env" and _ASSIGNMENT.match(argv[0]))):
+            if wrapper == "command" and argv[0] in ("-v", "-V"):
+                # `command -v sudo` looks a command up, it doesn't run it
+                return ()
+            if argv[0] == "--":
+                argv = argv[1:]
+                break
+            argv = argv[2:] if argv[0] in _WRAPPER_VALUE_OPTIONS.get(wrapper, ()) else argv[1:]
+        argv = argv[_WRAPPER_POSITIONALS.get(wrapper, 0) :]
+    return tuple(argv)
+
+
+def _skip_options(args: tuple[str, ...], takes_value) -> tuple[str, ...]:
+    """args from the first operand on. takes_value(option) says whether option consumes the next word."""
+    index = 0
+    while index < len(args) and args[index].startswith("-") and args[index] != "-":
+        if args[index] == "--":
+            return args[index + 1 :]
+        index += 2 if takes_value(args[index]) else 1
+    return args[index:]
+
+
+def _ssh_takes_value(option: str) -> bool:
+    # Clusters like -tp 22: the first value option takes the rest of the word, or the next word
+    for position, letter in enumerate(option[1:], start=1):
+        if letter in _SSH_VALUE_OPTIONS:
+            return position == len(option) - 1
+    return False
+
+
+def _argument_script(argv: tuple[str, ...]) -> Optional[str]:
+    """The script a command runs from its arguments, or None.
+
+    `bash -c 'rm -rf x'` and `ssh host 'rm -rf x'` give "rm -rf x"; eval and
+    watch join their arguments the way they do before running them. doas
+    runs its arguments as a command, requoted so they parse back unchanged.
+    """
+    if not argv:
+        return None
+    name, args = os.path.basename(argv[0]), argv[1:]
+    if name in _SHELLS:
+        runs_argument = False
+        index = 0
+        while index < len(args) and args[index][:1] in ("-", "+") and args[index] not in ("-", "--"):
+            if args[index] in ("-o", "+o", "-O", "+O"):
+                index += 1
+            elif args[index][0] == "-" and args[index][1] != "-" and "c" in args[index]:
+                runs_argument = True
+            index += 1
+        if args[index : index + 1] == ("--",):
+            index += 1
+        return args[index] if runs_argument and index < len(args) else None
+    if name == "eval":
+        return " ".join(args) or None
+    if name == "watch":
+        return " ".join(_skip_options(args, lambda option: option in _WATCH_VALUE_OPTIONS)) or None
+    if name == "ssh":
+        # The first operand is the host; the rest is the remote command
+        remote = _skip_options(args, _ssh_takes_value)[1:]
+        return " ".join(remote) or None
+    if name == "doas":
+        return shlex.join(_skip_options(args, lambda option: option in _DOAS_VALUE_OPTIONS)) or None
+    return None
+
+
+def _only_wrappers(texts: list[str]) -> bool:
+    """True when texts are just assignments and wrappers, so the next word is what runs."""
+    return _strip_wrappers([*texts, "x"]) == ("x",)
+
+
+# Git options that come before the subcommand and take a separate value
+_GIT_VALUE_OPTIONS = ("-C", "-c", "--git-dir", "--work-tree", "--namespace")
+
+
+def git_subcommand(args: tuple[str, ...]) -> tuple[str, tuple[str, ...]]:
+    """Split git's arguments into the subcommand and its arguments.
+
+    `git -C repo commit -m x` gives ("commit", ("-m", "x")).
+    """
+    index = 0
+    while index < len(args) and args[index].startswith("-"):
+        index += 2 if args[index] in _GIT_VALUE_OPTIONS else 1
+    if index >= len(args):
+        return "", ()
+    return args[index], args[index + 1 :]
+
+
+class _Parser:
+    def __init__(self, source: str, depth: int = 0):
+        self.s = source
+        self.i = 0
+        self.depth = depth
+        self.too_deep = False
+        self.commands: list[Command] = []
+        self.pipelines: list[tuple[Command, ...]] = []
+        self.substitutions: list[Substitution] = []
+        self.expansions: list[str] = []
+        self.keywords: list[str] = []
+        self.pending_heredocs: list[Heredoc] = []
+
+    def script(self) -> Script:
+        self.parse_list(stop=None)
+        return Script(
+            tuple(self.commands),
+            tuple(self.pipelines),
+            tuple(self.substitutions),
+            tuple(self.expansions),
+            tuple(self.keywords),
+            self.too_deep,
+        )
+
+    def _nested(self, source: str) -> "_Parser":
+        """A parser for text nested one level inside this one (backticks, heredoc bodies, arithmetic)."""
+        return _Parser(source, self.depth + 1)
+
+    def _merge(self, other: "_Parser") -> None:
+        self.too_deep = self.too_deep or other.too_deep
+        self.commands.extend(other.commands)
+        self.pipelines.extend(other.pipelines)
+        self.substitutions.extend(other.substitutions)
+        self.expansions.extend(other.expansions)
+        self.keywords.extend(other.keywords)
+
+    def _argument_script(self, argv: tuple[str, ...]) -> None:
+        """Add the commands of a script run from argv (`bash -c '...'`, eval, ssh)."""
+        source = _argument_script(argv)
+        if source is None:
+            return
+        nested = self._nested(source)
+        nested.parse_list(stop=None)
+        # Only the commands: the quoted script's substitutions and keywords
+        # are not part of this command line for Claude Code's permission checks
+        self.too_deep = self.too_deep or nested.too_deep
+        self.commands.extend(nested.commands)
+        self.pipelines.extend(nested.pipelines)
+
+    # -------------------------------------------------------------------------
+    # Lists, pipelines, simple commands
+    # -------------------------------------------------------------------------
+
+    def parse_list(self, stop: Optional[str]) -> None:
+        """Parse commands until stop (")") is consumed or the input ends."""
+        if self.depth >= MAX_DEPTH:
+            # Give up rather than recurse without bound; the rest is unchecked
+            self.too_deep = True
+            self.i = len(self.s)
+            return
+        self.depth += 1
+        try:
+            self._parse_list(stop)
+        finally:
+            self.depth -= 1
+
+    def _parse_list(self, stop: Optional[str]) -> None:
+        s = self.s
+        words: list[Word] = []
+        heredocs: list[Heredoc] = []
+        pipeline: list[Command] = []
+        span = [None, None]
+        header = None  # "for" or "case" while inside its header - words aren't a command
+        skip_words = 0  # function name after `function`
+        case_depth = 0
+        in_pattern = False
+
+        def extend_span(start: int, end: int) -> None:
+            if span[0] is None:
+                span[0] = start
+            span[1] = end
+
+        def finish_command() -> None:
+            nonlocal words, heredocs
+            if words:
+                argv = _strip_wrappers([w.text for w in words])
+                command = Command(tuple(words), argv, tuple(heredocs), s[span[0] : span[1]])
+                pipeline.append(command)
+                self.commands.append(command)
+                self._argument_script(argv)
+            words, heredocs = [], []
+            span[0] = span[1] = None
+
+        def finish_pipeline() -> None:
+            nonlocal pipeline
+            finish_command()
+            if pipeline:
+                self.pipelines.append(tuple(pipeline))
+            pipeline = []
+
+        while True:
+            self._skip_blanks()
+            if self.i >= len(s):
+                finish_pipeline()
+                return
+            c = s[self.i]
+
+            if stop and c == stop:
+                self.i += 1
+                finish_pipeline()
+                return
+
+            if c == "#":
+                while self.i < len(s) and s[self.i] != "\n":
+                    self.i += 1
+                continue
+
+            if c == "\n":
+                self.i += 1
+                finish_pipeline()
+                header = None
+                self._read_heredocs()
+                continue
+
+            if s.startswith(("<(", ">("), self.i):
+                word = self._process_substitution()
+                words.append(word)
+                extend_span(word.start, word.end)
+                continue
+
+            redirect = next((op for op in _REDIRECTS if s.startswith(op, self.i)), None)
+            if redirect:
+                start = self.i
+                self.i += len(redirect)
+                self._skip_blanks()
+                target = self._read_word()
+                if target and redirect in ("<<", "<<-"):
+                    heredoc = Heredoc(target.text, target.quoted, redirect == "<<-")
+                    heredocs.append(heredoc)
+                    self.pending_heredocs.append(heredoc)
+                extend_span(start, target.end if target else self.i)
+                continue
+
+            operator = next((op for op in _OPERATORS if s.startswith(op, self.i)), None)
+            if operator:
+                self.i += len(operator)
+                if operator in ("|", "|&"):
+                    finish_command()
+                else:
+                    finish_pipeline()
+                    header = None
+                    if operator.startswith(";;") or operator == ";&":
+                        in_pattern = case_depth > 0
+                continue
+
+            if c == "(":
+                if s.startswith("((", self.i) and not words:
+                    # Arithmetic command, e.g. (( i++ )) or a for (( )) header
+                    self.i = self._arithmetic(self.i + 2)
+                    continue
+                if words and s.startswith(")", self._next_nonblank(self.i + 1)):
+                    # Function definition: name() { ...; }
+                    self.i = self._next_nonblank(self.i + 1) + 1
+                    words, heredocs = [], []
+                    span[0] = span[1] = None
+                    continue
+                self.i += 1
+                finish_pipeline()
+                self.parse_list(stop=")")
+                continue
+
+            if c == ")":
+                # Stray ")" - a case pattern terminator
+                self.i += 1
+                finish_command()
+                in_pattern = False
+                continue
+
+            word = self._read_word()
+            if word is None:
+                # Lone metacharacter we don't otherwise handle
+                self.i += 1
+                continue
+            if word.text.isdigit() and not word.quoted and s[self.i : self.i + 1] in ("<", ">"):
+                # File descriptor of a redirection, e.g. 2>/dev/null
+                continue
+
+            if skip_words:
+                skip_words -= 1
+                continue
+            if in_pattern:
+                if not word.quoted and word.text == "esac":
+                    in_pattern = False
+                    case_depth -= 1
+                continue
+            if header:
+                if not word.quoted and word.text == "in" and header == "case":
+                    header = None
+                    in_pattern = True
+                elif not word.quoted and word.text == "do":
+                    header = None
+                continue
+
+            if not word.quoted and word.text in _KEYWORDS and words and _only_wrappers([w.text for w in words]):
+                # `time for ...`, `time while ...`: the wrapper applies to the compound command
+                words, heredocs = [], []
+                span[0] = span[1] = None
+
+            if not words and not word.quoted:
+                keyword = word.text
+                if keyword in _REPORTED:
+                    self.keywords.append(keyword)
+                if keyword in ("for", "select"):
+                    header = "for"
+                    continue
+                if keyword == "case":
+                    header = "case"
+                    case_depth += 1
+                    continue
+                if keyword == "function":
+                    skip_words = 1
+                    continue
+                if keyword == "esac":
+                    case_depth = max(case_depth - 1, 0)
+                    continue
+                if keyword in _OPENERS:
+                    continue
+
+            words.append(word)
+            extend_span(word.start, word.end)
+
+    def _skip_blanks(self) -> None:
+        s = self.s
+        while self.i < len(s):
+            if s[self.i] in " \t":
+                self.i += 1
+            elif s.startswith("\\\n", self.i):
+                self.i += 2
+            else:
+                return
+
+    def _next_nonblank(self, j: int) -> int:
+        while j < len(self.s) and self.s[j] in " \t":
+            j += 1
+        return j
+
+    def _read_heredocs(self) -> None:
+        """Consume the bodies of heredocs opened on the line just ended."""
+        s = self.s
+        for heredoc in self.pending_heredocs:
+            lines = []
+            while self.i < len(s):
+                end = s.find("\n", self.i)
+                line = s[self.i : end if end != -1 else len(s)]
+                self.i = end + 1 if end != -1 else len(s)
+                if (line.lstrip("\t") if heredoc.strip_tabs else line) == heredoc.delimiter:
+                    break
+                lines.append(line.lstrip("\t") if heredoc.strip_tabs else line)
+            heredoc.body = "\n".join(lines) + ("\n" if lines else "")
+            if not heredoc.quoted:
+                # Unquoted delimiter: the body undergoes expansion
+                body = self._nested(heredoc.body)
+                body._double_quoted(terminator=None)
+                self._merge(body)
+        self.pending_heredocs = []
+
+    # -------------------------------------------------------------------------
+    # Words
+    # -------------------------------------------------------------------------
+
+    def _read_word(self) -> Optional[Word]:
+        s = self.s
+        start = self.i
+        text: list[str] = []
+        quoted = False
+        while self.i < len(s):
+            c = s[self.i]
+            if c in _METACHARS:
+                break
+            if c == "\\":
+                if s.startswith("\\\n", self.i):
+                    self.i += 2
+                    continue
+                text.append(s[self.i + 1 : self.i + 2])
+                quoted = True
+                self.i += 2
+            elif c == "'":
+                end = s.find("'", self.i + 1)
+                end = end if end != -1 else len(s)
+                text.append(s[self.i + 1 : end])
+                quoted = True
+                self.i = end + 1
+            elif c == '"':
+                self.i += 1
+                text.append(self._double_quoted(terminator='"'))
+                quoted = True
+            elif s.startswith("$'", self.i):
+                self.i += 2
+                text.append(self._ansi_c_quoted())
+                quoted = True
+            elif s.startswith('$"', self.i):
+                self.i += 2
+                text.append(self._double_quoted(terminator='"'))
+                quoted = True
+            else:
+                expansion = self._expansion()
+                if expansion is None:
+                    text.append(c)
+                    self.i += 1
+                else:
+                    text.append(expansion)
+        self.i = min(self.i, len(s))
+        if self.i == start:
+            return None
+        return Word("".join(text), quoted, start, self.i)
+
+    def _double_quoted(self, terminator: Optional[str]) -> str:
+        """Contents of a double-quoted string; consumes the terminator."""
+        s = self.s
+        text: list[str] = []
+        while self.i < len(s):
+            c = s[self.i]
+            if c == terminator:
+                self.i += 1
+                break
+            if c == "\\" and self.i + 1 < len(s) and s[self.i + 1] in '$`"\\\n':
+                if s[self.i + 1] != "\n":
+                    text.append(s[self.i + 1])
+                self.i += 2
+                continue
+            expansion = self._expansion()
+            if expansion is None:
+                text.append(c)
+                self.i += 1
+            else:
+                text.append(expansion)
+        return "".join(text)
+
+    def _ansi_c_quoted(self) -> str:
+        s = self.s
+        start = self.i
+        while self.i < len(s) and s[self.i] != "'":
+            self.i += 2 if s[self.i] == "\\" else 1
+        text = s[start : min(self.i, len(s))]
+        self.i += 1
+        return text
+
+    def _expansion(self) -> Optional[str]:
+        """Consume a $(...), $((...)), ${...} or backtick at the cursor; return its source."""
+        s = self.s
+        start = self.i
+        if s.startswith("$((", start):
+            self.i = self._arithmetic(start + 3)
+            kind = "$(("
+        elif s.startswith("$(", start):
+            self.i += 2
+            self.parse_list(stop=")")
+            kind = "$("
+        elif s.startswith("${", start):
+            self.i = self._brace_end(start + 2)
+            self.expansions.append(s[start : self.i])
+            return s[start : self.i]
+        elif s[start] == "`":
+            self.i = self._backtick_end(start + 1)
+            inner = s[start + 1 : self.i - 1] if s[self.i - 1 : self.i] == "`" else s[start + 1 : self.i]
+            nested = self._nested(re.sub(r"\\([`$\\])", r"\1", inner))
+            nested.parse_list(stop=None)
+            self._merge(nested)
+            kind = "`"
+        else:
+            return None
+        text = s[start : self.i]
+        self.substitutions.append(Substitution(kind, text))
+        return text
+
+    def _process_substitution(self) -> Word:
+        start = self.i
+        self.i += 2
+        self.parse_list(stop=")")
+        text = self.s[start : self.i]
+        self.substitutions.append(Substitution(text[:2], text))
+        return Word(text, False, start, self.i)
+
+    def _arithmetic(self, j: int) -> int:
+        """Consume an arithmetic expression opened before j, parsing the
+        substitutions inside it; returns the index after its "))"."""
+        end = self._arithmetic_end(j)
+        if self.depth >= MAX_DEPTH:
+            self.too_deep = True
+            return len(self.s)
+        closed = self.s.startswith("))", end - 2) and end - 2 >= j
+        inner = self._nested(self.s[j : end - 2 if closed else end])
+        inner._double_quoted(terminator=None)
+        self._merge(inner)
+        return end
+
+    def _arithmetic_end(self, j: int) -> int:
+        """Index after the "))" closing an arithmetic expression opened before j."""
+        depth = 2
+        while j < len(self.s):
+            if self.s[j] == "(":
+                depth += 1
+            elif self.s[j] == ")":
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+        return j
+
+    def _brace_end(self, j: int) -> int:
+        depth = 1
+        s = self.s
+        while j < len(s):
+            c = s[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == "'":
+                end = s.find("'", j + 1)
+                j = end + 1 if end != -1 else len(s)
+                continue
+            if c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+        return len(s)
+
+    def _backtick_end(self, j: int) -> int:
+        s = self.s
+        while j < len(s):
+            if s[j] == "\\":
+                j += 2
+            elif s[j] == "`":
+                return j + 1
+            else:
+                j += 1
+        return len(s)
+
+
+@lru_cache(maxsize=256)
+def parse(command: str) -> Script:
+    """Parse a command line. Results are cached, so every rule shares one parse."""
+    return _Parser(command).script()
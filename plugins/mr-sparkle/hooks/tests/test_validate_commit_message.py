@@ -6,7 +6,11 @@ import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
 VALIDATE_COMMIT = Path(__file__).parent.parent / "validate_commit_message.py"
+sys.path.insert(0, str(VALIDATE_COMMIT.parent))
+from validate_commit_message import get_commit_message_from_command  # noqa: E402
 
 
 def run_hook(hook_path, hook_input: dict, env_override: dict = None) -> subprocess.CompletedProcess:
@@ -70,6 +74,56 @@ class TestValidateCommitMessage:
         assert result.stdout == ""
 
 
+class TestMessageExtraction:
+    """The message comes from the parsed command, not a git log subprocess."""
+
+    @pytest.mark.parametrize(
+        "command,expected",
+        [
+            ('git commit -m "fix parser"', "fix parser"),
+            ("git commit -mfix", "fix"),
+            ('git commit -am "one" -m "two"', "one\n\ntwo"),
+            ("git -C repo commit --message=hello", "hello"),
+            ("git commit --message 'quoted; text'", "quoted; text"),
+            ('git add . && git commit -m "fix parser"', "fix parser"),
+            ('git commit -m "first" && git commit -m "second"', "second"),
+            ("git commit -m \"$(cat <<'EOF'\nfix thing\n\nbody here\nEOF\n)\"", "fix thing\n\nbody here"),
+            ("git commit -F - <<'EOF'\nfrom stdin\nEOF", "from stdin\n"),
+            # -S and -u take the rest of the word, so key ids and modes aren't more flags
+            ('git commit -Smykey -m "signed"', "signed"),
+            ('git commit -aSCAFE -m "signed"', "signed"),
+            ('git commit -uno -m "fix"', "fix"),
+        ],
+    )
+    def test_extracts(self, command, expected):
+        assert get_commit_message_from_command(command) == expected
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "git commit --amend --no-edit",
+            "git commit -C HEAD~1",
+            "git commit --reuse-message=HEAD",
+            'git commit -m "$(date)"',
+            "git commit -F missing.txt",
+            "git status",
+            "echo 'git commit -m x'",
+        ],
+    )
+    def test_unknown_message(self, command):
+        assert get_commit_message_from_command(command) is None
+
+    def test_file_relative_to_cwd(self, tmp_path):
+        (tmp_path / "MSG").write_text("fix from file\n")
+        assert get_commit_message_from_command("git commit -F MSG", str(tmp_path)) == "fix from file\n"
+        assert get_commit_message_from_command("git commit --file=MSG", str(tmp_path)) == "fix from file\n"
+
+    def test_heredoc_body_is_validated(self):
+        command = "git commit -m \"$(cat <<'EOF'\nFix: thing\n\nbody\nEOF\n)\""
+        result = run_hook(VALIDATE_COMMIT, {"tool_name": "Bash", "tool_input": {"command": command}, "cwd": "/some/project"})
+        assert "capitalized type 'Fix:'" in json.loads(result.stdout)["systemMessage"]
+
+
 class TestValidateCommitMessageConfig:
     """Test config-based disabling of validate_commit_message."""
 
@@ -91,6 +145,29 @@ class TestValidateCommitMessageConfig:
         assert result.returncode == 0
         assert result.stdout == ""
 
+    def test_rules_from_config(self, tmp_path):
+        claude_dir = tmp_path / ".claude"
+        claude_dir.mkdir()
+        (claude_dir / "mr-sparkle.config.yml").write_text(
+            "validate_commit_message:\n"
+            "  rules:\n"
+            "    - type: regex\n"
+            "      pattern: '^[A-Z]+-[0-9]+ '\n"
+            "      require: true\n"
+            "      message: missing ticket id\n"
+        )
+
+        result = run_hook(
+            VALIDATE_COMMIT,
+            {
+                "tool_name": "Bash",
+                "tool_input": {"command": 'git commit -m "Fix: bad message."'},
+                "cwd": str(tmp_path),
+            },
+        )
+        assert result.returncode == 0
+        assert json.loads(result.stdout)["systemMessage"].endswith("missing ticket id")
+
     def test_validates_when_no_config(self):
         result = run_hook(
             VALIDATE_COMMIT,
@@ -104,3 +181,125 @@ class TestValidateCommitMessageConfig:
         if result.stdout:
             output = json.loads(result.stdout)
             assert "systemMessage" in output
+
+
+class TestFastPath:
+    """Non-commit calls exit before loading config, regex or subprocess machinery."""
+
+    @staticmethod
+    def imported_modules(hook_input: dict) -> set:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(VALIDATE_COMMIT)],
+            input=json.dumps(hook_input),
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0
+        return {line.split("|")[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+    def project(self, tmp_path) -> str:
+        (tmp_path / ".claude").mkdir()
+        (tmp_path / ".claude" / "mr-sparkle.config.yml").write_text("validate_commit_message: true\n")
+        return str(tmp_path)
+
+    def test_non_commit_skips_config(self, tmp_path):
+        modules = self.imported_modules(
+            {"tool_name": "Bash", "tool_input": {"command": "git status"}, "cwd": self.project(tmp_path)}
+        )
+        assert not modules & {"sparkle_config", "yaml", "subprocess", "pathlib"}
+
+    def test_non_bash_skips_config(self, tmp_path):
+        modules = self.imported_modules(
+            {"tool_name": "Read", "tool_input": {"file_path": "x"}, "cwd": self.project(tmp_path)}
+        )
+        assert "sparkle_config" not in modules
+
+    def test_commit_loads_config(self, tmp_path):
+        modules = self.imported_modules(
+            {"tool_name": "Bash", "tool_input": {"command": 'git commit -m "fix parser"'}, "cwd": self.project(tmp_path)}
+        )
+        assert "sparkle_config" in modules
+
+
+class TestRangeMode:
+    """--range validates every commit in a range from one git log stream."""
+
+    @staticmethod
+    def repo(tmp_path, messages: list) -> Path:
+        env = {
+            **os.environ,
+            "GIT_AUTHOR_NAME": "t",
+            "GIT_AUTHOR_EMAIL": "t@example.com",
+            "GIT_COMMITTER_NAME": "t",
+            "GIT_COMMITTER_EMAIL": "t@example.com",
+        }
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        for message in messages:
+            subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", message], cwd=tmp_path, env=env, check=True)
+        return tmp_path
+
+    @staticmethod
+    def run_range(repo: Path, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(VALIDATE_COMMIT), "--range", *args, "--cwd", str(repo)],
+            capture_output=True,
+            text=True,
+        )
+
+    def test_json_report_lists_failing_commits(self, tmp_path):
+        repo = self.repo(tmp_path, ["init repo", "Fix: thing.", "add parser\n\nWith a body.", "fix"])
+        result = self.run_range(repo, "HEAD~3..HEAD")
+        assert result.returncode == 1
+        report = json.loads(result.stdout)
+        assert (report["checked"], report["failing"]) == (3, 2)
+        assert [c["subject"] for c in report["commits"]] == ["fix", "Fix: thing."]
+
+    def test_jsonl_streams_every_commit(self, tmp_path):
+        repo = self.repo(tmp_path, ["init repo", "add parser"])
+        result = self.run_range(repo, "HEAD", "--format", "jsonl")
+        assert result.returncode == 0
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [r.get("subject") for r in records[:-1]] == ["add parser", "init repo"]
+        assert records[-1] == {"summary": {"range": "HEAD", "checked": 2, "failing": 0}}
+
+    def test_uses_project_rules(self, tmp_path):
+        repo = self.repo(tmp_path, ["init repo", "add parser"])
+        (repo / ".claude").mkdir()
+        (repo / ".claude" / "mr-sparkle.config.yml").write_text(
+            "validate_commit_message:\n  rules:\n    - type: case\n      first: upper\n      message: capitalize\n"
+        )
+        report = json.loads(self.run_range(repo, "HEAD").stdout)
+        assert report["failing"] == 2
+        assert report["commits"][0]["violations"] == ["capitalize"]
+
+    def test_disabled_by_config(self, tmp_path):
+        repo = self.repo(tmp_path, ["init repo", "fix"])
+        (repo / ".claude").mkdir()
+        (repo / ".claude" / "mr-sparkle.config.yml").write_text("validate_commit_message: false\n")
+        result = self.run_range(repo, "HEAD")
+        assert result.returncode == 0
+        assert json.loads(result.stdout) == {"range": "HEAD", "checked": 0, "failing": 0, "disabled": True}
+
+    def test_config_read_from_repo_root(self, tmp_path):
+        repo = self.repo(tmp_path, ["init repo", "fix"])
+        (repo / ".claude").mkdir()
+        (repo / ".claude" / "mr-sparkle.config.yml").write_text("validate_commit_message: false\n")
+        (repo / "src").mkdir()
+        result = self.run_range(repo / "src", "HEAD")
+        assert (result.returncode, json.loads(result.stdout)["disabled"]) == (0, True)
+
+    def test_messages_spanning_read_chunks(self, tmp_path):
+        from validate_commit_message import iter_commits
+
+        body = "".join(f"line {i}\n" for i in range(8000))
+        repo = self.repo(tmp_path, ["init repo", f"add parser\n\n{body}", "add lexer"])
+        commits = list(iter_commits("HEAD", str(repo)))
+        assert [message.split("\n", 1)[0] for _, message in commits] == ["add lexer", "add parser", "init repo"]
+        assert commits[1][1].strip().endswith("line 7999")
+        assert all(len(sha) == 40 for sha, _ in commits)
+
+    def test_bad_range_exits_2(self, tmp_path):
+        repo = self.repo(tmp_path, ["init repo"])
+        result = self.run_range(repo, "nope..HEAD")
+        assert result.returncode == 2
+        assert "nope" in result.stderr
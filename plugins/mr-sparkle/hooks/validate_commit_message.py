@@ -7,30 +7,42 @@ PostToolUse hook to validate git commit messages against user preferences.
 
 Triggers on Bash tool usage, checks if the command was a git commit,
 and validates the message format. Warns (non-blocking) if violations found.
+
+Usage:
+    validate_commit_message.py                              # Hook mode: read hook JSON from stdin
+    validate_commit_message.py --range origin/main..HEAD    # Validate every commit in a range
+    validate_commit_message.py --range A..B --format jsonl  # One JSON record per commit, streamed
+
+Range mode reads the whole range from a single `git log` process and checks
+each message with the project's compiled rules. --format json (the default)
+prints one report listing the failing commits; jsonl prints every commit as
+it is read, then a summary record. Exits 1 if any commit has violations,
+2 if git fails. The config is read from the repository root; with
+validate_commit_message: false nothing is checked and the report says so.
+
+Runs after every Bash call, and almost none are commits. Non-commit calls
+exit after parsing the hook JSON: only json and sys are imported at module
+level, and config, regex and subprocess machinery load only for commits.
 """
 
+from __future__ import annotations
+
 import json
-import re
-import subprocess
 import sys
-from pathlib import Path
-from typing import List, Optional
 
-import yaml
 
+def _rule_specs(cwd: str) -> list | None:
+    """Commit rules from .claude/mr-sparkle.config.yml, or None if validation is disabled."""
+    from pathlib import Path
 
-def _is_enabled(cwd: str) -> bool:
-    """Check if validate_commit_message is enabled via .claude/mr-sparkle.config.yml."""
-    config_file = Path(cwd) / ".claude" / "mr-sparkle.config.yml"
-    if not config_file.is_file():
-        return True  # enabled by default
+    # Shared config loader lives with lint.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "skills" / "lint" / "scripts"))
+    import sparkle_config
 
-    try:
-        config = yaml.safe_load(config_file.read_text()) or {}
-        return config.get("validate_commit_message", True) is not False
-    except Exception:
-        pass
-    return True
+    import commit_rules
+
+    config = sparkle_config.load(Path(cwd))
+    return commit_rules.rules_from_config(config.get("validate_commit_message", True))
 
 
 def output_warning(message: str) -> None:
@@ -45,118 +57,264 @@ def output_warning(message: str) -> None:
     print(json.dumps(output), flush=True)
 
 
-def get_commit_message_from_command(command: str) -> Optional[str]:
-    """Extract commit message from git commit command."""
-    match = re.search(r'git\s+commit.*-m\s+["\']([^"\']+)["\']', command)
-    if match:
-        return match.group(1)
-
-    match = re.search(r"git\s+commit.*-m\s+(\S+)", command)
-    if match:
-        return match.group(1)
+def _resolve_message(value: str) -> str | None:
+    """The text a -m value expands to, or None if it can't be known statically.
+
+    Plain text is returned as-is. The heredoc idiom
+    "$(cat <<'EOF' ... EOF)" resolves to the heredoc body; any other
+    substitution is unknown.
+    """
+    if "$(" not in value and "`" not in value:
+        return value
+    import shell_parse
+
+    stripped = value.strip()
+    if not (stripped.startswith("$(") and stripped.endswith(")")):
+        return None
+    script = shell_parse.parse(stripped)
+    # The value parses as one word (itself) plus the commands inside it
+    inner = [cmd for cmd in script.commands if cmd.argv != (stripped,)]
+    if len(script.substitutions) != 1 or len(inner) != 1:
+        return None
+    cat = inner[0]
+    if cat.argv != ("cat",) or len(cat.heredocs) != 1:
+        return None
+    # $(...) strips trailing newlines
+    return cat.heredocs[0].body.rstrip("\n")
+
+
+def get_commit_message_from_command(command: str, cwd: str | None = None) -> str | None:
+    """Extract the commit message from a git commit command.
+
+    Reads the parsed command: every -m/--message value (joined as
+    paragraphs, like git), -F/--file <path> relative to cwd, -F - fed by a
+    heredoc, and "$(cat <<'EOF' ... EOF)" message bodies. Returns None when
+    the message isn't in the command, e.g. --amend or -C without -m.
+    """
+    from pathlib import Path
+
+    import shell_parse
+
+    commits = [
+        cmd
+        for cmd in shell_parse.parse(command).commands
+        if cmd.name == "git" and shell_parse.git_subcommand(cmd.args)[0] == "commit"
+    ]
+    if not commits:
+        return None
+    # The last commit in the command is the one at HEAD afterwards
+    commit = commits[-1]
+    _, args = shell_parse.git_subcommand(commit.args)
+
+    messages: list[str] = []
+    message_file = None
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        index += 1
+        if arg == "--":
+            break
+        if arg.startswith("--"):
+            name, has_value, value = arg.partition("=")
+            if name in ("--message", "--file", "--reuse-message", "--reedit-message"):
+                if not has_value:
+                    value = args[index] if index < len(args) else ""
+                    index += 1
+                if name == "--message":
+                    messages.append(value)
+                elif name == "--file":
+                    message_file = value
+                else:
+                    return None
+            continue
+        if not arg.startswith("-") or arg == "-":
+            continue
+        # Short option cluster, e.g. -am "msg" or -mmsg
+        for position, letter in enumerate(arg[1:], 1):
+            if letter in "Su":
+                # -S<keyid> and -u<mode>: the rest of the word is their value
+                break
+            if letter not in "mFCct":
+                continue
+            value = arg[position + 1 :]
+            if not value:
+                value = args[index] if index < len(args) else ""
+                index += 1
+            if letter == "m":
+                messages.append(value)
+            elif letter == "F":
+                message_file = value
+            elif letter in "Cc":
+                # Message reused from another commit
+                return None
+            break
 
+    if messages:
+        resolved = [_resolve_message(m) for m in messages]
+        return None if None in resolved else "\n\n".join(resolved)
+    if message_file == "-":
+        return commit.heredocs[0].body if commit.heredocs else None
+    if message_file:
+        try:
+            return (Path(cwd or ".") / message_file).read_text()
+        except (OSError, UnicodeDecodeError):
+            return None
     return None
 
 
-def get_latest_commit_message() -> Optional[str]:
+def get_latest_commit_message(cwd: str | None = None) -> str | None:
     """Get the most recent commit message from git log."""
+    import subprocess
+
     try:
-        result = subprocess.run(["git", "log", "-1", "--format=%s"], capture_output=True, text=True, timeout=2)
+        result = subprocess.run(
+            ["git", "log", "-1", "--format=%B"], capture_output=True, text=True, timeout=2, cwd=cwd or None
+        )
         if result.returncode == 0 and result.stdout.strip():
             return result.stdout.strip()
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+    except (subprocess.TimeoutExpired, OSError):
         pass
     return None
 
 
-def validate_commit_message(message: str) -> List[str]:
-    """Validate commit message against user conventions."""
-    violations = []
-
-    # Check for emojis
-    emoji_pattern = re.compile(
-        "[\U0001f600-\U0001f64f\U0001f300-\U0001f5ff\U0001f680-\U0001f6ff\U0001f1e0-\U0001f1ff\U00002702-\U000027b0\U000024c2-\U0001f251]+",
-        flags=re.UNICODE,
-    )
-    if emoji_pattern.search(message):
-        violations.append("contains emojis (user prefers none)")
-
-    # Check for attribution text
-    attribution_patterns = [
-        r"Generated with.*Claude",
-        r"Co-Authored-By:",
-        r"🤖.*Claude Code",
-    ]
-    for pattern in attribution_patterns:
-        if re.search(pattern, message, re.IGNORECASE):
-            violations.append("contains attribution text (user prefers none)")
-            break
-
-    # Check for period at end
-    if message.rstrip().endswith("."):
-        violations.append("ends with period (user prefers no period)")
-
-    # Check for capitalized type prefix
-    if message and message[0].isupper():
-        first_word = message.split()[0] if message.split() else ""
-        common_types = ["Add", "Fix", "Update", "Remove", "Refactor", "Improve", "Prevent"]
-        if first_word.rstrip(":") in common_types:
-            violations.append(f"starts with capitalized type '{first_word}' (user prefers lowercase)")
-
-    # Check for vague messages
-    vague_patterns = [
-        r"^(fix|update|change|modify)s?$",
-        r"^bug\s*fix$",
-        r"^(minor|small)\s+(change|fix|update)s?$",
-    ]
-    for pattern in vague_patterns:
-        if re.match(pattern, message.strip(), re.IGNORECASE):
-            violations.append("too vague (user prefers specific descriptions)")
-            break
-
-    # Check message length
-    if len(message) > 200:
-        violations.append(f"length {len(message)} chars (user prefers max ~200)")
+def validate_commit_message(message: str, rules: list | None = None) -> list[str]:
+    """Validate commit message against user conventions (default rules when None)."""
+    import commit_rules
+
+    return commit_rules.rule_set(rules).check(message)
+
+
+def iter_commits(revision_range: str, cwd: str | None = None):
+    """Yield (sha, message) for each commit in revision_range from one git log stream."""
+    import subprocess
+    import tempfile
+
+    # stderr goes to a file: a pipe nobody reads until stdout ends can fill and stall git
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            ["git", "log", "--format=%H%x00%B%x00", revision_range, "--"],
+            stdout=subprocess.PIPE,
+            stderr=errors,
+            cwd=cwd,
+        )
+        pending = b""
+        sha = None
+        for chunk in iter(lambda: process.stdout.read(1 << 16), b""):
+            # Only the new chunk is split; the unfinished last field carries over
+            fields = chunk.split(b"\0")
+            fields[0] = pending + fields[0]
+            pending = fields.pop()
+            for value in fields:
+                if sha is None:
+                    # Records are newline-separated: "sha\0message\0\n"
+                    sha = value.strip().decode()
+                else:
+                    yield sha, value.decode("utf-8", "replace")
+                    sha = None
+        if process.wait() != 0:
+            errors.seek(0)
+            stderr = errors.read().decode("utf-8", "replace")
+            raise RuntimeError(stderr.strip() or f"git log {revision_range} failed")
+
+
+def _repo_root(cwd: str | None) -> str:
+    """Top level of the repository containing cwd, or cwd itself outside one."""
+    import subprocess
+    from pathlib import Path
 
-    return violations
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, timeout=5, cwd=cwd or None
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        result = None
+    if result is not None and result.returncode == 0 and result.stdout.strip():
+        return result.stdout.strip()
+    return str(Path(cwd or ".").resolve())
+
+
+def validate_range(revision_range: str, output_format: str = "json", cwd: str | None = None) -> int:
+    """Validate every commit in revision_range, print the report, return the exit code."""
+    # The config lives at the repository root, wherever in it we run
+    rules = _rule_specs(_repo_root(cwd))
+    if rules is None:
+        summary = {"range": revision_range, "checked": 0, "failing": 0, "disabled": True}
+        print(json.dumps({"summary": summary}) if output_format == "jsonl" else json.dumps(summary, indent=2))
+        return 0
+
+    checked = failing = 0
+    failures = []
+    try:
+        for sha, message in iter_commits(revision_range, cwd):
+            violations = validate_commit_message(message, rules)
+            checked += 1
+            record = {"commit": sha, "subject": message.strip().split("\n", 1)[0], "violations": violations}
+            if violations:
+                failing += 1
+                if output_format == "json":
+                    failures.append(record)
+            if output_format == "jsonl":
+                print(json.dumps(record))
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    summary = {"range": revision_range, "checked": checked, "failing": failing}
+    if output_format == "jsonl":
+        print(json.dumps({"summary": summary}))
+    else:
+        print(json.dumps({**summary, "commits": failures}, indent=2))
+    return 1 if failing else 0
 
 
 def main():
     """Main hook entry point."""
+    if len(sys.argv) > 1:
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Validate commit messages against mr-sparkle's commit rules")
+        parser.add_argument("--range", required=True, dest="revision_range", help="Revision range, e.g. origin/main..HEAD")
+        parser.add_argument("--format", choices=["json", "jsonl"], default="json", help="Report format (default: json)")
+        parser.add_argument("--cwd", help="Repository to run in (default: current directory)")
+        args = parser.parse_args()
+        sys.exit(validate_range(args.revision_range, args.format, args.cwd))
+
     try:
         hook_input = json.load(sys.stdin)
     except json.JSONDecodeError:
         sys.exit(0)
 
-    # Check per-project config
-    cwd = hook_input.get("cwd", "")
-    if cwd and not _is_enabled(cwd):
-        sys.exit(0)
-
     # Only process Bash tool calls
-    if hook_input.get("tool_name") != "Bash":
+    if not isinstance(hook_input, dict) or hook_input.get("tool_name") != "Bash":
         sys.exit(0)
 
     # Get the bash command
-    command = hook_input.get("tool_input", {}).get("command", "")
+    tool_input = hook_input.get("tool_input")
+    command = tool_input.get("command", "") if isinstance(tool_input, dict) else ""
 
     # Check if this was a git commit command
-    if "git commit" not in command.lower():
+    if not isinstance(command, str) or "git commit" not in command.lower():
+        sys.exit(0)
+
+    # Check per-project config - only now that this is a commit
+    cwd = hook_input.get("cwd", "")
+    rules = _rule_specs(cwd) if cwd else ["default"]
+    if rules is None:
         sys.exit(0)
 
-    # Extract commit message from command or get from git log
-    commit_message = get_commit_message_from_command(command)
+    # Extract commit message from the parsed command
+    commit_message = get_commit_message_from_command(command, cwd)
 
-    # If message not in command (e.g., git commit --amend), try git log
+    # Last resort - message not in the command (e.g. git commit --amend)
     if not commit_message:
-        commit_message = get_latest_commit_message()
+        commit_message = get_latest_commit_message(cwd)
 
     # If still no message, nothing to validate
     if not commit_message:
         sys.exit(0)
 
     # Validate the commit message
-    violations = validate_commit_message(commit_message)
+    violations = validate_commit_message(commit_message, rules)
 
     # If violations found, warn user (non-blocking)
     if violations:
@@ -29,10 +29,18 @@ Supports per-project config via .claude/mr-sparkle.config.yml:
 
 Usage:
     lint.py <file_path>                    # Lint file (text output)
+    lint.py <path> [<path> ...]            # Lint files/directories in parallel
     lint.py <file_path> --format json      # JSON output
     lint.py <file_path> --format text      # Text output (default)
+    lint.py <path> ... --format jsonl      # One JSON record per tool result, streamed
+    lint.py <path> ... --format sarif      # SARIF log of parsed tool diagnostics
+    lint.py <path> --diagnostics           # Use tools' JSON reporters (compact output)
     lint.py --stdin-hook                   # Read hook JSON from stdin
     lint.py --detect <file_path>           # Show what autodetection finds
+    lint.py --detect-repo [DIR]            # Autodetection for a whole tree
+    lint.py --discover [DIR] [--write]     # Recommend (and write) a config
+    lint.py --staged                       # Check staged content (pre-commit)
+    lint.py --watch [DIR] [--poll]         # Lint files as they are saved
 
 Exit codes:
     0: Success (clean or fixed)
@@ -42,14 +50,26 @@ Exit codes:
 
 import argparse
 import configparser
+import hashlib
 import json
+import os
+import re
+import select
+import shlex
 import shutil
+import struct
 import subprocess
 import sys
-from dataclasses import dataclass
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 
 # tomllib is built-in Python 3.11+
 try:
@@ -57,14 +77,14 @@ try:
 except ImportError:
     tomllib = None  # type: ignore[assignment]
 
-import yaml
+import sparkle_config
 
 
 # =============================================================================
 # Config Loading
 # =============================================================================
 
-CONFIG_FILENAME = "mr-sparkle.config.yml"
+CONFIG_FILENAME = sparkle_config.CONFIG_FILENAME
 
 
 @dataclass
@@ -81,6 +101,8 @@ class OutputConfig:
 
     user: bool = True
     claude: bool = False
+    # Report through tools' JSON reporters: compact "path:line:col" lines
+    diagnostics: bool = False
 
 
 @dataclass
@@ -91,38 +113,29 @@ class LintConfig:
     tools: list[ToolEntry] = None  # type: ignore[assignment]
     output: OutputConfig = None  # type: ignore[assignment]
     disabled: bool = False
+    # gitignore-style patterns, relative to the project root, never linted
+    exclude: list[str] = None  # type: ignore[assignment]
 
     def __post_init__(self):
         if self.tools is None:
             self.tools = []
         if self.output is None:
             self.output = OutputConfig()
+        if self.exclude is None:
+            self.exclude = []
 
 
 # Singleton default config
 _DEFAULT_CONFIG = LintConfig(use_default=True)
 
 
-def _parse_yaml(text: str) -> dict:
-    """Parse YAML config text. Returns empty dict on failure."""
-    result = yaml.safe_load(text)
-    return result if isinstance(result, dict) else {}
-
-
 def load_raw_config(project_root: Optional[Path]) -> dict:
-    """Load raw mr-sparkle config dict from .claude/mr-sparkle.config.yml."""
-    if not project_root:
-        return {}
+    """Load raw mr-sparkle config dict from .claude/mr-sparkle.config.yml.
 
-    config_path = project_root / ".claude" / CONFIG_FILENAME
-    if not config_path.is_file():
-        return {}
-
-    try:
-        text = config_path.read_text()
-        return _parse_yaml(text)
-    except Exception:
-        return {}
+    Goes through the shared snapshot cache (see sparkle_config.py) so the
+    YAML is parsed once per change rather than on every hook call.
+    """
+    return sparkle_config.load(project_root)
 
 
 def load_config(project_root: Optional[Path]) -> LintConfig:
@@ -142,21 +155,28 @@ def load_config(project_root: Optional[Path]) -> LintConfig:
         output = OutputConfig(
             user=output_raw.get("user", True),
             claude=output_raw.get("claude", False),
+            diagnostics=output_raw.get("diagnostics", False) is True,
         )
     else:
         output = OutputConfig()
 
+    # Parse exclude section
+    exclude_raw = lint_raw.get("exclude")
+    if isinstance(exclude_raw, str):
+        exclude_raw = [exclude_raw]
+    exclude = [p for p in exclude_raw if isinstance(p, str) and p] if isinstance(exclude_raw, list) else []
+
     # Parse tools section
     tools_raw = lint_raw.get("tools")
 
     # tools: [] means disabled
     if isinstance(tools_raw, list) and len(tools_raw) == 0:
-        return LintConfig(use_default=False, tools=[], output=output, disabled=True)
+        return LintConfig(use_default=False, tools=[], output=output, disabled=True, exclude=exclude)
 
     # tools: [default] or tools:\n  - default
     if isinstance(tools_raw, list):
         if len(tools_raw) == 1 and tools_raw[0] == "default":
-            return LintConfig(use_default=True, output=output)
+            return LintConfig(use_default=True, output=output, exclude=exclude)
 
         # Parse explicit tool entries
         entries = []
@@ -167,10 +187,21 @@ def load_config(project_root: Optional[Path]) -> LintConfig:
                 if file_ext and commands:
                     entries.append(ToolEntry(file_ext=file_ext, commands=commands))
         if entries:
-            return LintConfig(use_default=False, tools=entries, output=output)
+            return LintConfig(use_default=False, tools=entries, output=output, exclude=exclude)
 
     # Unrecognized or missing tools key → default
-    return LintConfig(use_default=True, output=output)
+    return LintConfig(use_default=True, output=output, exclude=exclude)
+
+
+def is_excluded(config: LintConfig, file_path: str, project_root: Optional[Path]) -> bool:
+    """True if the file matches one of the config's exclude patterns."""
+    if not config.exclude or not project_root:
+        return False
+    try:
+        relative = Path(file_path).resolve().relative_to(Path(project_root).resolve())
+    except ValueError:
+        return False
+    return compile_ignore(tuple(config.exclude)).ignores(relative.as_posix(), is_dir=False)
 
 
 def find_custom_commands(config: LintConfig, file_path: str) -> Optional[list[str]]:
@@ -194,9 +225,15 @@ def run_custom_commands(
     project_root: Optional[Path],
 ) -> list["ToolResult"]:
     """Run explicit commands from config. File path appended as last arg."""
-    import shlex
+    return list(iter_custom_commands(file_path, commands, project_root))
 
-    results = []
+
+def iter_custom_commands(
+    file_path: str,
+    commands: list[str],
+    project_root: Optional[Path],
+) -> Iterator["ToolResult"]:
+    """Run explicit commands from config, yielding each result as its command exits."""
     cwd = str(project_root) if project_root else None
 
     for cmd_str in commands:
@@ -204,12 +241,10 @@ def run_custom_commands(
         tool_name = parts[0]
         binary = shutil.which(tool_name)
         if not binary:
-            results.append(
-                ToolResult(
-                    name=tool_name,
-                    status=Status.ERROR,
-                    output=f"{tool_name} not found in PATH",
-                )
+            yield ToolResult(
+                name=tool_name,
+                status=Status.ERROR,
+                output=f"{tool_name} not found in PATH",
             )
             continue
 
@@ -224,25 +259,20 @@ def run_custom_commands(
             )
             output = (result.stdout + result.stderr).strip()
             status = Status.WARNING if result.returncode != 0 else Status.OK
-            results.append(ToolResult(name=tool_name, status=status, output=output))
+            tool_result = ToolResult(name=tool_name, status=status, output=output)
         except subprocess.TimeoutExpired:
-            results.append(
-                ToolResult(
-                    name=tool_name,
-                    status=Status.ERROR,
-                    output=f"{tool_name} timed out after 60s",
-                )
+            tool_result = ToolResult(
+                name=tool_name,
+                status=Status.ERROR,
+                output=f"{tool_name} timed out after 60s",
             )
         except Exception as e:
-            results.append(
-                ToolResult(
-                    name=tool_name,
-                    status=Status.ERROR,
-                    output=f"{tool_name} error: {e}",
-                )
+            tool_result = ToolResult(
+                name=tool_name,
+                status=Status.ERROR,
+                output=f"{tool_name} error: {e}",
             )
-
-    return results
+        yield tool_result
 
 
 # =============================================================================
@@ -287,6 +317,16 @@ TOOLSETS = {
     "json": [["prettier"]],
 }
 
+# commands fix the file in place. check_commands only report, for content
+# that must not be rewritten (the staged index in --staged mode): "{file}" is
+# the file's path, and with "stdin" the content is piped in rather than read
+# from the worktree. With "staged_copy", "{file}" is instead a temp copy of the
+# content next to the file and named with its suffix, for tools that only read
+# files (or pick their parser by file name) - the copy still finds the
+# project's config. "{shell}" is the dialect shellcheck would infer
+# from the file name (the argument is dropped when there is none). A "reporter" switches the first command of each list (the
+# linter) to the tool's JSON output, parsed into Diagnostics when structured
+# output is requested.
 TOOLS = {
     "ruff": {
         "binary": "ruff",
@@ -294,17 +334,27 @@ TOOLS = {
             ["ruff", "check", "--fix"],
             ["ruff", "format"],
         ],
+        "check_commands": [
+            ["ruff", "check", "--stdin-filename", "{file}", "-"],
+            ["ruff", "format", "--check", "--stdin-filename", "{file}", "-"],
+        ],
+        "stdin": True,
+        "reporter": {"args": ["--output-format", "json"], "parser": "ruff"},
         "config_indicators": ["ruff.toml", ".ruff.toml"],
         "pyproject_keys": ["tool.ruff"],
     },
     "black": {
         "binary": "black",
         "commands": [["black"]],
+        "check_commands": [["black", "--check", "--quiet", "--stdin-filename", "{file}", "-"]],
+        "stdin": True,
         "pyproject_keys": ["tool.black"],
     },
     "isort": {
         "binary": "isort",
         "commands": [["isort"]],
+        "check_commands": [["isort", "--check-only", "--filename", "{file}", "-"]],
+        "stdin": True,
         "config_indicators": [".isort.cfg"],
         "pyproject_keys": ["tool.isort"],
         "ini_sections": [{"file": "setup.cfg", "section": "isort"}],
@@ -312,6 +362,8 @@ TOOLS = {
     "pylint": {
         "binary": "pylint",
         "commands": [["pylint"]],
+        "check_commands": [["pylint", "--from-stdin", "{file}"]],
+        "stdin": True,
         "config_indicators": [".pylintrc", "pylintrc"],
         "pyproject_keys": ["tool.pylint"],
         "ini_sections": [{"file": "setup.cfg", "section": "pylint"}],
@@ -319,12 +371,18 @@ TOOLS = {
     "biome": {
         "binary": "biome",
         "commands": [["biome", "check", "--fix"]],
+        "check_commands": [["biome", "check", "--stdin-file-path={file}"]],
+        "stdin": True,
+        "reporter": {"args": ["--reporter", "json"], "parser": "biome"},
         "config_indicators": ["biome.json", "biome.jsonc"],
         "packages": ["@biomejs/biome", "biome"],
     },
     "eslint": {
         "binary": "eslint",
         "commands": [["eslint", "--fix"]],
+        "check_commands": [["eslint", "--stdin", "--stdin-filename", "{file}"]],
+        "stdin": True,
+        "reporter": {"args": ["-f", "json"], "parser": "eslint"},
         "config_indicators": [
             "eslint.config.js",
             "eslint.config.mjs",
@@ -342,6 +400,10 @@ TOOLS = {
     "prettier": {
         "binary": "prettier",
         "commands": [["prettier", "--write"]],
+        # --check last: config args go before the final argument, not between
+        # --stdin-filepath and its value
+        "check_commands": [["prettier", "--stdin-filepath", "{file}", "--check"]],
+        "stdin": True,
         "config_indicators": [
             ".prettierrc",
             ".prettierrc.js",
@@ -363,6 +425,10 @@ TOOLS = {
     "markdownlint": {
         "binary": "markdownlint-cli2",
         "commands": [["markdownlint-cli2", "--fix"]],
+        # No --version flag; the usage banner names the version
+        "version_args": [],
+        "check_commands": [["markdownlint-cli2", "{file}"]],
+        "staged_copy": True,
         "config_indicators": [
             ".markdownlint-cli2.jsonc",
             ".markdownlint-cli2.yaml",
@@ -375,27 +441,41 @@ TOOLS = {
     "mdformat": {
         "binary": "mdformat",
         "commands": [["mdformat"]],
+        "check_commands": [["mdformat", "--check", "{file}"]],
+        "staged_copy": True,
         "pyproject_keys": ["tool.mdformat"],
     },
     "shfmt": {
         "binary": "shfmt",
         "commands": [["shfmt", "-w"]],
+        "check_commands": [["shfmt", "-d", "--filename", "{file}"]],
+        "stdin": True,
         "config_indicators": [".editorconfig"],
     },
     "shellcheck": {
         "binary": "shellcheck",
         "commands": [["shellcheck"]],
+        "check_commands": [["shellcheck", "--shell={shell}", "-"]],
+        "stdin": True,
+        "reporter": {"args": ["-f", "json1"], "parser": "shellcheck"},
         "config_indicators": [".shellcheckrc"],
     },
     "standard": {
         "binary": "standardrb",
         "commands": [["standardrb", "--fix"]],
+        "check_commands": [["standardrb", "--stdin", "{file}"]],
+        "stdin": True,
+        # standardrb is built on rubocop and shares its formatters
+        "reporter": {"args": ["--format", "json"], "parser": "rubocop"},
         "config_indicators": [".standard.yml"],
         "gemfile_gems": ["standard", "standardrb"],
     },
     "rubocop": {
         "binary": "rubocop",
         "commands": [["rubocop", "-a"]],
+        "check_commands": [["rubocop", "--stdin", "{file}"]],
+        "stdin": True,
+        "reporter": {"args": ["--format", "json"], "parser": "rubocop"},
         "config_indicators": [".rubocop.yml", ".rubocop_todo.yml"],
         "gemfile_gems": ["rubocop"],
     },
@@ -411,6 +491,10 @@ class Status(Enum):
     SKIPPED = "skipped"
 
 
+# Exit code a result contributes; a run exits with the worst of them
+EXIT_CODES = {Status.OK: 0, Status.WARNING: 1, Status.ERROR: 2, Status.SKIPPED: 0}
+
+
 @dataclass
 class ToolResult:
     """Result from running a tool."""
@@ -418,6 +502,26 @@ class ToolResult:
     name: str
     status: Status
     output: str = ""
+    version: Optional[str] = None
+    # Set when the tool's JSON reporter was parsed; None means output is raw text
+    diagnostics: Optional[list["Diagnostic"]] = None
+
+
+@dataclass
+class Diagnostic:
+    """One finding from a tool's JSON reporter, in a tool-independent shape."""
+
+    path: str
+    line: Optional[int]
+    col: Optional[int]
+    rule: Optional[str]
+    severity: str  # "error", "warning" or "info"
+    message: str
+
+    def render(self) -> str:
+        location = ":".join(str(part) for part in (self.path, self.line, self.col) if part is not None)
+        rule = f" [{self.rule}]" if self.rule else ""
+        return f"{location}: {self.severity}: {self.message}{rule}"
 
 
 # =============================================================================
@@ -466,6 +570,57 @@ def find_project_root(file_path: str) -> Optional[Path]:
     return None
 
 
+@lru_cache(maxsize=None)
+def find_repo_root(directory: Path) -> Optional[Path]:
+    """Nearest ancestor of directory (inclusive) containing .git, memoized per directory."""
+    if (directory / ".git").exists():
+        return directory
+    if directory.parent == directory:
+        return None
+    return find_repo_root(directory.parent)
+
+
+@lru_cache(maxsize=None)
+def _nearest_config_dir(tool_name: str, directory: Path, boundary: Path) -> Optional[Path]:
+    """Walk up from directory to boundary looking for tool config, memoized per directory.
+
+    Sibling files share the cached answers for their common ancestors, so a
+    burst of edits in one package only stats each ancestor once per tool.
+    """
+    if has_project_config(tool_name, directory):
+        return directory
+    if directory == boundary or directory.parent == directory:
+        return None
+    return _nearest_config_dir(tool_name, directory.parent, boundary)
+
+
+def clear_lookup_caches() -> None:
+    """Forget memoized repo-root and config-dir lookups (for long-running modes like --watch)."""
+    find_repo_root.cache_clear()
+    _nearest_config_dir.cache_clear()
+
+
+def find_tool_config_dir(
+    tool_name: str,
+    start_dir: Path,
+    project_root: Optional[Path],
+) -> Optional[Path]:
+    """Find the nearest directory with project config for a tool.
+
+    Searches from start_dir up to the repository root (or project_root when
+    not in a git repo), so a package-level package.json doesn't hide a
+    repo-level biome.json in a monorepo.
+    """
+    if not project_root:
+        return None
+
+    start_dir = start_dir.resolve()
+    boundary = find_repo_root(start_dir) or project_root
+    if start_dir != boundary and boundary not in start_dir.parents:
+        boundary = project_root
+    return _nearest_config_dir(tool_name, start_dir, boundary)
+
+
 def check_pyproject_key(project_root: Path, key: str) -> bool:
     """Check if a dotted key exists in pyproject.toml."""
     if tomllib is None:
@@ -594,12 +749,45 @@ def has_project_config(tool_name: str, project_root: Optional[Path]) -> bool:
     return False
 
 
-def select_tools(toolset: str, project_root: Optional[Path]) -> list[str]:
-    """Select tools to run based on project config."""
+def config_source(tool_name: str, directory: Path) -> Optional[str]:
+    """Which file in directory configures a tool, e.g. "pyproject.toml [tool.ruff]".
+
+    Checks the same sources as has_project_config, in the same order.
+    """
+    tool_def = TOOLS[tool_name]
+    for cfg in tool_def.get("config_indicators", []):
+        if (directory / cfg).is_file():
+            return cfg
+    if has_npm_package(tool_def, directory):
+        return "package.json"
+    if has_gemfile_gem(tool_def, directory):
+        return "Gemfile"
+    for key in tool_def.get("pyproject_keys", []):
+        if check_pyproject_key(directory, key):
+            return f"pyproject.toml [{key}]"
+    for entry in tool_def.get("ini_sections", []):
+        if has_ini_section({"ini_sections": [entry]}, directory):
+            return f"{entry['file']} [{entry['section']}]"
+    return None
+
+
+def tool_is_configured(tool_name: str, project_root: Optional[Path], start_dir: Optional[Path] = None) -> bool:
+    """Check for tool config at project_root, or nearest to start_dir when given."""
+    if start_dir is None:
+        return has_project_config(tool_name, project_root)
+    return find_tool_config_dir(tool_name, start_dir, project_root) is not None
+
+
+def select_tools(toolset: str, project_root: Optional[Path], start_dir: Optional[Path] = None) -> list[str]:
+    """Select tools to run based on project config.
+
+    With start_dir, each tool's config is resolved from the nearest ancestor
+    of start_dir (see find_tool_config_dir) instead of project_root alone.
+    """
     groups = TOOLSETS[toolset]
 
     for group in groups:
-        configured = [t for t in group if has_project_config(t, project_root)]
+        configured = [t for t in group if tool_is_configured(t, project_root, start_dir)]
         if configured:
             return configured
 
@@ -623,24 +811,561 @@ def get_skill_default_config(tool_name: str) -> Optional[Path]:
     return None
 
 
+# =============================================================================
+# Tree Walking
+# =============================================================================
+
+# Directories never worth walking for lintable files, ignored or not
+SKIP_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", ".tox", ".nox", ".mypy_cache", ".ruff_cache"}
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Translate a gitignore glob (without its leading "!" or trailing "/") to regex source."""
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("/**", i) and i + 3 == len(glob):
+            out.append("/.*")
+            break
+        if glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in glob[i + 2 :]:
+            end = glob.index("]", i + 2)
+            body = glob[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end
+        elif c == "\\" and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Compiled gitignore-style patterns, matched against paths relative to one base directory."""
+
+    def __init__(self, lines: tuple[str, ...]):
+        self.rules: list[tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate or line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash before the end anchors the pattern to the base directory
+            anchored = "/" in line
+            line = line.lstrip("/")
+            prefix = "" if anchored else "(?:.*/)?"
+            try:
+                self.rules.append((re.compile(prefix + _glob_to_regex(line) + r"\Z"), negate, dir_only))
+            except re.error:
+                continue
+
+    def match(self, relative: str, is_dir: bool) -> Optional[bool]:
+        """True (ignored), False (re-included by "!") or None (no rule matches). Last match wins."""
+        verdict = None
+        for pattern, negate, dir_only in self.rules:
+            if (is_dir or not dir_only) and pattern.match(relative):
+                verdict = not negate
+        return verdict
+
+    def ignores(self, relative: str, is_dir: bool) -> bool:
+        """True if relative, or any directory above it, is ignored."""
+        parts = relative.split("/")
+        for depth in range(1, len(parts) + 1):
+            if self.match("/".join(parts[:depth]), is_dir or depth < len(parts)):
+                return True
+        return False
+
+
+@lru_cache(maxsize=64)
+def compile_ignore(lines: tuple[str, ...]) -> IgnoreRules:
+    """IgnoreRules for pattern lines, compiled once per distinct set."""
+    return IgnoreRules(lines)
+
+
+def _read_ignore_file(path: str) -> Optional[IgnoreRules]:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = tuple(f)
+    except OSError:
+        return None
+    rules = compile_ignore(lines)
+    return rules if rules.rules else None
+
+
+def _scan_directory(directory: str, inherited: list) -> tuple[str, list, list[str], list[str], list[str]]:
+    """List one directory: (directory, active rules, subdirs, files, pruned subdir paths)."""
+    own = _read_ignore_file(os.path.join(directory, ".gitignore"))
+    active = inherited + [(directory, own)] if own else inherited
+    subdirs: list[str] = []
+    files: list[str] = []
+    pruned: list[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            listing = [(entry.name, entry.path, entry.is_dir(follow_symlinks=False)) for entry in entries]
+    except OSError:
+        return directory, active, subdirs, files, pruned
+    for name, path, is_dir in sorted(listing):
+        if (is_dir and name in SKIP_DIRS) or _ignored(path, is_dir, active):
+            if is_dir:
+                pruned.append(path)
+        elif is_dir:
+            subdirs.append(name)
+        else:
+            files.append(name)
+    return directory, active, subdirs, files, pruned
+
+
+def walk_tree(
+    root: str,
+    pruned: Optional[list[str]] = None,
+    workers: Optional[int] = None,
+    inherited: Optional[list[tuple[str, IgnoreRules]]] = None,
+) -> Iterator[tuple[str, list[str], list[str]]]:
+    """Yield (directory, subdirectory names, file names) for every directory git wouldn't ignore.
+
+    Each directory's .gitignore (plus .git/info/exclude at the root) is
+    compiled when the walk enters it, and ignored directories are pruned
+    before descending, as are SKIP_DIRS. Deeper .gitignore files override
+    shallower ones, as in git. Pruned directories are appended to pruned
+    when given.
+
+    Directories are scanned in parallel on a thread pool and yielded as
+    their scans finish, so consumers start work while the rest of the tree
+    is still being listed. A directory is always yielded before its
+    subdirectories; otherwise the order is unspecified.
+
+    inherited is the rules in effect above root (see ignore_rules_above) when
+    walking a subtree of a larger checkout.
+    """
+    root = os.path.abspath(root)
+    if inherited is not None:
+        base_rules = inherited
+    else:
+        exclude = _read_ignore_file(os.path.join(root, ".git", "info", "exclude"))
+        base_rules = [(root, exclude)] if exclude else []
+    pool = ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 4) * 2))
+    try:
+        pending = {pool.submit(_scan_directory, root, base_rules)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory, active, subdirs, files, pruned_here = future.result()
+                # Queue the subtrees before handing this directory to the consumer
+                pending |= {pool.submit(_scan_directory, os.path.join(directory, d), active) for d in subdirs}
+                if pruned is not None:
+                    pruned.extend(pruned_here)
+                yield directory, subdirs, files
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def walk_files(root: str, pruned: Optional[list[str]] = None) -> Iterator[str]:
+    """Yield the path of every file under root that git wouldn't ignore, as the walk finds them (see walk_tree)."""
+    for directory, _, files in walk_tree(root, pruned):
+        for name in files:
+            yield os.path.join(directory, name)
+
+
+def ignore_rules_above(path: str, root: str, is_dir: bool) -> Optional[list[tuple[str, IgnoreRules]]]:
+    """The rules walk_tree(root) would have in effect for path, or None if it would skip path.
+
+    Reads .git/info/exclude and every .gitignore from root down to path's
+    directory, checking each step as the walk would, so a path under an
+    ignored or SKIP_DIRS directory is skipped too. path must be under root.
+    """
+    root = os.path.abspath(root)
+    relative = os.path.relpath(os.path.abspath(path), root)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return None
+    exclude = _read_ignore_file(os.path.join(root, ".git", "info", "exclude"))
+    active = [(root, exclude)] if exclude else []
+    if relative == os.curdir:
+        return active
+    directory = root
+    parts = relative.split(os.sep)
+    for depth, name in enumerate(parts):
+        own = _read_ignore_file(os.path.join(directory, ".gitignore"))
+        if own:
+            active = active + [(directory, own)]
+        child = os.path.join(directory, name)
+        child_is_dir = is_dir or depth < len(parts) - 1
+        if (child_is_dir and name in SKIP_DIRS) or _ignored(child, child_is_dir, active):
+            return None
+        directory = child
+    return active
+
+
+def _ignored(path: str, is_dir: bool, active: list[tuple[str, IgnoreRules]]) -> bool:
+    """Whether path is ignored by the .gitignore rules in effect. Deepest matching file wins."""
+    for base, rules in reversed(active):
+        # path is always under base, so slicing is enough (and much cheaper than relpath)
+        verdict = rules.match(path[len(base.rstrip(os.sep)) + 1 :].replace(os.sep, "/"), is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+# =============================================================================
+# Tool Versions
+# =============================================================================
+
+VERSION_PATTERN = re.compile(r"\d+\.\d+(?:\.\d+)?(?:[-+][0-9A-Za-z.]+)?")
+
+# In-process memo: resolved binary -> ((mtime_ns, inode), version)
+_VERSION_MEMO: dict[str, tuple[tuple[int, int], Optional[str]]] = {}
+_VERSION_LOCK = threading.Lock()
+
+# Multiplexers that version-manager shims are symlinks to; other managers
+# keep their shims in a "shims" directory
+SHIM_TARGETS = {"mise", "rtx", "volta-shim", "proto-shim"}
+
+
+def _version_cache_file() -> Optional[Path]:
+    """Persistent version cache in sparkle_config's private cache dir. None when that is unusable."""
+    directory = sparkle_config.cache_dir()
+    return directory / "tool-versions.json" if directory else None
+
+
+def _probe_version(binary: Path) -> Optional[str]:
+    """Run the binary's version command and pull out the version number."""
+    version_args = next(
+        (t.get("version_args", ["--version"]) for t in TOOLS.values() if t["binary"] == binary.name),
+        ["--version"],
+    )
+    try:
+        result = subprocess.run([str(binary), *version_args], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = VERSION_PATTERN.search(result.stdout + result.stderr)
+    return match.group() if match else None
+
+
+def _is_shim(path: Path, real: Path) -> bool:
+    """True for a version manager's shim (pyenv, rbenv, asdf, mise, volta...).
+
+    A shim dispatches to whichever install the project pins, so the shim file
+    never changes when the version it runs does.
+    """
+    return path.parent.name == "shims" or real.name in SHIM_TARGETS
+
+
+def _read_version_cache(cache_file: Optional[Path]) -> dict:
+    if cache_file is None:
+        return {}
+    try:
+        cache = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def binary_version(binary: Optional[str]) -> Optional[str]:
+    """Version of a tool binary, probed once per install.
+
+    Cached on disk by resolved path, keyed by mtime and inode, so the probe
+    only runs again when the binary is upgraded or replaced. Shims are probed
+    on every call. The probe runs outside the lock, so a slow tool doesn't
+    hold up lookups for the others.
+    """
+    if not binary:
+        return None
+    path = Path(binary)
+    try:
+        real = path.resolve()
+        st = real.stat()
+    except OSError:
+        return None
+    if _is_shim(path, real):
+        return _probe_version(path)
+    stamp = (st.st_mtime_ns, st.st_ino)
+    cache_file = _version_cache_file()
+
+    with _VERSION_LOCK:
+        memo = _VERSION_MEMO.get(str(real))
+        if memo and memo[0] == stamp:
+            return memo[1]
+        entry = _read_version_cache(cache_file).get(str(real))
+        if isinstance(entry, dict) and tuple(entry.get("stamp", ())) == stamp:
+            version = entry.get("version")
+            _VERSION_MEMO[str(real)] = (stamp, version)
+            return version
+
+    version = _probe_version(path)
+
+    with _VERSION_LOCK:
+        # Re-read, so entries other threads wrote meanwhile are kept
+        cache = _read_version_cache(cache_file)
+        cache[str(real)] = {"stamp": list(stamp), "version": version}
+        try:
+            if cache_file is None:
+                raise OSError("no private cache directory")
+            fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+        _VERSION_MEMO[str(real)] = (stamp, version)
+    return version
+
+
+def tool_version(tool_name: str) -> Optional[str]:
+    """Version of an installed TOOLS entry, or None if missing or unknown."""
+    return binary_version(shutil.which(TOOLS[tool_name]["binary"]))
+
+
+# =============================================================================
+# Structured Diagnostics
+# =============================================================================
+
+# Each parser takes the reporter's stdout, the linted path and its source
+# text, and raises ValueError (json.JSONDecodeError included) on output it
+# doesn't recognise; the raw output is kept instead.
+
+
+def _severity(level) -> str:
+    """Map a tool's level name onto error/warning/info."""
+    level = str(level).lower()
+    if level in ("error", "fatal"):
+        return "error"
+    return "warning" if level == "warning" else "info"
+
+
+def _expect(value, kind: type):
+    if not isinstance(value, kind):
+        raise ValueError(f"expected {kind.__name__}, got {type(value).__name__}")
+    return value
+
+
+def parse_ruff(stdout: str, path: str, source: Optional[str]) -> list[Diagnostic]:
+    """ruff check --output-format json: a list of violations. ruff has no severities."""
+    diagnostics = []
+    for item in _expect(json.loads(stdout), list):
+        location = item.get("location") or {}
+        code = item.get("code")
+        diagnostics.append(
+            Diagnostic(
+                path,
+                location.get("row"),
+                location.get("column"),
+                code,
+                # Syntax errors come without a code
+                "warning" if code else "error",
+                item.get("message", ""),
+            )
+        )
+    return diagnostics
+
+
+def parse_eslint(stdout: str, path: str, source: Optional[str]) -> list[Diagnostic]:
+    """eslint -f json: a list of files, each with messages of severity 1 (warn) or 2 (error)."""
+    diagnostics = []
+    for entry in _expect(json.loads(stdout), list):
+        for message in entry.get("messages", []):
+            diagnostics.append(
+                Diagnostic(
+                    path,
+                    message.get("line"),
+                    message.get("column"),
+                    message.get("ruleId"),
+                    "error" if message.get("fatal") or message.get("severity") == 2 else "warning",
+                    message.get("message", ""),
+                )
+            )
+    return diagnostics
+
+
+def parse_shellcheck(stdout: str, path: str, source: Optional[str]) -> list[Diagnostic]:
+    """shellcheck -f json1: {"comments": [...]} with levels error/warning/info/style."""
+    comments = _expect(json.loads(stdout), dict).get("comments", [])
+    return [
+        Diagnostic(
+            path,
+            comment.get("line"),
+            comment.get("column"),
+            f"SC{comment['code']}" if comment.get("code") else None,
+            _severity(comment.get("level")),
+            comment.get("message", ""),
+        )
+        for comment in comments
+    ]
+
+
+def parse_rubocop(stdout: str, path: str, source: Optional[str]) -> list[Diagnostic]:
+    """rubocop --format json: {"files": [{"offenses": [...]}]}."""
+    diagnostics = []
+    for entry in _expect(json.loads(stdout), dict).get("files", []):
+        for offense in entry.get("offenses", []):
+            location = offense.get("location") or {}
+            diagnostics.append(
+                Diagnostic(
+                    path,
+                    location.get("start_line", location.get("line")),
+                    location.get("start_column", location.get("column")),
+                    offense.get("cop_name"),
+                    _severity(offense.get("severity")),
+                    # Messages are prefixed with the cop name (DisplayCopNames)
+                    offense.get("message", "").removeprefix(f"{offense.get('cop_name')}: "),
+                )
+            )
+    return diagnostics
+
+
+def _line_col(source: Optional[str], offset) -> tuple[Optional[int], Optional[int]]:
+    """1-based line and column of a byte offset into source."""
+    if source is None or not isinstance(offset, int):
+        return None, None
+    before = source.encode()[:offset].decode(errors="replace")
+    return before.count("\n") + 1, len(before) - (before.rfind("\n") + 1) + 1
+
+
+def parse_biome(stdout: str, path: str, source: Optional[str]) -> list[Diagnostic]:
+    """biome --reporter json: {"diagnostics": [...]}, located by line/column or a byte span."""
+    diagnostics = []
+    for item in _expect(json.loads(stdout), dict).get("diagnostics", []):
+        location = item.get("location") or {}
+        start = location.get("start")
+        if isinstance(start, dict):
+            line, col = start.get("line"), start.get("column")
+        else:
+            span = location.get("span") or [None]
+            line, col = _line_col(source, span[0])
+        diagnostics.append(
+            Diagnostic(
+                path,
+                line,
+                col,
+                item.get("category"),
+                _severity(item.get("severity")),
+                item.get("description") or item.get("message", ""),
+            )
+        )
+    return diagnostics
+
+
+DIAGNOSTIC_PARSERS = {
+    "ruff": parse_ruff,
+    "eslint": parse_eslint,
+    "shellcheck": parse_shellcheck,
+    "rubocop": parse_rubocop,
+    "biome": parse_biome,
+}
+
+
+def reporter_command(
+    cmd: list[str],
+    tool_def: dict,
+    index: int,
+    path: str,
+    source: Optional[str] = None,
+) -> Optional[Callable[[str], list[Diagnostic]]]:
+    """Add the tool's reporter args to cmd if it is the linter (first) command.
+
+    Returns the parser for its output, or None when the output stays text.
+    """
+    reporter = tool_def.get("reporter")
+    if not reporter or index != 0:
+        return None
+    cmd.extend(reporter["args"])
+    parser = DIAGNOSTIC_PARSERS[reporter["parser"]]
+    return lambda stdout: parser(stdout, path, source)
+
+
 # =============================================================================
 # Tool Execution
 # =============================================================================
 
 
-def run_tool(
+def _run_command(
+    cmd: list[str],
+    tool_def: dict,
+    cwd: Optional[str],
+    all_output: list[str],
+    worst_status: Status,
+    stdin: Optional[bytes] = None,
+    parse: Optional[Callable[[str], list[Diagnostic]]] = None,
+    reports: Optional[list[list[Diagnostic]]] = None,
+) -> Status:
+    """Run one tool command, collecting its output. Returns the updated worst status.
+
+    With parse, stdout is the tool's JSON report: once parsed, its diagnostics
+    are added to reports and rendered one per line in place of the raw JSON.
+    Output that doesn't parse is kept as text.
+    """
+    try:
+        if stdin is None:
+            result = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd, timeout=60)
+            stdout, stderr = result.stdout, result.stderr
+        else:
+            result = subprocess.run(cmd, input=stdin, capture_output=True, cwd=cwd, timeout=60)
+            stdout, stderr = result.stdout.decode(errors="replace"), result.stderr.decode(errors="replace")
+        output = (stdout + stderr).strip()
+
+        if parse is not None and reports is not None:
+            try:
+                parsed = parse(stdout)
+            except (ValueError, TypeError, KeyError, AttributeError):
+                pass
+            else:
+                reports.append(parsed)
+                output = "\n".join([*(d.render() for d in parsed), stderr.strip()]).strip()
+
+        if output:
+            all_output.append(output)
+
+        if result.returncode != 0:
+            # Non-zero exit typically means lint errors found
+            if worst_status == Status.OK:
+                worst_status = Status.WARNING
+
+    except subprocess.TimeoutExpired:
+        all_output.append(f"{tool_def['binary']} timed out after 60s")
+        worst_status = Status.ERROR
+    except Exception as e:
+        all_output.append(f"{tool_def['binary']} error: {e}")
+        worst_status = Status.ERROR
+    return worst_status
+
+
+def resolve_invocation(
     file_path: str,
     tool_name: str,
     project_root: Optional[Path],
-) -> Optional[ToolResult]:
-    """Run tool. Returns None if not installed (skip silently)."""
+) -> Optional[tuple[list[str], Optional[str]]]:
+    """Config args and cwd for running a tool on a file, or None to skip it.
+
+    A tool that needs explicit config (no project config, but a global config
+    location) uses the global config, else the skill default, else is skipped.
+    """
     tool_def = TOOLS[tool_name]
-    binary = shutil.which(tool_def["binary"])
-    if not binary:
-        return None
 
     # Check if explicit global config is required
-    has_config = has_project_config(tool_name, project_root)
+    config_dir = find_tool_config_dir(tool_name, Path(file_path).parent, project_root)
+    has_config = config_dir is not None
     has_global_config = "global_config_location" in tool_def
     needs_explicit_config = not has_config and has_global_config
 
@@ -674,46 +1399,50 @@ def run_tool(
     if needs_explicit_config and "ignore_flag" in tool_def:
         config_args.extend([tool_def["ignore_flag"], "/dev/null"])
 
-    cwd = str(project_root) if project_root and tool_def.get("needs_project_cwd") else None
+    # Tools that resolve config from cwd (eslint flat config) run where it was found
+    cwd_dir = config_dir or project_root
+    cwd = str(cwd_dir) if cwd_dir and tool_def.get("needs_project_cwd") else None
+    return config_args, cwd
+
+
+def run_tool(
+    file_path: str,
+    tool_name: str,
+    project_root: Optional[Path],
+    structured: bool = False,
+) -> Optional[ToolResult]:
+    """Run tool. Returns None if not installed (skip silently).
+
+    With structured, a tool that has a JSON reporter reports through it and
+    the result carries its parsed diagnostics.
+    """
+    tool_def = TOOLS[tool_name]
+    binary = shutil.which(tool_def["binary"])
+    if not binary:
+        return None
+
+    invocation = resolve_invocation(file_path, tool_name, project_root)
+    if invocation is None:
+        return None
+    config_args, cwd = invocation
 
     all_output: list[str] = []
     worst_status = Status.OK
+    reports: list[list[Diagnostic]] = []
 
-    for cmd_template in tool_def["commands"]:
+    for index, cmd_template in enumerate(tool_def["commands"]):
         cmd = cmd_template.copy()
         cmd[0] = binary
+        parse = reporter_command(cmd, tool_def, index, file_path) if structured else None
         cmd.extend(config_args)
         cmd.append(file_path)
-
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=cwd,
-                timeout=60,
-            )
-
-            output = (result.stdout + result.stderr).strip()
-            if output:
-                all_output.append(output)
-
-            if result.returncode != 0:
-                # Non-zero exit typically means lint errors found
-                if worst_status == Status.OK:
-                    worst_status = Status.WARNING
-
-        except subprocess.TimeoutExpired:
-            all_output.append(f"{tool_def['binary']} timed out after 60s")
-            worst_status = Status.ERROR
-        except Exception as e:
-            all_output.append(f"{tool_def['binary']} error: {e}")
-            worst_status = Status.ERROR
+        worst_status = _run_command(cmd, tool_def, cwd, all_output, worst_status, parse=parse, reports=reports)
 
     return ToolResult(
         name=tool_def["binary"],
         status=worst_status,
         output="\n".join(all_output),
+        diagnostics=[d for report in reports for d in report] if reports else None,
     )
 
 
@@ -789,12 +1518,141 @@ def format_json_output(file_path: str, toolset: str, results: list[ToolResult])
         "toolset": toolset,
         "tools_run": [r.name for r in ran],
         "status": overall_status,
-        "results": [{"tool": r.name, "status": r.status.value, "output": r.output} for r in ran],
+        "results": [result_record(r) for r in ran],
     }
 
     return json.dumps(output, indent=2), exit_code
 
 
+def result_record(result: ToolResult) -> dict:
+    """JSON fields for one tool result; diagnostics only when its reporter was parsed."""
+    record = {"tool": result.name, "version": result.version, "status": result.status.value, "output": result.output}
+    if result.diagnostics is not None:
+        record["diagnostics"] = [asdict(d) for d in result.diagnostics]
+    return record
+
+
+class JsonlWriter:
+    """Streams --format jsonl: one compact record per tool result, then a summary.
+
+    record() is called from worker threads as each tool exits, so consumers
+    see results while a batch is still running. Only counts are kept, so
+    memory stays flat however many files are linted.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.counts = {status.value: 0 for status in Status}
+        self.exit_code = 0
+        self._lock = threading.Lock()
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def record(self, file_path: str, toolset: str, result: ToolResult) -> None:
+        if result.version is None and result.status != Status.SKIPPED:
+            result.version = binary_version(shutil.which(result.name))
+        with self._lock:
+            self.counts[result.status.value] += 1
+            self.exit_code = max(self.exit_code, EXIT_CODES[result.status])
+        self._write({"file": file_path, "toolset": toolset, **result_record(result)})
+
+    def summary(self) -> int:
+        """Write the summary record and start a new count. Returns the run's exit code."""
+        with self._lock:
+            counts, exit_code = self.counts, self.exit_code
+            self.counts = {status.value: 0 for status in Status}
+            self.exit_code = 0
+        status = {0: "ok", 1: "warning", 2: "error"}[exit_code]
+        self._write({"summary": {"results": sum(counts.values()), **counts, "status": status}})
+        return exit_code
+
+
+# SARIF result levels for Diagnostic severities
+SARIF_LEVELS = {"error": "error", "warning": "warning", "info": "note"}
+
+
+def _sarif_result(file_path: str, rule: Optional[str], level: str, message: str, diagnostic=None) -> dict:
+    path = Path(file_path)
+    location: dict = {"artifactLocation": {"uri": path.as_uri() if path.is_absolute() else path.as_posix()}}
+    if diagnostic is not None and diagnostic.line is not None:
+        location["region"] = {"startLine": diagnostic.line}
+        if diagnostic.col is not None:
+            location["region"]["startColumn"] = diagnostic.col
+    result = {"level": level, "message": {"text": message}, "locations": [{"physicalLocation": location}]}
+    if rule:
+        result = {"ruleId": rule, **result}
+    return result
+
+
+def format_sarif(results: Iterable[tuple[str, ToolResult]]) -> str:
+    """A SARIF 2.1.0 log for (file, result) pairs, one run per tool.
+
+    Parsed diagnostics become located results; a tool without a reporter
+    that failed contributes one result for the file with its raw output.
+    """
+    runs: dict[str, dict] = {}
+    for file_path, result in results:
+        if result.status == Status.SKIPPED:
+            continue
+        driver = {"name": result.name, "rules": []}
+        if result.version:
+            driver["version"] = result.version
+        run = runs.setdefault(result.name, {"tool": {"driver": driver}, "results": []})
+        rules = run["tool"]["driver"]["rules"]
+
+        if result.diagnostics is not None:
+            for d in result.diagnostics:
+                if d.rule and not any(rule["id"] == d.rule for rule in rules):
+                    rules.append({"id": d.rule})
+                run["results"].append(_sarif_result(file_path, d.rule, SARIF_LEVELS[d.severity], d.message, d))
+        elif result.status != Status.OK:
+            level = "error" if result.status == Status.ERROR else "warning"
+            run["results"].append(_sarif_result(file_path, None, level, result.output or f"{result.name} failed"))
+
+    log = {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": list(runs.values()),
+    }
+    return json.dumps(log, indent=2)
+
+
+class SarifWriter:
+    """Collects results for --format sarif; summary() prints them as one SARIF log.
+
+    Same interface as JsonlWriter, so every mode that streams jsonl can
+    produce SARIF.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.results: list[tuple[str, ToolResult]] = []
+        self._lock = threading.Lock()
+
+    def record(self, file_path: str, toolset: str, result: ToolResult) -> None:
+        if result.version is None and result.status != Status.SKIPPED:
+            result.version = binary_version(shutil.which(result.name))
+        with self._lock:
+            self.results.append((file_path, result))
+
+    def summary(self) -> int:
+        """Write the SARIF log of everything recorded since the last one. Returns the exit code."""
+        with self._lock:
+            results, self.results = self.results, []
+        self.stream.write(format_sarif(results) + "\n")
+        self.stream.flush()
+        return max((EXIT_CODES[r.status] for _, r in results), default=0)
+
+
+def make_writer(output_format: str):
+    """The result writer for a streamed output format, or None."""
+    return {"jsonl": JsonlWriter, "sarif": SarifWriter}.get(output_format, lambda: None)()
+
+
 def format_hook_output(
     file_path: str,
     results: list[ToolResult],
@@ -873,6 +1731,494 @@ def format_hook_output(
     return json.dumps(response), exit_code
 
 
+# =============================================================================
+# Staged Content (pre-commit)
+# =============================================================================
+
+
+@dataclass
+class StagedFile:
+    """A file's staged (index) content."""
+
+    path: str
+    blob: str
+    content: bytes
+
+    def matches_worktree(self) -> bool:
+        """True when the worktree file holds exactly the staged content."""
+        try:
+            data = Path(self.path).read_bytes()
+        except OSError:
+            return False
+        # The object id's length tells the repo's hash (sha1 or sha256)
+        digest = hashlib.sha256 if len(self.blob) == 64 else hashlib.sha1
+        return digest(b"blob %d\0" % len(data) + data).hexdigest() == self.blob
+
+
+def read_staged_files(repo_root: Path) -> list[StagedFile]:
+    """Staged content of every added/copied/modified/renamed file.
+
+    `git diff --cached --raw -z` gives each path with its index blob id, and
+    all blobs come from a single `git cat-file --batch` stream addressed by
+    id, so paths never pass through a newline-delimited stream and the
+    worktree is never consulted. Raises RuntimeError if git's output is cut short.
+    """
+    raw = subprocess.run(
+        ["git", "diff", "--cached", "--raw", "-z", "--no-abbrev", "--diff-filter=ACMR"],
+        capture_output=True,
+        cwd=repo_root,
+    ).stdout
+    entries = []
+    fields = raw.split(b"\0")
+    i = 0
+    # ":<old mode> <new mode> <old id> <new id> <status>" then the path; copies and renames add a second path
+    while i + 1 < len(fields) and fields[i].startswith(b":"):
+        meta = fields[i].split()
+        i += 3 if meta[4][:1] in (b"C", b"R") else 2
+        if meta[1] != b"160000":  # gitlinks (submodules) have no blob
+            entries.append((fields[i - 1].decode(errors="surrogateescape"), meta[3].decode()))
+    if not entries:
+        return []
+
+    batch = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        input="".join(f"{blob}\n" for _, blob in entries).encode(),
+        capture_output=True,
+        cwd=repo_root,
+    ).stdout
+
+    files = []
+    offset = 0
+    try:
+        for path, blob in entries:
+            end = batch.index(b"\n", offset)
+            header = batch[offset:end].split()
+            offset = end + 1
+            if len(header) != 3:
+                # "<id> missing"
+                continue
+            size = int(header[2])
+            if offset + size > len(batch):
+                raise ValueError("truncated blob")
+            content = batch[offset : offset + size]
+            offset += size + 1
+            if header[1] == b"blob":
+                files.append(StagedFile(str(repo_root / path), blob, content))
+    except ValueError:
+        raise RuntimeError(
+            f"git cat-file output ended early; read {len(files)} of {len(entries)} staged files"
+        ) from None
+    return files
+
+
+# Shells shellcheck infers from a file's extension when it has no shebang
+SHELL_DIALECTS = {".bash": "bash", ".bats": "bash", ".dash": "dash", ".ksh": "ksh"}
+
+
+def shell_dialect(path: str, content: bytes) -> Optional[str]:
+    """The shell shellcheck would infer from path's name, or None to leave it to the shebang."""
+    if content.startswith(b"#!"):
+        return None
+    return SHELL_DIALECTS.get(Path(path).suffix)
+
+
+def check_command(cmd_template: list[str], binary: str, staged: StagedFile, file_arg: str) -> list[str]:
+    """A check_commands template filled in for staged content read from file_arg."""
+    shell = shell_dialect(staged.path, staged.content)
+    cmd = [binary]
+    for arg in cmd_template[1:]:
+        if "{shell}" in arg:
+            if shell is None:
+                continue
+            arg = arg.replace("{shell}", shell)
+        cmd.append(arg.replace("{file}", file_arg))
+    return cmd
+
+
+@contextmanager
+def staged_copy(staged: StagedFile) -> Iterator[str]:
+    """Path of a temp file holding the staged content, with the file's suffix.
+
+    Made in the file's directory so tools resolve the same config for the copy
+    as for the file; the system temp dir is the fallback.
+    """
+    suffix = Path(staged.path).suffix
+    try:
+        fd, name = tempfile.mkstemp(prefix="mr-sparkle-staged-", suffix=suffix, dir=Path(staged.path).parent)
+    except OSError:
+        fd, name = tempfile.mkstemp(prefix="mr-sparkle-staged-", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(staged.content)
+        yield name
+    finally:
+        os.unlink(name)
+
+
+def check_staged(
+    staged: StagedFile,
+    tool_name: str,
+    project_root: Optional[Path],
+    structured: bool = False,
+) -> Optional[ToolResult]:
+    """Run a tool's check_commands against staged content. None if not installed."""
+    tool_def = TOOLS[tool_name]
+    binary = shutil.which(tool_def["binary"])
+    if not binary:
+        return None
+
+    invocation = resolve_invocation(staged.path, tool_name, project_root)
+    if invocation is None:
+        return None
+    config_args, cwd = invocation
+
+    stdin = staged.content if tool_def.get("stdin") else None
+    if stdin is None and not tool_def.get("staged_copy") and not staged.matches_worktree():
+        return ToolResult(
+            name=tool_def["binary"],
+            status=Status.SKIPPED,
+            output="tool can't read stdin and the file has unstaged changes",
+        )
+
+    all_output: list[str] = []
+    worst_status = Status.OK
+    reports: list[list[Diagnostic]] = []
+    source = staged.content.decode(errors="replace") if structured else None
+    with staged_copy(staged) if tool_def.get("staged_copy") else nullcontext(staged.path) as file_arg:
+        for index, cmd_template in enumerate(tool_def["check_commands"]):
+            cmd = check_command(cmd_template, binary, staged, file_arg)
+            # Config args go before the trailing file (or "-") argument
+            if config_args:
+                cmd[-1:-1] = config_args
+            parse = reporter_command(cmd, tool_def, index, staged.path, source) if structured else None
+            worst_status = _run_command(
+                cmd, tool_def, cwd, all_output, worst_status, stdin=stdin or b"", parse=parse, reports=reports
+            )
+        # Report the staged file, not its temp copy
+        all_output = [output.replace(file_arg, staged.path) for output in all_output]
+
+    return ToolResult(
+        name=tool_def["binary"],
+        status=worst_status,
+        output="\n".join(all_output),
+        diagnostics=[d for report in reports for d in report] if reports else None,
+    )
+
+
+def lint_batch(jobs: list[tuple], run, workers: Optional[int] = None) -> list:
+    """run(*job) for every job across a thread pool, results in job order.
+
+    Tools are separate processes, so threads are enough to use every core.
+    """
+    if len(jobs) <= 1:
+        return [run(*job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+        return list(pool.map(lambda job: run(*job), jobs))
+
+
+def lint_staged(
+    output_format: str = "text",
+    repo_root: Optional[Path] = None,
+    on_result: Optional[Callable[[str, str, ToolResult], None]] = None,
+    structured: bool = False,
+) -> tuple[str, int]:
+    """Check the staged content of every staged file; the worktree is left untouched.
+
+    Uses the same toolset selection as lint_file, but runs each tool's
+    check_commands (no fixing) in parallel. Custom commands from config are
+    fixers, so files they cover are not checked here.
+
+    With on_result, results are passed to it as each check exits and no
+    output is built.
+    """
+    if repo_root is None:
+        top = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True)
+        if top.returncode != 0:
+            return "not in a git repository", 2
+        repo_root = Path(top.stdout.strip())
+
+    try:
+        staged_files = read_staged_files(repo_root)
+    except RuntimeError as e:
+        return str(e), 2
+
+    plans = []
+    jobs = []
+    for staged in staged_files:
+        toolset = EXTENSION_TO_TOOLSET.get(Path(staged.path).suffix.lower())
+        if not toolset or any(line.lstrip().startswith(CONFLICT_MARKERS) for line in staged.content.splitlines()):
+            continue
+        project_root = find_project_root(staged.path)
+        config = load_config(project_root)
+        if config.disabled or not config.use_default or is_excluded(config, staged.path, project_root):
+            continue
+        tools = select_tools(toolset, project_root, start_dir=Path(staged.path).parent)
+        plans.append((staged.path, toolset, len(tools)))
+        jobs.extend((staged, tool_name, project_root, structured) for tool_name in tools)
+
+    if on_result:
+        toolsets = {path: toolset for path, toolset, _ in plans}
+        exit_code = 0
+        for staged, result in stream_map(lambda job: (job[0], check_staged(*job)), jobs):
+            if result:
+                on_result(staged.path, toolsets[staged.path], result)
+                exit_code = max(exit_code, EXIT_CODES[result.status])
+        return "", exit_code
+
+    results = iter(lint_batch(jobs, check_staged))
+    outputs = []
+    exit_code = 0
+    for path, toolset, count in plans:
+        file_results = [r for r in (next(results) for _ in range(count)) if r]
+        skipped = [r for r in file_results if r.status == Status.SKIPPED]
+        ran = [r for r in file_results if r.status != Status.SKIPPED]
+        code = 0
+        if output_format == "json":
+            for result in ran:
+                result.version = binary_version(shutil.which(result.name))
+            if ran:
+                output, code = format_json_output(path, toolset, ran)
+                outputs.append(json.loads(output))
+            if skipped:
+                skipped_results = [{"tool": r.name, "status": r.status.value, "output": r.output} for r in skipped]
+                outputs.append({"file": path, "toolset": toolset, "status": "skipped", "results": skipped_results})
+        else:
+            output, code = format_text_output(path, ran)
+            if output:
+                outputs.append(output)
+            outputs.extend(f"- {r.name} {Path(path).name}: skipped, {r.output}" for r in skipped)
+        exit_code = max(exit_code, code)
+
+    if output_format == "json":
+        return json.dumps(outputs, indent=2), exit_code
+    return "\n".join(outputs), exit_code
+
+
+# =============================================================================
+# Watch Mode
+# =============================================================================
+
+# inotify(7) flags
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_ONLYDIR
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def parse_inotify_events(data: bytes) -> Iterator[tuple[int, int, str]]:
+    """(watch descriptor, mask, name) for each struct inotify_event in a read() buffer."""
+    offset = 0
+    while offset + INOTIFY_EVENT.size <= len(data):
+        wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+        offset += INOTIFY_EVENT.size
+        name = data[offset : offset + length].rstrip(b"\0")
+        offset += length
+        yield wd, mask, os.fsdecode(name)
+
+
+class InotifyWatcher:
+    """Changed files under a tree, from Linux inotify via ctypes (no dependencies).
+
+    Every directory the gitignore-aware walk visits gets a watch; directories
+    created later are watched as they appear, unless the .gitignore rules
+    above them ignore them.
+    """
+
+    def __init__(self, root: str):
+        self._root = os.path.abspath(root)
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, str] = {}
+        try:
+            for directory, _, _ in walk_tree(self._root):
+                self._add_watch(directory, strict=True)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str, strict: bool = False) -> None:
+        import ctypes
+
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), INOTIFY_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+        elif strict:
+            # e.g. ENOSPC: over fs.inotify.max_user_watches
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def changes(self, timeout: Optional[float]) -> set[str]:
+        """Files written within timeout seconds (None: wait for the first)."""
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        changed: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            for wd, mask, name in parse_inotify_events(data):
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    rules = ignore_rules_above(path, self._root, is_dir=True)
+                    if mask & (IN_CREATE | IN_MOVED_TO) and rules is not None:
+                        # Files may land before the new watch is in place, so report them too
+                        for sub, _, files in walk_tree(path, inherited=rules):
+                            self._add_watch(sub)
+                            changed.update(os.path.join(sub, f) for f in files)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Changed files under a tree, found by rescanning stat info every interval."""
+
+    def __init__(self, root: str, interval: float = 1.0):
+        self._root = root
+        self._interval = interval
+        self._seen = self._scan()
+
+    def _scan(self) -> dict[str, tuple]:
+        return {path: stamp for path in walk_files(self._root) if (stamp := file_stamp(path))}
+
+    def changes(self, timeout: Optional[float]) -> set[str]:
+        """Files added or modified since the last call, checked after timeout (None: poll until some are)."""
+        while True:
+            time.sleep(self._interval if timeout is None else timeout)
+            current = self._scan()
+            changed = {path for path, stamp in current.items() if self._seen.get(path) != stamp}
+            self._seen = current
+            if changed or timeout is not None:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def file_stamp(path: str) -> Optional[tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of a file, or None if it's gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def make_watcher(root: str, poll: bool = False, interval: float = 1.0):
+    """InotifyWatcher where available, else PollingWatcher."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+def watchable(path: str, root: str) -> bool:
+    """Whether a changed file should be linted: a lintable extension, not
+    ignored by git under root and not excluded by lint_on_write.exclude."""
+    if os.path.splitext(path)[1].lower() not in EXTENSION_TO_TOOLSET:
+        return False
+    if ignore_rules_above(path, root, is_dir=False) is None:
+        return False
+    project_root = find_project_root(path)
+    return not is_excluded(load_config(project_root), path, project_root)
+
+
+def watch_batches(
+    watcher,
+    debounce: float = 0.2,
+    max_wait: float = 2.0,
+    root: Optional[str] = None,
+) -> Iterator[list[str]]:
+    """Yield batches of changed lintable files, one per burst of writes.
+
+    After the first change, events are coalesced until debounce seconds pass
+    quietly (or max_wait in total), so an editor saving 20 files yields one
+    batch. Once the consumer resumes the generator (after linting), each
+    file's stamp is remembered: the formatter's own rewrite then matches it
+    and doesn't trigger another round.
+
+    With root, files git ignores under it, or that the project config
+    excludes, are dropped (see watchable).
+    """
+    settled: dict[str, tuple] = {}
+    while True:
+        changed = watcher.changes(None)
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
+            more = watcher.changes(min(debounce, max(0.0, deadline - time.monotonic())))
+            if not more:
+                break
+            changed |= more
+        batch = sorted(
+            path
+            for path in changed
+            if (watchable(path, root) if root else os.path.splitext(path)[1].lower() in EXTENSION_TO_TOOLSET)
+            and (stamp := file_stamp(path)) is not None
+            and settled.get(path) != stamp
+        )
+        if not batch:
+            continue
+        yield batch
+        settled.update({path: stamp for path in batch if (stamp := file_stamp(path))})
+
+
+def watch(
+    directory: str,
+    output_format: str = "text",
+    poll: bool = False,
+    debounce: float = 0.2,
+    structured: bool = False,
+) -> None:
+    """Lint (and fix) files under directory as they are saved, until interrupted.
+
+    With jsonl output each batch ends with its own summary record; with
+    sarif each batch is one SARIF log.
+    """
+    watcher = make_watcher(directory, poll=poll)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"Watching {os.path.abspath(directory)} ({kind}); Ctrl-C to stop", file=sys.stderr, flush=True)
+    writer = make_writer(output_format)
+    on_result = writer.record if writer else None
+    try:
+        for batch in watch_batches(watcher, debounce=debounce, root=directory):
+            # Config files may have been added, removed or moved since the last batch
+            clear_lookup_caches()
+            linted = lint_paths(batch, output_format=output_format, on_result=on_result, structured=structured)
+            for _, output, _ in linted:
+                if output:
+                    print(output, flush=True)
+            if writer:
+                writer.summary()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
 # =============================================================================
 # Main Entry Points
 # =============================================================================
@@ -882,14 +2228,20 @@ def lint_file(
     file_path: str,
     output_format: str = "text",
     config: Optional[LintConfig] = None,
+    on_result: Optional[Callable[[str, str, ToolResult], None]] = None,
+    structured: bool = False,
 ) -> tuple[str, int]:
     """
     Lint a file and return formatted output.
 
     Args:
         file_path: Path to file to lint
-        output_format: One of "text", "json", "hook"
+        output_format: One of "text", "json", "jsonl", "sarif", "hook"
         config: Optional LintConfig (loaded from mr-sparkle.config.yml)
+        on_result: Called with (file, toolset, result) as each tool exits;
+            required for "jsonl" and "sarif", which return no output of their own
+        structured: Report through tools' JSON reporters (always on for
+            "sarif", and when the config sets output.diagnostics)
 
     Returns:
         Tuple of (formatted_output, exit_code)
@@ -907,8 +2259,8 @@ def lint_file(
     if config is None:
         config = load_config(project_root)
 
-    # Config says linting is disabled (tools: [])
-    if config.disabled:
+    # Config says linting is disabled (tools: []) or excludes this file
+    if config.disabled or is_excluded(config, file_path, project_root):
         return "", 0
 
     # Check for custom commands from config
@@ -916,8 +2268,12 @@ def lint_file(
 
     if custom_commands is not None:
         # Custom commands mode - bypass autodetection entirely
-        results = run_custom_commands(file_path, custom_commands, project_root)
         toolset = "custom"
+        results = []
+        for result in iter_custom_commands(file_path, custom_commands, project_root):
+            results.append(result)
+            if on_result:
+                on_result(file_path, toolset, result)
     elif not config.use_default:
         # Custom config but no matching extension - skip this file
         return "", 0
@@ -928,20 +2284,27 @@ def lint_file(
         if not toolset:
             return "", 0
 
-        tools_to_run = select_tools(toolset, project_root)
+        tools_to_run = select_tools(toolset, project_root, start_dir=Path(file_path).parent)
         if not tools_to_run:
             return "", 0
 
+        structured = structured or output_format == "sarif" or config.output.diagnostics
         results = []
         for tool_name in tools_to_run:
-            result = run_tool(file_path, tool_name, project_root)
+            result = run_tool(file_path, tool_name, project_root, structured=structured)
             if result:
                 results.append(result)
+                if on_result:
+                    on_result(file_path, toolset, result)
 
     if not results:
         return "", 0
 
-    if output_format == "json":
+    if output_format in ("jsonl", "sarif"):
+        return "", max(EXIT_CODES[r.status] for r in results)
+    elif output_format == "json":
+        for result in results:
+            result.version = binary_version(shutil.which(result.name))
         return format_json_output(file_path, toolset, results)
     elif output_format == "hook":
         return format_hook_output(file_path, results, output_config=config.output)
@@ -949,6 +2312,53 @@ def lint_file(
         return format_text_output(file_path, results)
 
 
+def stream_map(run, items: Iterable, workers: Optional[int] = None) -> Iterator:
+    """run(item) for each item across a thread pool, yielded as each finishes.
+
+    Items are pulled lazily with a bounded number in flight, so a streaming
+    source (e.g. walk_files) keeps the pool busy before it is exhausted.
+    """
+    workers = workers or os.cpu_count() or 4
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for item in items:
+            pending.add(pool.submit(run, item))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def expand_paths(paths: Iterable[str]) -> Iterator[str]:
+    """Files named directly, plus every lintable file under named directories (gitignore-aware)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for file_path in walk_files(path):
+                if os.path.splitext(file_path)[1].lower() in EXTENSION_TO_TOOLSET:
+                    yield file_path
+        else:
+            yield path
+
+
+def lint_paths(
+    paths: Iterable[str],
+    output_format: str = "text",
+    on_result: Optional[Callable[[str, str, ToolResult], None]] = None,
+    structured: bool = False,
+) -> Iterator[tuple[str, str, int]]:
+    """Lint many files in parallel: (file, formatted output, exit code) as each finishes.
+
+    paths may be a lazy stream; linting starts with the first path.
+    """
+
+    def run(path: str) -> tuple[str, str, int]:
+        return (path, *lint_file(path, output_format=output_format, on_result=on_result, structured=structured))
+
+    yield from stream_map(run, paths)
+
+
 def detect_file(file_path: str) -> str:
     """Run detection for a file and return YAML-formatted results."""
     project_root = find_project_root(file_path)
@@ -977,7 +2387,8 @@ def detect_file(file_path: str) -> str:
     if custom:
         info["custom_commands"] = custom
     elif toolset:
-        selected = select_tools(toolset, project_root)
+        start_dir = Path(file_path).parent
+        selected = select_tools(toolset, project_root, start_dir=start_dir)
         info["selected_tools"] = selected
 
         # Check which tools are installed
@@ -987,17 +2398,244 @@ def detect_file(file_path: str) -> str:
             binary = shutil.which(tool_def["binary"])
             installed[tool_name] = str(binary) if binary else None
         info["tools_installed"] = installed
+        info["tool_versions"] = {tool_name: binary_version(binary) for tool_name, binary in installed.items()}
 
         # Check config detection per tool
         if project_root:
             config_found = {}
+            config_dirs = {}
             for tool_name in selected:
-                config_found[tool_name] = has_project_config(tool_name, project_root)
+                config_dir = find_tool_config_dir(tool_name, start_dir, project_root)
+                config_found[tool_name] = config_dir is not None
+                config_dirs[tool_name] = str(config_dir) if config_dir else None
             info["config_detected"] = config_found
+            info["config_dirs"] = config_dirs
 
     return json.dumps(info, indent=2)
 
 
+# Files whose presence makes a directory a project root (see find_project_root)
+PROJECT_MARKERS = ("package.json", "pyproject.toml", "Gemfile")
+
+
+def detect_repo(directory: str) -> str:
+    """Run detection for every lintable file under directory in a single walk.
+
+    Returns JSON with the project roots, each tool's binary and version, and
+    a per-directory map of toolsets: files, selected tools, whether they are
+    the fallback group, and where each tool's config comes from. The walk
+    is gitignore-aware (see walk_tree); project roots, configs and tool
+    config lookups are resolved once per directory rather than once per file.
+    """
+    top = Path(directory).resolve()
+
+    def rel(path: Optional[Path]) -> Optional[str]:
+        if path is None:
+            return None
+        return str(path.relative_to(top)) if path == top or top in path.parents else str(path)
+
+    roots: dict[Path, Optional[Path]] = {}
+    configs: dict[Optional[Path], LintConfig] = {}
+    tools: dict[str, dict] = {}
+    directories: dict[str, dict] = {}
+
+    for dirpath, dirnames, filenames in walk_tree(str(top)):
+        here = Path(dirpath)
+        # .git itself is pruned from the walk, so it needs its own check
+        if any(marker in filenames for marker in PROJECT_MARKERS) or (here / ".git").exists():
+            project_root = here
+        elif here == top:
+            project_root = find_project_root(str(top / "_"))
+        else:
+            project_root = roots[here.parent]
+        roots[here] = project_root
+
+        by_toolset: dict[str, list[str]] = {}
+        for name in sorted(filenames):
+            toolset = EXTENSION_TO_TOOLSET.get(Path(name).suffix.lower())
+            if toolset:
+                by_toolset.setdefault(toolset, []).append(name)
+        if not by_toolset:
+            continue
+
+        if project_root not in configs:
+            configs[project_root] = load_config(project_root)
+        config = configs[project_root]
+        config_file = project_root / ".claude" / CONFIG_FILENAME if project_root else None
+
+        entry: dict = {
+            "project_root": rel(project_root),
+            "config_file": rel(config_file) if config_file and config_file.is_file() else None,
+            "config_mode": "default" if config.use_default else ("disabled" if config.disabled else "custom"),
+            "toolsets": {},
+        }
+        for toolset, files in by_toolset.items():
+            info: dict = {"files": files}
+            if config.disabled:
+                pass
+            elif not config.use_default:
+                exts = sorted({Path(name).suffix.lower() for name in files})
+                info["custom_commands"] = {ext: find_custom_commands(config, f"x{ext}") for ext in exts}
+            else:
+                selected = select_tools(toolset, project_root, start_dir=here)
+                config_dirs = {name: find_tool_config_dir(name, here, project_root) for name in selected}
+                info["tools"] = selected
+                info["fallback"] = all(d is None for d in config_dirs.values())
+                info["config_sources"] = {
+                    name: rel(d / config_source(name, d)) if d and config_source(name, d) else None
+                    for name, d in config_dirs.items()
+                }
+                for name in selected:
+                    if name not in tools:
+                        binary = shutil.which(TOOLS[name]["binary"])
+                        tools[name] = {"binary": binary, "version": binary_version(binary)}
+            entry["toolsets"][toolset] = info
+        directories[rel(here)] = entry
+
+    report = {
+        "root": str(top),
+        "project_roots": sorted({rel(r) for r in roots.values() if r is not None}),
+        "tools": dict(sorted(tools.items())),
+        "directories": dict(sorted(directories.items())),
+    }
+    return json.dumps(report, indent=2)
+
+
+# Generated, vendored or installed directories worth excluding from lint_on_write
+GENERATED_DIRS = {
+    "dist",
+    "build",
+    "out",
+    "coverage",
+    "target",
+    "vendor",
+    ".next",
+    ".nuxt",
+    "generated",
+    "__generated__",
+    "node_modules",
+    ".venv",
+    "venv",
+}
+
+# Files that may hold tool config besides the tools' own config_indicators
+SHARED_CONFIG_FILES = {"package.json", "pyproject.toml", "Gemfile", "setup.cfg"}
+
+
+def discover(directory: str) -> dict:
+    """Survey a repo's ecosystem and recommend an mr-sparkle config.
+
+    One gitignore-aware walk tallies files per toolset and extension and
+    finds existing linter configs; generated directories seen (or pruned)
+    along the way become exclude recommendations. The result holds the
+    survey plus "config", the recommended lint_on_write section.
+    """
+    top = Path(directory).resolve()
+    pruned: list[str] = []
+    indicators = {cfg: name for name, tool in TOOLS.items() for cfg in tool.get("config_indicators", [])}
+
+    files = 0
+    toolsets: dict[str, dict] = {}
+    configs: dict[str, list[str]] = {}
+    generated: set[str] = set()
+    shared_dirs: set[str] = set()
+    for path in walk_files(str(top), pruned):
+        files += 1
+        relative = path[len(str(top).rstrip(os.sep)) + 1 :].replace(os.sep, "/")
+        parent, _, name = relative.rpartition("/")
+        generated.update(part for part in parent.split("/") if part in GENERATED_DIRS)
+        ext = os.path.splitext(name)[1].lower()
+        toolset = EXTENSION_TO_TOOLSET.get(ext)
+        if toolset:
+            tally = toolsets.setdefault(toolset, {"files": 0, "extensions": {}})
+            tally["files"] += 1
+            tally["extensions"][ext] = tally["extensions"].get(ext, 0) + 1
+        if name in indicators:
+            configs.setdefault(indicators[name], []).append(relative)
+        if name in SHARED_CONFIG_FILES:
+            shared_dirs.add(os.path.dirname(path))
+    generated.update(os.path.basename(path) for path in pruned if os.path.basename(path) in GENERATED_DIRS)
+
+    # pyproject/package.json/Gemfile/setup.cfg entries, checked once per directory holding one
+    for shared_dir in sorted(shared_dirs):
+        for name in TOOLS:
+            source = config_source(name, Path(shared_dir))
+            if source and source not in TOOLS[name].get("config_indicators", []):
+                configs.setdefault(name, []).append(os.path.relpath(Path(shared_dir) / source, top))
+
+    project_root = find_project_root(str(top / "_"))
+    for toolset, tally in toolsets.items():
+        selected = select_tools(toolset, project_root, start_dir=top)
+        tally["tools"] = selected
+        tally["configured"] = [name for name in selected if name in configs]
+        tally["installed"] = [name for name in selected if shutil.which(TOOLS[name]["binary"])]
+
+    # Explicit commands only when every toolset has configured tools to pin;
+    # otherwise autodetection's global/skill config fallbacks are the better default
+    explicit = bool(toolsets) and all(tally["configured"] for tally in toolsets.values())
+    if explicit:
+        tools = [
+            {
+                "file_ext": sorted(tally["extensions"]),
+                "commands": [shlex.join(cmd) for name in tally["tools"] for cmd in TOOLS[name]["commands"]],
+            }
+            for _, tally in sorted(toolsets.items())
+        ]
+    else:
+        tools = ["default"]
+    config = {"tools": tools}
+    if generated:
+        config["exclude"] = [f"{name}/" for name in sorted(generated)]
+
+    return {
+        "root": str(top),
+        "files": files,
+        "toolsets": dict(sorted(toolsets.items(), key=lambda item: -item[1]["files"])),
+        "linter_configs": dict(sorted(configs.items())),
+        "generated_dirs": sorted(generated),
+        "config": config,
+    }
+
+
+def recommended_config_yaml(survey: dict) -> str:
+    """Render discover()'s recommendation as a commented mr-sparkle.config.yml."""
+    lines = [f"# Recommended by lint.py --discover ({survey['files']} files scanned)", "#"]
+    for toolset, tally in survey["toolsets"].items():
+        sources = ", ".join(
+            name + (f" ({survey['linter_configs'][name][0]})" if name in survey["linter_configs"] else "")
+            for name in tally["tools"]
+        )
+        missing = [name for name in tally["tools"] if name not in tally["installed"]]
+        note = f"; not installed: {', '.join(missing)}" if missing else ""
+        lines.append(f"# {toolset:<10} {tally['files']:>7} files  {sources}{note}")
+    lines += ["lint_on_write:", "  tools:"]
+    for entry in survey["config"]["tools"]:
+        if entry == "default":
+            lines.append("    - default")
+            continue
+        lines.append(f"    - file_ext: [{', '.join(entry['file_ext'])}]")
+        lines.append("      commands:")
+        lines += [f"        - {command}" for command in entry["commands"]]
+    if survey["config"].get("exclude"):
+        lines.append("  exclude:")
+        lines += [f"    - {json.dumps(pattern)}" for pattern in survey["config"]["exclude"]]
+    return "\n".join(lines) + "\n"
+
+
+def handle_hook_input(hook_input: dict) -> str:
+    """Lint the file named in PostToolUse hook input. Returns hook JSON (or "")."""
+    if not isinstance(hook_input, dict):
+        return ""
+
+    tool_input = hook_input.get("tool_input", {})
+    file_path = tool_input.get("file_path") if isinstance(tool_input, dict) else None
+    if not file_path or not isinstance(file_path, str):
+        return ""
+
+    output, _ = lint_file(file_path, output_format="hook")
+    return output
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -1007,21 +2645,39 @@ def main():
 Examples:
   %(prog)s file.py                    Lint Python file
   %(prog)s file.md --format json      Lint markdown, JSON output
+  %(prog)s src/ docs/                 Lint every file under src/ and docs/
+  %(prog)s src/ --format jsonl        Stream a JSON record per tool result
+  %(prog)s src/ --format sarif        SARIF log for code scanning
   %(prog)s --stdin-hook               Read hook JSON from stdin
   %(prog)s --detect file.py           Show detection results
+  %(prog)s --detect-repo .            Show detection for every file under .
+  %(prog)s --discover . --write       Write a recommended config for .
+  %(prog)s --staged                   Check staged files (no fixing)
+  %(prog)s --watch src/               Lint files under src/ on save
         """,
     )
 
     parser.add_argument(
         "file",
         nargs="?",
-        help="File to lint",
+        help="File to lint (or a directory, linted in parallel)",
+    )
+    parser.add_argument(
+        "more_files",
+        nargs="*",
+        metavar="file",
+        help="More files or directories, linted in parallel",
     )
     parser.add_argument(
         "--format",
-        choices=["text", "json", "hook"],
+        choices=["text", "json", "jsonl", "sarif", "hook"],
         default="text",
-        help="Output format (default: text)",
+        help="Output format (default: text); jsonl streams a record per tool result, then a summary",
+    )
+    parser.add_argument(
+        "--diagnostics",
+        action="store_true",
+        help="Use tools' JSON reporters and include parsed diagnostics (implied by --format sarif)",
     )
     parser.add_argument(
         "--stdin-hook",
@@ -1033,6 +2689,42 @@ Examples:
         action="store_true",
         help="Show what autodetection finds for a file (does not run linting)",
     )
+    parser.add_argument(
+        "--detect-repo",
+        nargs="?",
+        const=".",
+        metavar="DIR",
+        help="Show autodetection for every lintable file under DIR (default: .) in one pass",
+    )
+    parser.add_argument(
+        "--discover",
+        nargs="?",
+        const=".",
+        metavar="DIR",
+        help="Survey DIR (default: .) and print a recommended mr-sparkle config",
+    )
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="With --discover, write the config to DIR/.claude/ (never overwrites)",
+    )
+    parser.add_argument(
+        "--watch",
+        nargs="?",
+        const=".",
+        metavar="DIR",
+        help="Lint files under DIR (default: .) as they are saved, until Ctrl-C",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check the staged content of all staged files (pre-commit; does not fix)",
+    )
 
     args = parser.parse_args()
 
@@ -1043,12 +2735,7 @@ Examples:
         except json.JSONDecodeError:
             sys.exit(0)
 
-        tool_input = hook_input.get("tool_input", {})
-        file_path = tool_input.get("file_path")
-        if not file_path or not isinstance(file_path, str):
-            sys.exit(0)
-
-        output, exit_code = lint_file(file_path, output_format="hook")
+        output = handle_hook_input(hook_input)
         if output:
             print(output, flush=True)
         sys.exit(0)  # Hooks should not block
@@ -1060,11 +2747,74 @@ Examples:
         print(detect_file(args.file))
         sys.exit(0)
 
+    if args.detect_repo:
+        print(detect_repo(args.detect_repo))
+        sys.exit(0)
+
+    if args.discover:
+        survey = discover(args.discover)
+        if args.format == "json":
+            print(json.dumps(survey, indent=2))
+        else:
+            print(recommended_config_yaml(survey), end="")
+        if args.write:
+            target = Path(survey["root"]) / ".claude" / CONFIG_FILENAME
+            if target.exists():
+                print(f"{target} already exists; not overwriting", file=sys.stderr)
+                sys.exit(1)
+            target.parent.mkdir(exist_ok=True)
+            target.write_text(recommended_config_yaml(survey))
+            print(f"Wrote {target}", file=sys.stderr)
+        sys.exit(0)
+
+    if args.watch:
+        watch(args.watch, output_format=args.format, poll=args.poll, structured=args.diagnostics)
+        sys.exit(0)
+
+    # Streaming formats - results reach the writer as each tool exits, from any mode below
+    writer = make_writer(args.format)
+    on_result = writer.record if writer else None
+    structured = args.diagnostics or args.format == "sarif"
+
+    # Pre-commit mode
+    if args.staged:
+        if writer:
+            # Output is only an error message here; results went to the writer
+            error, exit_code = lint_staged(on_result=on_result, structured=structured)
+            if error:
+                print(error, file=sys.stderr)
+            sys.exit(max(exit_code, writer.summary()))
+        output_format = "json" if args.format == "json" else "text"
+        output, exit_code = lint_staged(output_format=output_format, structured=structured)
+        if output:
+            print(output)
+        sys.exit(exit_code)
+
     # Normal CLI mode
     if not args.file:
-        parser.error("file is required unless using --stdin-hook or --detect")
+        parser.error("file is required unless using --stdin-hook, --detect, --detect-repo or --staged")
 
-    output, exit_code = lint_file(args.file, output_format=args.format)
+    if args.more_files or os.path.isdir(args.file):
+        # Batch mode - results print as each file finishes
+        exit_code = 0
+        documents = []
+        paths = expand_paths([args.file, *args.more_files])
+        linted = lint_paths(paths, output_format=args.format, on_result=on_result, structured=structured)
+        for _, output, code in linted:
+            exit_code = max(exit_code, code)
+            if output and args.format == "json":
+                documents.append(json.loads(output))
+            elif output:
+                print(output, flush=True)
+        if args.format == "json":
+            print(json.dumps(documents, indent=2))
+        elif writer:
+            writer.summary()
+        sys.exit(exit_code)
+
+    output, exit_code = lint_file(args.file, output_format=args.format, on_result=on_result, structured=structured)
+    if writer:
+        writer.summary()
 
     if output:
         print(output)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Shared loader for .claude/mr-sparkle.config.yml.
+
+Every mr-sparkle hook (lint.py, validate_commit_message.py,
+block_direct_invocations.sh) reads the same config file on every tool call.
+This module parses it once and writes a compiled JSON snapshot to the
+per-user cache directory, keyed by the config's path and stamped with the
+file's mtime and size, so nothing is written into the project. Later hook
+calls - in any session - read the snapshot with the stdlib alone, and only
+import PyYAML when the YAML has changed since the last compile.
+
+The cache lives in the plugin's data directory ($CLAUDE_PLUGIN_DATA, else
+${XDG_CACHE_HOME:-~/.cache}/mr-sparkle), never in the shared temp dir:
+cached configs name the commands lint.py runs. cache_dir() refuses a
+directory that isn't a real 0700 directory owned by the current user, and
+caching is then skipped.
+
+Cache layout:
+
+    <data dir>/cache/snapshots/<sha1 of config path>.json
+    {"mtime_ns": ..., "size": ..., "config": {...}}
+
+Lookup order: in-process memo, snapshot, then PyYAML.
+
+Usage:
+    sparkle_config.py --hook-get <key>     # Read hook JSON from stdin, print config[key] as JSON
+    sparkle_config.py --compile [DIR]      # Recompile DIR's snapshot (default: cwd)
+
+Exit codes:
+    0: Value printed (null when unset or no config) / snapshot compiled
+    1: Config exists but could not be loaded (e.g. PyYAML unavailable)
+"""
+
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+CONFIG_FILENAME = "mr-sparkle.config.yml"
+
+# In-process memo: config path -> ((mtime_ns, size), config)
+_MEMO: dict[str, tuple[tuple[int, int], dict]] = {}
+
+
+def config_path(project_root: Optional[Path]) -> Optional[Path]:
+    """Path to the project's mr-sparkle config, or None without a project root."""
+    if not project_root:
+        return None
+    return Path(project_root) / ".claude" / CONFIG_FILENAME
+
+
+def cache_dir() -> Optional[Path]:
+    """The per-user cache directory, created if needed. None when it isn't safe to use.
+
+    Only a real directory (not a symlink) owned by the current user with
+    mode 0700 is trusted - anyone who can write there controls the lint
+    commands lint.py runs.
+    """
+    data_dir = os.environ.get("CLAUDE_PLUGIN_DATA") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "mr-sparkle"
+    )
+    directory = Path(data_dir) / "cache"
+    try:
+        directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        st = os.lstat(directory)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) != 0o700:
+        return None
+    return directory
+
+
+def snapshot_path(path: Path) -> Optional[Path]:
+    """Compiled JSON snapshot of a config file, in the per-user cache. None without a usable cache."""
+    root = cache_dir()
+    if root is None:
+        return None
+    digest = hashlib.sha1(str(path).encode()).hexdigest()
+    return root / "snapshots" / f"{digest}.json"
+
+
+def _read_cache(cache_file: Optional[Path], key: tuple[int, int]) -> Optional[dict]:
+    """Return the cached config if it was stored for the same mtime/size."""
+    if cache_file is None:
+        return None
+    try:
+        data = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or (data.get("mtime_ns"), data.get("size")) != key:
+        return None
+    config = data.get("config")
+    return config if isinstance(config, dict) else None
+
+
+def _write_cache(cache_file: Optional[Path], key: tuple[int, int], config: dict) -> None:
+    """Atomically store a parsed config. Failures are ignored (cache is best-effort)."""
+    if cache_file is None:
+        return
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"mtime_ns": key[0], "size": key[1], "config": config}, f)
+        os.replace(tmp, cache_file)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def parse_yaml_file(path: Path) -> dict:
+    """Parse a YAML config file. Non-mapping documents become an empty dict.
+
+    Raises ImportError when PyYAML is unavailable and the usual read/parse
+    errors otherwise; callers decide how to degrade.
+    """
+    import yaml
+
+    result = yaml.safe_load(path.read_text())
+    return result if isinstance(result, dict) else {}
+
+
+def load_strict(project_root: Optional[Path]) -> dict:
+    """Load the raw config dict, raising if the file exists but can't be parsed."""
+    path = config_path(project_root)
+    if path is None:
+        return {}
+
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+
+    memo = _MEMO.get(str(path))
+    if memo and memo[0] == key:
+        return memo[1]
+
+    snapshot = snapshot_path(path)
+    config = _read_cache(snapshot, key)
+    if config is None:
+        config = parse_yaml_file(path)
+        _write_cache(snapshot, key, config)
+
+    _MEMO[str(path)] = (key, config)
+    return config
+
+
+def compile_snapshot(project_root: Path) -> Optional[Path]:
+    """Parse the YAML config and (re)write its snapshot. Returns the snapshot path.
+
+    Returns None when there is no config file or no usable cache directory.
+    Raises on parse errors.
+    """
+    path = config_path(project_root)
+    if path is None or not path.is_file():
+        return None
+    st = path.stat()
+    config = parse_yaml_file(path)
+    snapshot = snapshot_path(path)
+    _write_cache(snapshot, (st.st_mtime_ns, st.st_size), config)
+    _MEMO[str(path)] = ((st.st_mtime_ns, st.st_size), config)
+    return snapshot
+
+
+def load(project_root: Optional[Path]) -> dict:
+    """Load the raw config dict. Returns empty dict when missing or unreadable."""
+    try:
+        return load_strict(project_root)
+    except Exception:
+        return {}
+
+
+def load_for_hook(hook_input: dict) -> dict:
+    """Load config for a hook invocation using its cwd."""
+    cwd = hook_input.get("cwd") or ""
+    return load(Path(cwd) if cwd else None)
+
+
+def main():
+    """CLI entry point for shell hooks and config management."""
+    if len(sys.argv) in (2, 3) and sys.argv[1] == "--compile":
+        root = Path(sys.argv[2]) if len(sys.argv) == 3 else Path.cwd()
+        try:
+            snapshot = compile_snapshot(root)
+        except Exception as e:
+            print(f"could not compile {config_path(root)}: {e}", file=sys.stderr)
+            sys.exit(1)
+        if snapshot:
+            print(snapshot)
+        sys.exit(0)
+
+    if len(sys.argv) != 3 or sys.argv[1] != "--hook-get":
+        print(f"usage: {Path(sys.argv[0]).name} --hook-get <key> | --compile [DIR]", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        hook_input = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        hook_input = {}
+    if not isinstance(hook_input, dict):
+        hook_input = {}
+
+    cwd = hook_input.get("cwd") or ""
+    try:
+        config = load_strict(Path(cwd) if cwd else None)
+    except Exception:
+        sys.exit(1)
+
+    print(json.dumps(config.get(sys.argv[2])))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = []
+# ///
+"""
+Latency and accuracy benchmark for the Bash PreToolUse guards.
+
+Replays the labeled corpus (guard_corpus.py) through each guard hook and
+reports, per hook: throughput, per-command latency (p50/p95/max), and
+false positive / false negative counts against the labels. Guard changes
+can then be judged on speed and correctness together.
+
+Two modes:
+    in-process (default)  Times the rule engine on every corpus command,
+                          with a fresh parse per command as in a hook call.
+    --subprocess N        Runs the real hook scripts on N sampled commands,
+                          so latency includes interpreter startup.
+
+Usage:
+    ./bench_guards.py
+    ./bench_guards.py --size 10000 --seed 1
+    ./bench_guards.py --subprocess 200
+    ./bench_guards.py --json
+    ./bench_guards.py --show-errors     # Print each misclassified command
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import bash_guard  # noqa: E402
+import guard_corpus  # noqa: E402
+import shell_parse  # noqa: E402
+
+# Hook script -> the rule sets it enforces
+HOOKS = {
+    "bash_guard.py": bash_guard.RULE_SETS,
+    "block_direct_invocations.sh": ("direct",),
+    "block_unneeded_permission_triggers.sh": ("permission",),
+    "block_dangerous_commands.sh": ("dangerous",),
+}
+
+
+@dataclass
+class HookReport:
+    hook: str
+    commands: int = 0
+    seconds: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    max_ms: float = 0.0
+    false_positives: int = 0
+    false_negatives: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _score(report: HookReport, case: guard_corpus.Case, rule_sets: tuple, blocked: bool) -> None:
+    expected = bool(case.rule_sets & set(rule_sets))
+    if blocked and not expected:
+        report.false_positives += 1
+        report.errors.append(("FP", case.command, case.rule))
+    elif expected and not blocked:
+        report.false_negatives += 1
+        report.errors.append(("FN", case.command, case.rule))
+
+
+def _finish(report: HookReport, latencies: list[float]) -> HookReport:
+    latencies.sort()
+    report.commands = len(latencies)
+    report.seconds = sum(latencies)
+    report.p50_ms = _percentile(latencies, 0.5) * 1000
+    report.p95_ms = _percentile(latencies, 0.95) * 1000
+    report.max_ms = (latencies[-1] if latencies else 0.0) * 1000
+    return report
+
+
+def bench_in_process(hook: str, cases: list[guard_corpus.Case]) -> HookReport:
+    """Time the rule engine a hook runs, one command at a time."""
+    rule_sets = HOOKS[hook]
+    matcher = bash_guard.RuleMatcher(bash_guard.rules_for({}, rule_sets))
+    report = HookReport(hook)
+    latencies = []
+    for case in cases:
+        # A hook process parses each command once; don't let the cache hide that
+        shell_parse.parse.cache_clear()
+        start = time.perf_counter()
+        found = matcher.first_match(case.command)
+        latencies.append(time.perf_counter() - start)
+        _score(report, case, rule_sets, found is not None)
+    return _finish(report, latencies)
+
+
+def bench_subprocess(hook: str, cases: list[guard_corpus.Case]) -> HookReport:
+    """Run the hook script itself, as Claude Code would."""
+    rule_sets = HOOKS[hook]
+    script = HOOKS_DIR / hook
+    argv = ["bash", str(script)] if hook.endswith(".sh") else [sys.executable, str(script)]
+    report = HookReport(hook)
+    latencies = []
+    for case in cases:
+        payload = json.dumps({"tool_name": "Bash", "tool_input": {"command": case.command}})
+        start = time.perf_counter()
+        result = subprocess.run(argv, input=payload, capture_output=True, text=True)
+        latencies.append(time.perf_counter() - start)
+        _score(report, case, rule_sets, result.returncode == 2)
+    return _finish(report, latencies)
+
+
+def print_table(reports: list[HookReport], mode: str, corpus_size: int) -> None:
+    print(f"Guard benchmark ({mode}, {corpus_size} corpus commands)")
+    print()
+    print(f"{'hook':<40} {'cmds':>6} {'cmd/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'FP':>4} {'FN':>4}")
+    for r in reports:
+        print(
+            f"{r.hook:<40} {r.commands:>6} {r.per_second:>9.0f} {r.p50_ms:>8.3f} {r.p95_ms:>8.3f} "
+            f"{r.max_ms:>8.3f} {r.false_positives:>4} {r.false_negatives:>4}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Bash guard hooks against the labeled corpus")
+    parser.add_argument("--size", type=int, default=3000, help="Corpus size (default: 3000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument("--subprocess", type=int, metavar="N", help="Run the hook scripts on N sampled commands")
+    parser.add_argument("--hook", choices=list(HOOKS), action="append", help="Only benchmark these hooks")
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON")
+    parser.add_argument("--show-errors", action="store_true", help="Print misclassified commands")
+    args = parser.parse_args()
+
+    cases = guard_corpus.generate(args.size, args.seed)
+    hooks = args.hook or list(HOOKS)
+    if args.subprocess:
+        sample = random.Random(args.seed).sample(cases, min(args.subprocess, len(cases)))
+        reports = [bench_subprocess(hook, sample) for hook in hooks]
+        mode = "subprocess"
+    else:
+        reports = [bench_in_process(hook, cases) for hook in hooks]
+        mode = "in-process"
+
+    if args.json:
+        out = []
+        for r in reports:
+            data = asdict(r)
+            data["per_second"] = r.per_second
+            if not args.show_errors:
+                data.pop("errors")
+            out.append(data)
+        print(json.dumps({"mode": mode, "corpus_size": len(cases), "hooks": out}, indent=2))
+    else:
+        print_table(reports, mode, len(cases))
+        if args.show_errors:
+            for r in reports:
+                for kind, command, rule in r.errors:
+                    print(f"\n{r.hook} {kind} (label: {rule or 'allow'}):\n  {command!r}")
+
+    # Non-zero when any hook misclassified, so the benchmark can gate changes
+    sys.exit(1 if any(r.errors for r in reports) else 0)
+
+
+if __name__ == "__main__":
+    main()
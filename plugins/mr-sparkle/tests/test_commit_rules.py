@@ -0,0 +1,169 @@
+"""Tests for hooks/commit_rules.py commit-message rule engine."""
+
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+import commit_rules
+
+
+def check(message: str, specs: list = None) -> list[str]:
+    return commit_rules.rule_set(specs).check(message)
+
+
+# =============================================================================
+# Tests: Default rules
+# =============================================================================
+
+
+class TestDefaultRules:
+    @pytest.mark.parametrize(
+        "message,fragment",
+        [
+            ("fix bug \U0001f680", "emojis"),
+            ("fix thing\n\nCo-Authored-By: someone", "attribution"),
+            ("fix the thing.", "period"),
+            ("Fix: the thing", "capitalized type 'Fix:'"),
+            ("minor changes", "vague"),
+            ("x" * 201, "length 201"),
+        ],
+    )
+    def test_flags(self, message, fragment):
+        assert any(fragment in v for v in check(message))
+
+    def test_clean_message(self):
+        assert check("fix race condition in session cleanup") == []
+
+    def test_capitalized_type_is_a_whole_word(self):
+        assert check("Additional logging for hooks") == []
+
+    def test_subject_rules_ignore_body(self):
+        assert check("fix parser edge case\n\nThe body may end with a period.") == []
+
+    def test_violations_in_rule_order(self):
+        assert check("Update") == [
+            "starts with capitalized type 'Update' (user prefers lowercase)",
+            "too vague (user prefers specific descriptions)",
+        ]
+
+
+# =============================================================================
+# Tests: Rule types
+# =============================================================================
+
+
+class TestRuleTypes:
+    def test_regex_require(self):
+        specs = [{"type": "regex", "pattern": r"^[A-Z]+-\d+ ", "require": True, "message": "needs a ticket"}]
+        assert check("fix parser", specs) == ["needs a ticket"]
+        assert check("ABC-12 fix parser", specs) == []
+
+    def test_prefix(self):
+        specs = [{"type": "prefix", "values": ["wip"], "ignore_case": True, "message": "no {match} commits"}]
+        assert check("WIP: half done", specs) == ["no WIP: commits"]
+        assert check("wipe caches", specs) == []
+
+    def test_prefix_require(self):
+        specs = [{"type": "prefix", "values": ["feat", "fix"], "require": True, "message": "conventional type"}]
+        assert check("chore: bump", specs) == ["conventional type"]
+        assert check("fix: bump", specs) == []
+
+    def test_case(self):
+        specs = [{"type": "case", "first": "upper", "message": "capitalize"}]
+        assert check("fix parser", specs) == ["capitalize"]
+        assert check("Fix parser", specs) == []
+
+    def test_length_min_and_max(self):
+        specs = [{"type": "length", "min": 10, "max": 20, "message": "{length} chars"}]
+        assert check("short", specs) == ["5 chars"]
+        assert check("just the right size", specs) == []
+
+    def test_message_scope(self):
+        specs = [{"type": "regex", "pattern": "Signed-off-by:", "scope": "message", "require": True, "message": "sign off"}]
+        assert check("fix parser\n\nSigned-off-by: me", specs) == []
+        assert check("fix parser", specs) == ["sign off"]
+
+    def test_malformed_rules_skipped(self):
+        specs = [
+            {"type": "regex", "pattern": "("},
+            {"type": "length"},
+            {"type": "unknown"},
+            {"type": "regex", "pattern": "x", "scope": "footer"},
+            "nonsense",
+            {"type": "regex", "pattern": "bad", "message": "bad"},
+        ]
+        assert [r.name for r in commit_rules.rule_set(specs).rules] == ["regex"]
+
+    def test_default_entry_extends(self):
+        specs = ["default", {"type": "regex", "pattern": "wip", "message": "wip"}]
+        assert check("Fix wip.", specs) == [
+            "ends with period (user prefers no period)",
+            "starts with capitalized type 'Fix' (user prefers lowercase)",
+            "wip",
+        ]
+
+
+# =============================================================================
+# Tests: Union matcher
+# =============================================================================
+
+
+class TestUnionMatcher:
+    def test_shadowed_alternative_still_fires(self):
+        """Two rules matching at the same position both fire."""
+        specs = [
+            {"type": "regex", "pattern": "foo", "message": "a"},
+            {"type": "regex", "pattern": "foobar", "message": "b"},
+            {"type": "regex", "pattern": "o+b", "message": "c"},
+        ]
+        assert check("x foobar", specs) == ["a", "b", "c"]
+
+    def test_backreference_rules_searched_alone(self):
+        specs = [
+            {"type": "regex", "pattern": r"(\w+) \1", "message": "repeated word"},
+            {"type": "regex", "pattern": r"(\w)z", "message": "z"},
+        ]
+        ruleset = commit_rules.rule_set(specs)
+        union, united, alone = ruleset._scans["subject"]
+        assert [r.message for r in alone] == ["repeated word"]
+        assert check("fix the the parser", specs) == ["repeated word"]
+
+    def test_duplicate_named_groups_fall_back(self):
+        specs = [
+            {"type": "regex", "pattern": "(?P<w>foo)", "message": "a"},
+            {"type": "regex", "pattern": "(?P<w>bar)", "message": "b"},
+        ]
+        assert check("foo bar", specs) == ["a", "b"]
+
+    def test_compiled_once(self):
+        assert commit_rules.rule_set() is commit_rules.rule_set(["default"])
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            {"type": "regex", "pattern": "wip", "message": "no wip", "added": datetime.date(2024, 1, 1)},
+            {"type": "regex", "pattern": "wip", "message": "no wip", 1: "mixed key types"},
+            {"type": "regex", "pattern": "wip", "message": "no wip", "tags": {"a", "b"}},
+        ],
+    )
+    def test_specs_json_cannot_hold_still_compile(self, extra):
+        assert check("wip: stuff", [extra]) == ["no wip"]
+
+
+class TestRulesFromConfig:
+    @pytest.mark.parametrize(
+        "setting,expected",
+        [
+            (False, None),
+            (True, ["default"]),
+            ({"enabled": False, "rules": ["default"]}, None),
+            ({"rules": [{"type": "case", "first": "lower"}]}, [{"type": "case", "first": "lower"}]),
+            ({"rules": "default"}, ["default"]),
+            ("yes", ["default"]),
+        ],
+    )
+    def test_setting(self, setting, expected):
+        assert commit_rules.rules_from_config(setting) == expected
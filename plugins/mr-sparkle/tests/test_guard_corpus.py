@@ -0,0 +1,65 @@
+"""Accuracy tests for the Bash guards against the labeled corpus (guard_corpus.py)."""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+sys.path.insert(0, str(Path(__file__).parent))
+import bash_guard
+import bench_guards
+import guard_corpus
+
+CORPUS = guard_corpus.generate()
+
+
+class TestCorpus:
+    def test_is_reproducible(self):
+        assert guard_corpus.generate(200, seed=7) == guard_corpus.generate(200, seed=7)
+
+    def test_labels_name_real_rules(self):
+        names = {rule.name for rule in bash_guard.rules_for({})}
+        assert {case.rule for case in CORPUS} - {""} <= names
+
+    def test_covers_every_rule(self):
+        names = {rule.name for rule in bash_guard.rules_for({})}
+        assert names <= {case.rule for case in CORPUS}
+
+    def test_mixes_allowed_and_blocked(self):
+        kinds = Counter(case.kind for case in CORPUS)
+        assert kinds["blocked"] > 500
+        assert kinds["decoy"] > 200
+        assert kinds["safe"] + kinds["safe-chain"] + kinds["safe-pipeline"] > 1000
+        assert kinds["adversarial"] == len(guard_corpus.ADVERSARIAL)
+
+
+class TestGuardAccuracy:
+    @pytest.mark.parametrize("command,rule,shadowed", [(*entry, "")[:3] for entry in guard_corpus.ADVERSARIAL])
+    def test_hand_labeled_cases(self, command, rule, shadowed):
+        fired = bash_guard.check_command(command, bash_guard.rules_for({}))
+        assert (fired.name if fired else "") == rule
+        if shadowed:
+            later = bash_guard.check_command(command, bash_guard.DANGEROUS_RULES)
+            assert later.name == shadowed
+
+    def test_every_command_gets_its_label(self):
+        rules = bash_guard.rules_for({})
+        wrong = []
+        for case in CORPUS:
+            rule = bash_guard.check_command(case.command, rules)
+            if (rule.name if rule else "") != case.rule:
+                wrong.append((case.command, case.rule, rule.name if rule else ""))
+        assert wrong == []
+
+    @pytest.mark.parametrize("hook", list(bench_guards.HOOKS))
+    def test_no_false_positives_or_negatives_per_hook(self, hook):
+        report = bench_guards.bench_in_process(hook, CORPUS[:500])
+        assert report.commands == 500
+        assert (report.false_positives, report.false_negatives) == (0, 0), report.errors[:5]
+
+    @pytest.mark.parametrize("hook", list(bench_guards.HOOKS))
+    def test_adversarial_cases_per_hook(self, hook):
+        report = bench_guards.bench_in_process(hook, [case for case in CORPUS if case.kind == "adversarial"])
+        assert (report.false_positives, report.false_negatives) == (0, 0), report.errors[:5]
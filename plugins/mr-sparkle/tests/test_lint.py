@@ -1,8 +1,10 @@
 """Tests for skills/lint/scripts/lint.py universal linting CLI."""
 
 import json
+import os
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -189,6 +191,47 @@ class TestSelectTools:
         assert tools == ["prettier"]
 
 
+class TestFindToolConfigDir:
+    @pytest.fixture
+    def monorepo(self, tmp_path):
+        """Repo-level biome.json with a package that has its own package.json."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "biome.json").write_text("{}")
+        package = tmp_path / "packages" / "web"
+        (package / "src").mkdir(parents=True)
+        (package / "package.json").write_text('{"name": "web"}')
+        (package / "src" / "index.ts").write_text("export {};\n")
+        return tmp_path
+
+    def test_finds_repo_level_config_above_package(self, monorepo):
+        src = monorepo / "packages" / "web" / "src"
+        project_root = lint.find_project_root(str(src / "index.ts"))
+        assert project_root == monorepo / "packages" / "web"
+        assert lint.find_tool_config_dir("biome", src, project_root) == monorepo
+
+    def test_nearest_config_wins(self, monorepo):
+        package = monorepo / "packages" / "web"
+        (package / "biome.json").write_text("{}")
+        assert lint.find_tool_config_dir("biome", package / "src", package) == package
+
+    def test_stops_at_repo_root(self, tmp_path):
+        (tmp_path / "biome.json").write_text("{}")
+        repo = tmp_path / "repo"
+        (repo / ".git").mkdir(parents=True)
+        assert lint.find_tool_config_dir("biome", repo, repo) is None
+
+    def test_none_without_project_root(self, tmp_path):
+        assert lint.find_tool_config_dir("biome", tmp_path, None) is None
+
+    def test_select_tools_uses_nearest_config(self, monorepo):
+        package = monorepo / "packages" / "web"
+        (package / "package.json").write_text('{"devDependencies": {"eslint": "^9.0.0"}}')
+        # Package-level eslint dep would win at the project root alone...
+        assert lint.select_tools("js_ts", package) == ["eslint"]
+        # ...but biome is the higher-priority group and is configured at the repo root
+        assert lint.select_tools("js_ts", package, start_dir=package / "src") == ["biome"]
+
+
 # =============================================================================
 # Tests: Tool definitions
 # =============================================================================
@@ -969,3 +1012,893 @@ class TestDetectFile:
         data = json.loads(result)
         assert data["config_mode"] == "custom"
         assert data["custom_commands"] == ["ruff check --fix"]
+
+
+# =============================================================================
+# Tests: Staged mode
+# =============================================================================
+
+
+class TestLintStaged:
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """A git repo with a fake ruff and prettier (both fail on "bad" from stdin) on PATH."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        (bin_dir / "ruff").write_text('#!/bin/sh\nif grep -q bad; then echo "E1 bad"; exit 1; fi\n')
+        (bin_dir / "prettier").write_text('#!/bin/sh\nif grep -q bad; then echo "[warn] $2"; exit 1; fi\n')
+        for tool in bin_dir.iterdir():
+            tool.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:/usr/bin:/bin")
+
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+        (repo / "pyproject.toml").write_text("[tool.ruff]\n")
+        return repo
+
+    @staticmethod
+    def stage(repo, **files):
+        for name, content in files.items():
+            (repo / name.replace("_", ".")).write_text(content)
+        subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+
+    def test_checks_staged_content_not_worktree(self, repo):
+        self.stage(repo, bad_py="bad = 1\n")
+        (repo / "bad.py").write_text("fixed = 1\n")
+
+        output, code = lint.lint_staged(repo_root=repo)
+        assert code == 1
+        assert "E1 bad" in output
+        # Worktree untouched
+        assert (repo / "bad.py").read_text() == "fixed = 1\n"
+
+    def test_clean_staged_content_passes(self, repo):
+        self.stage(repo, good_py="x = 1\n")
+        (repo / "good.py").write_text("bad = 1\n")
+
+        output, code = lint.lint_staged(repo_root=repo)
+        assert code == 0
+        assert "good.py: OK" in output
+
+    def test_prettier_checks_staged_content_when_worktree_differs(self, repo):
+        self.stage(repo, a_yml="a: 1\n", b_yml="b: bad\n")
+        (repo / "a.yml").write_text("a: bad\n")
+        (repo / "b.yml").write_text("b: 2\n")
+
+        output, code = lint.lint_staged("json", repo_root=repo)
+        statuses = {Path(entry["file"]).name: entry["status"] for entry in json.loads(output)}
+        assert statuses == {"a.yml": "ok", "b.yml": "warning"}
+        assert code == 1
+
+    def test_reads_paths_with_newlines(self, repo):
+        self.stage(repo, good_py="x = 1\n")
+        (repo / "odd\nname.py").write_text("bad = 1\n")
+        subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+
+        staged = {Path(f.path).name: f.content for f in lint.read_staged_files(repo)}
+        assert staged["good.py"] == b"x = 1\n"
+        assert staged["odd\nname.py"] == b"bad = 1\n"
+
+    @pytest.mark.parametrize("cut", [5, -3])
+    def test_truncated_cat_file_output_is_reported(self, repo, monkeypatch, cut):
+        self.stage(repo, a_py="x = 1\n", b_py="y = 2\n")
+        run = subprocess.run
+
+        def truncating_run(cmd, **kwargs):
+            result = run(cmd, **kwargs)
+            if cmd[:2] == ["git", "cat-file"]:
+                result.stdout = result.stdout[:cut]
+            return result
+
+        monkeypatch.setattr(lint.subprocess, "run", truncating_run)
+        output, code = lint.lint_staged(repo_root=repo)
+        assert code == 2
+        assert "git cat-file output ended early" in output
+
+    def test_nothing_staged(self, repo):
+        assert lint.lint_staged(repo_root=repo) == ("", 0)
+
+    def test_streams_results_to_callback(self, repo):
+        self.stage(repo, bad_py="bad = 1\n", a_yml="a: 1\n")
+        seen = []
+        output, code = lint.lint_staged(repo_root=repo, on_result=lambda *args: seen.append(args))
+        assert (output, code) == ("", 1)
+        assert sorted((Path(f).name, toolset, r.name, r.status) for f, toolset, r in seen) == [
+            ("a.yml", "yaml", "prettier", lint.Status.OK),
+            ("bad.py", "python", "ruff", lint.Status.WARNING),
+        ]
+
+    def test_stdin_tools_get_the_file_name(self, repo, monkeypatch):
+        # Fake shfmt/shellcheck print their args; mdformat and markdownlint print the file they were given
+        bin_dir = repo.parent / "bin"
+        for tool in ("shfmt", "shellcheck"):
+            (bin_dir / tool).write_text('#!/bin/sh\necho "$(basename "$0") $*"; exit 1\n')
+        for tool in ("mdformat", "markdownlint-cli2"):
+            (bin_dir / tool).write_text('#!/bin/sh\nfor f; do :; done\necho "$f: $(cat "$f")"; exit 1\n')
+        for tool in bin_dir.iterdir():
+            tool.chmod(0o755)
+        self.stage(repo, run_bash="ls\n", tool_sh="#!/bin/bash\nls\n", notes_md="# Notes\n")
+        (repo / "notes.md").write_text("# Unstaged edit\n")
+
+        output, code = lint.lint_staged("json", repo_root=repo)
+        results = {
+            (Path(entry["file"]).name, result["tool"]): result["output"]
+            for entry in json.loads(output)
+            for result in entry["results"]
+        }
+        assert results[("run.bash", "shfmt")] == f"shfmt -d --filename {repo / 'run.bash'}"
+        assert results[("run.bash", "shellcheck")] == "shellcheck --shell=bash -"
+        # A shebang decides the dialect, as it does for shellcheck on the path
+        assert results[("tool.sh", "shellcheck")] == "shellcheck -"
+        # mdformat and markdownlint read a temp copy of the staged content named
+        # like the file; output names the staged file
+        assert results[("notes.md", "mdformat")] == f"{repo / 'notes.md'}: # Notes"
+        assert results[("notes.md", "markdownlint-cli2")] == f"{repo / 'notes.md'}: # Notes"
+        assert not list(repo.glob("mr-sparkle-staged-*"))
+        assert not list(Path(tempfile.gettempdir()).glob("mr-sparkle-staged-*"))
+
+    def test_lint_batch_keeps_job_order(self):
+        jobs = [(i,) for i in range(20)]
+        assert lint.lint_batch(jobs, lambda i: i * 2, workers=4) == [i * 2 for i in range(20)]
+
+    def test_all_tools_have_check_commands(self):
+        for name, tool in lint.TOOLS.items():
+            assert tool["check_commands"], f"{name} missing 'check_commands'"
+            fixing = {"--fix", "--write", "-w", "-a"}
+            assert not fixing & {arg for cmd in tool["check_commands"] for arg in cmd}, name
+
+
+# =============================================================================
+# Tests: Tool versions
+# =============================================================================
+
+
+class TestToolVersions:
+    @pytest.fixture
+    def fake_tool(self, tmp_path, monkeypatch):
+        """A fake ruff that counts its runs, with the version cache under tmp_path."""
+        monkeypatch.setenv("CLAUDE_PLUGIN_DATA", str(tmp_path))
+        monkeypatch.setattr(lint, "_VERSION_MEMO", {})
+        tool = tmp_path / "ruff"
+        tool.write_text(f'#!/bin/sh\necho run >> {tmp_path / "runs"}\necho "ruff 0.4.10"\n')
+        tool.chmod(0o755)
+        return tool
+
+    @staticmethod
+    def runs(tool) -> int:
+        runs = tool.parent / "runs"
+        return len(runs.read_text().splitlines()) if runs.exists() else 0
+
+    def test_parses_version(self, fake_tool):
+        assert lint.binary_version(str(fake_tool)) == "0.4.10"
+
+    def test_probe_cached_across_processes(self, fake_tool, monkeypatch):
+        lint.binary_version(str(fake_tool))
+        # A new process starts with an empty memo but reads the disk cache
+        monkeypatch.setattr(lint, "_VERSION_MEMO", {})
+        assert lint.binary_version(str(fake_tool)) == "0.4.10"
+        assert self.runs(fake_tool) == 1
+
+    def test_cache_only_in_private_directory(self, fake_tool, tmp_path, monkeypatch):
+        # Another user could plant versions in a directory they can write to
+        (tmp_path / "cache").mkdir(mode=0o700)
+        (tmp_path / "cache").chmod(0o777)
+        lint.binary_version(str(fake_tool))
+        monkeypatch.setattr(lint, "_VERSION_MEMO", {})
+        assert lint.binary_version(str(fake_tool)) == "0.4.10"
+        assert self.runs(fake_tool) == 2
+        assert not (tmp_path / "cache" / "tool-versions.json").exists()
+
+    def test_reprobes_after_upgrade(self, fake_tool, monkeypatch):
+        lint.binary_version(str(fake_tool))
+        fake_tool.write_text('#!/bin/sh\necho "ruff 0.5.0"\n')
+        os.utime(fake_tool, ns=(0, 10**18))
+        assert lint.binary_version(str(fake_tool)) == "0.5.0"
+
+    def test_shims_are_probed_every_time(self, fake_tool, tmp_path):
+        # pyenv/rbenv/asdf keep shims in a "shims" dir; the pinned version can change under them
+        shims = tmp_path / "shims"
+        shims.mkdir()
+        shim = shims / "ruff"
+        shim.write_text(f"#!/bin/sh\nexec {fake_tool} \"$@\"\n")
+        shim.chmod(0o755)
+        assert lint.binary_version(str(shim)) == "0.4.10"
+        assert lint.binary_version(str(shim)) == "0.4.10"
+        assert self.runs(fake_tool) == 2
+        assert not (tmp_path / "cache" / "tool-versions.json").exists()
+
+    def test_multiplexer_symlinks_are_shims(self, fake_tool, tmp_path):
+        # mise shims are symlinks to mise itself, shared by every tool
+        mise = tmp_path / "mise"
+        fake_tool.rename(mise)
+        ruff = tmp_path / "bin" / "ruff"
+        ruff.parent.mkdir()
+        ruff.symlink_to(mise)
+        assert lint.binary_version(str(ruff)) == "0.4.10"
+        assert lint._VERSION_MEMO == {}
+
+    def test_probe_runs_outside_the_lock(self, fake_tool, monkeypatch):
+        def probe(binary):
+            # Another thread can take the lock while a probe is running
+            assert lint._VERSION_LOCK.acquire(blocking=False)
+            lint._VERSION_LOCK.release()
+            return "1.0"
+
+        monkeypatch.setattr(lint, "_probe_version", probe)
+        assert lint.binary_version(str(fake_tool)) == "1.0"
+
+    def test_missing_binary(self):
+        assert lint.binary_version(None) is None
+        assert lint.binary_version("/nonexistent/ruff") is None
+
+    @pytest.mark.parametrize(
+        "output,expected",
+        [
+            ("black, 24.3.0 (compiled: yes)", "24.3.0"),
+            ("ShellCheck - shell script analysis tool\nversion: 0.9.0", "0.9.0"),
+            ("v3.7.0", "3.7.0"),
+            ("markdownlint-cli2 v0.13.0 (markdownlint v0.34.0)", "0.13.0"),
+            ("Version: 1.8.3-nightly.1", "1.8.3-nightly.1"),
+        ],
+    )
+    def test_version_pattern(self, output, expected):
+        assert lint.VERSION_PATTERN.search(output).group() == expected
+
+    def test_detect_reports_versions(self, python_project_with_ruff, fake_tool, monkeypatch):
+        monkeypatch.setenv("PATH", str(fake_tool.parent))
+        data = json.loads(lint.detect_file(str(python_project_with_ruff / "main.py")))
+        assert data["tool_versions"] == {"ruff": "0.4.10"}
+
+
+# =============================================================================
+# Tests: detect_repo
+# =============================================================================
+
+
+class TestDetectRepo:
+    @pytest.fixture
+    def monorepo(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\n")
+        (tmp_path / "tool.py").write_text("x = 1\n")
+        web = tmp_path / "packages" / "web"
+        (web / "src").mkdir(parents=True)
+        (web / "package.json").write_text('{"devDependencies": {"eslint": "^9"}}')
+        (web / "src" / "app.ts").write_text("export {}\n")
+        (web / "src" / "util.js").write_text("export {}\n")
+        (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+        (tmp_path / "node_modules" / "dep" / "index.js").write_text("")
+        return tmp_path
+
+    def test_per_directory_map(self, monorepo):
+        report = json.loads(lint.detect_repo(str(monorepo)))
+        assert report["project_roots"] == [".", "packages/web"]
+        assert set(report["directories"]) == {".", "packages/web", "packages/web/src"}
+
+        python = report["directories"]["."]["toolsets"]["python"]
+        assert python["files"] == ["tool.py"]
+        assert python["tools"] == ["ruff"]
+        assert python["fallback"] is False
+        assert python["config_sources"] == {"ruff": "pyproject.toml [tool.ruff]"}
+
+        src = report["directories"]["packages/web/src"]
+        assert src["project_root"] == "packages/web"
+        assert src["toolsets"]["js_ts"]["files"] == ["app.ts", "util.js"]
+        assert src["toolsets"]["js_ts"]["tools"] == ["eslint"]
+        assert src["toolsets"]["js_ts"]["config_sources"] == {"eslint": "packages/web/package.json"}
+        assert set(report["tools"]) == {"ruff", "eslint", "prettier"}
+
+    def test_matches_detect_file(self, monorepo):
+        report = json.loads(lint.detect_repo(str(monorepo)))
+        single = json.loads(lint.detect_file(str(monorepo / "packages" / "web" / "src" / "app.ts")))
+        assert report["directories"]["packages/web/src"]["toolsets"]["js_ts"]["tools"] == single["selected_tools"]
+
+    def test_custom_config(self, monorepo):
+        (monorepo / ".claude").mkdir()
+        (monorepo / ".claude" / "mr-sparkle.config.yml").write_text(
+            "lint_on_write:\n  tools:\n    - file_ext: [.py]\n      commands:\n        - ruff check\n"
+        )
+        entry = json.loads(lint.detect_repo(str(monorepo)))["directories"]["."]
+        assert entry["config_mode"] == "custom"
+        assert entry["config_file"] == ".claude/mr-sparkle.config.yml"
+        assert entry["toolsets"]["python"]["custom_commands"] == {".py": ["ruff check"]}
+
+
+class TestConfigSource:
+    @pytest.mark.parametrize(
+        "files,tool,expected",
+        [
+            ({"biome.json": "{}"}, "biome", "biome.json"),
+            ({"package.json": '{"dependencies": {"prettier": "3"}}'}, "prettier", "package.json"),
+            ({"Gemfile": 'gem "rubocop"\n'}, "rubocop", "Gemfile"),
+            ({"setup.cfg": "[isort]\n"}, "isort", "setup.cfg [isort]"),
+            ({}, "ruff", None),
+        ],
+    )
+    def test_names_the_source(self, tmp_path, files, tool, expected):
+        for name, content in files.items():
+            (tmp_path / name).write_text(content)
+        assert lint.config_source(tool, tmp_path) == expected
+
+
+# =============================================================================
+# Tests: gitignore-aware walk
+# =============================================================================
+
+
+class TestIgnoreRules:
+    RULES = ("*.pyc", "/build/", "docs/**/gen", "!keep.pyc", "a/**", "[!a]b.txt", "# comment", "")
+
+    @pytest.mark.parametrize(
+        "path,is_dir,expected",
+        [
+            ("m.pyc", False, True),
+            ("src/m.pyc", False, True),
+            ("src/keep.pyc", False, False),
+            ("build", True, True),
+            ("build", False, None),
+            ("src/build", True, None),
+            ("docs/gen", True, True),
+            ("docs/a/b/gen", False, True),
+            ("a/q/w", False, True),
+            ("a", True, None),
+            ("cb.txt", False, True),
+            ("ab.txt", False, None),
+        ],
+    )
+    def test_match(self, path, is_dir, expected):
+        assert lint.IgnoreRules(self.RULES).match(path, is_dir) is expected
+
+    def test_ignores_checks_parent_directories(self):
+        rules = lint.IgnoreRules(("dist/",))
+        assert rules.ignores("dist/app.js", is_dir=False)
+        assert rules.ignores("web/dist/chunks/1.js", is_dir=False)
+        assert not rules.ignores("distance.js", is_dir=False)
+
+
+class TestWalkFiles:
+    def test_matches_git(self, tmp_path):
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        for name in ["a.py", "b.log", "keep.log", "dist/x.js", "src/c.py", "src/gen/d.py", "src/e.tmp", "node_modules/m.js"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text("")
+        (tmp_path / ".gitignore").write_text("*.log\n!keep.log\ndist/\n")
+        (tmp_path / "src" / ".gitignore").write_text("gen/\n*.tmp\n")
+
+        pruned = []
+        walked = {Path(p).relative_to(tmp_path).as_posix() for p in lint.walk_files(str(tmp_path), pruned)}
+        git = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard"], cwd=tmp_path, capture_output=True, text=True
+        ).stdout.split()
+        assert walked - {"node_modules/m.js"} == set(git) - {"node_modules/m.js"}
+        assert "node_modules/m.js" not in walked
+        assert {Path(p).name for p in pruned} == {".git", "dist", "gen", "node_modules"}
+
+
+    def test_walk_tree_yields_parents_first(self, tmp_path):
+        for i in range(30):
+            (tmp_path / f"d{i}" / "sub" / "leaf").mkdir(parents=True)
+            (tmp_path / f"d{i}" / "sub" / "leaf" / "f.py").write_text("")
+        seen = set()
+        for directory, _, _ in lint.walk_tree(str(tmp_path), workers=8):
+            assert directory == str(tmp_path) or os.path.dirname(directory) in seen
+            seen.add(directory)
+        assert len(seen) == 1 + 30 * 3
+
+    def test_walk_files_is_lazy(self, tmp_path):
+        for i in range(50):
+            (tmp_path / f"d{i}").mkdir()
+            (tmp_path / f"d{i}" / "f.py").write_text("")
+        walker = lint.walk_files(str(tmp_path))
+        assert next(walker).endswith("f.py")
+        walker.close()
+
+
+class TestBatchLint:
+    def test_stream_map_pulls_lazily(self):
+        pulled = []
+
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        results = lint.stream_map(lambda i: i * 2, source(), workers=2)
+        first = next(results)
+        assert first in range(0, 200, 2)
+        assert len(pulled) < 100
+        assert sorted([first, *results]) == list(range(0, 200, 2))
+
+    def test_expand_paths(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("gen/\n")
+        for name in ["a.py", "notes.txt", "gen/b.py", "sub/c.md"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text("")
+        expanded = {Path(p).relative_to(tmp_path).as_posix() for p in lint.expand_paths([str(tmp_path)])}
+        assert expanded == {"a.py", "sub/c.md"}
+        assert list(lint.expand_paths(["x.txt"])) == ["x.txt"]
+
+    def test_lint_paths_lints_every_file(self, tmp_path):
+        paths = [str(tmp_path / f"f{i}.py") for i in range(10)]
+        with patch.object(lint, "lint_file", side_effect=lambda path, **kwargs: (path, 1)) as lint_file:
+            results = list(lint.lint_paths(iter(paths)))
+        assert sorted(r[0] for r in results) == paths
+        assert all(output == path and code == 1 for path, output, code in results)
+        assert lint_file.call_count == 10
+
+
+class TestJsonl:
+    def test_writer_emits_compact_records_and_summary(self):
+        import io
+
+        stream = io.StringIO()
+        writer = lint.JsonlWriter(stream)
+        writer.record("a.py", "python", lint.ToolResult("ruff", lint.Status.WARNING, "E1", version="1.0"))
+        writer.record("b.yml", "yaml", lint.ToolResult("prettier", lint.Status.SKIPPED, "worktree differs"))
+        assert writer.summary() == 1
+
+        lines = stream.getvalue().splitlines()
+        assert ", " not in lines[0]  # compact
+        records = [json.loads(line) for line in lines]
+        assert records[0] == {
+            "file": "a.py",
+            "toolset": "python",
+            "tool": "ruff",
+            "version": "1.0",
+            "status": "warning",
+            "output": "E1",
+        }
+        assert records[-1] == {
+            "summary": {"results": 2, "ok": 0, "warning": 1, "error": 0, "skipped": 1, "status": "warning"}
+        }
+
+    def test_summary_starts_a_new_count(self):
+        import io
+
+        writer = lint.JsonlWriter(io.StringIO())
+        writer.record("a.py", "python", lint.ToolResult("ruff", lint.Status.ERROR, version="1.0"))
+        assert writer.summary() == 2
+        assert writer.summary() == 0
+
+    def test_lint_file_reports_each_tool_as_it_exits(self, python_project_with_ruff):
+        file_path = str(python_project_with_ruff / "main.py")
+        seen = []
+
+        def run_tool(path, tool_name, project_root, structured=False):
+            # The previous tool was reported before this one started
+            assert len(seen) == ["ruff", "pylint"].index(tool_name)
+            return lint.ToolResult(tool_name, lint.Status.OK if tool_name == "ruff" else lint.Status.WARNING)
+
+        with patch.object(lint, "select_tools", return_value=["ruff", "pylint"]):
+            with patch.object(lint, "run_tool", side_effect=run_tool):
+                output, code = lint.lint_file(file_path, output_format="jsonl", on_result=lambda *a: seen.append(a))
+        assert (output, code) == ("", 1)
+        assert [(f, toolset, r.name) for f, toolset, r in seen] == [
+            (file_path, "python", "ruff"),
+            (file_path, "python", "pylint"),
+        ]
+
+    def test_cli_batch(self, tmp_path):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        (bin_dir / "ruff").write_text('#!/bin/sh\ncase "$*" in *bad*) echo "E1 bad"; exit 1;; esac\n')
+        (bin_dir / "ruff").chmod(0o755)
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "pyproject.toml").write_text("[tool.ruff]\n")
+        (project / "good.py").write_text("x = 1\n")
+        (project / "bad.py").write_text("x = 1\n")
+        script_path = Path(__file__).parent.parent / "skills" / "lint" / "scripts" / "lint.py"
+
+        result = subprocess.run(
+            [sys.executable, str(script_path), str(project), "--format", "jsonl"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PATH": f"{bin_dir}:/usr/bin:/bin", "TMPDIR": str(tmp_path)},
+        )
+        assert result.returncode == 1
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        # ruff check and ruff format are one result per file
+        assert sorted((Path(r["file"]).name, r["status"]) for r in records[:-1]) == [
+            ("bad.py", "warning"),
+            ("good.py", "ok"),
+        ]
+        assert records[-1]["summary"]["results"] == 2
+        assert records[-1]["summary"]["status"] == "warning"
+
+
+# =============================================================================
+# Tests: structured diagnostics
+# =============================================================================
+
+
+RUFF_JSON = json.dumps(
+    [
+        {"code": "F401", "message": "`os` imported but unused", "location": {"row": 1, "column": 8}},
+        {"code": None, "message": "SyntaxError: Expected an expression", "location": {"row": 3, "column": 5}},
+    ]
+)
+
+
+class TestDiagnostics:
+    @pytest.mark.parametrize(
+        "parser,stdout,expected",
+        [
+            (
+                "ruff",
+                RUFF_JSON,
+                [
+                    ("a.py", 1, 8, "F401", "warning", "`os` imported but unused"),
+                    ("a.py", 3, 5, None, "error", "SyntaxError: Expected an expression"),
+                ],
+            ),
+            (
+                "eslint",
+                '[{"filePath": "/x/a.py", "messages": [{"ruleId": "no-var", "severity": 2, "message": "Unexpected var",'
+                ' "line": 2, "column": 1}, {"ruleId": "eqeqeq", "severity": 1, "message": "Use ===", "line": 4,'
+                ' "column": 7}]}]',
+                [("a.py", 2, 1, "no-var", "error", "Unexpected var"), ("a.py", 4, 7, "eqeqeq", "warning", "Use ===")],
+            ),
+            (
+                "shellcheck",
+                '{"comments": [{"file": "-", "line": 3, "column": 6, "level": "style", "code": 2086,'
+                ' "message": "Double quote to prevent globbing"}]}',
+                [("a.py", 3, 6, "SC2086", "info", "Double quote to prevent globbing")],
+            ),
+            (
+                "rubocop",
+                '{"files": [{"path": "a.rb", "offenses": [{"severity": "convention",'
+                ' "cop_name": "Style/StringLiterals", "message": "Style/StringLiterals: Prefer single quotes.", "location": {"start_line": 1,'
+                ' "start_column": 5}}]}]}',
+                [("a.py", 1, 5, "Style/StringLiterals", "info", "Prefer single quotes.")],
+            ),
+            (
+                "biome",
+                '{"diagnostics": [{"category": "lint/suspicious/noDebugger", "severity": "error",'
+                ' "description": "Unexpected debugger statement.",'
+                ' "location": {"path": {"file": "a.js"}, "span": [11, 20]}}]}',
+                [("a.py", 2, 3, "lint/suspicious/noDebugger", "error", "Unexpected debugger statement.")],
+            ),
+        ],
+    )
+    def test_parsers(self, parser, stdout, expected):
+        source = "const x;\n  debugger;\n"
+        diagnostics = lint.DIAGNOSTIC_PARSERS[parser](stdout, "a.py", source)
+        assert [(d.path, d.line, d.col, d.rule, d.severity, d.message) for d in diagnostics] == expected
+
+    @pytest.mark.parametrize("parser", list(lint.DIAGNOSTIC_PARSERS))
+    def test_parsers_reject_non_reports(self, parser):
+        for stdout in ["", "a.py:1:1: F401 unused", "null"]:
+            with pytest.raises((ValueError, TypeError, AttributeError)):
+                lint.DIAGNOSTIC_PARSERS[parser](stdout, "a.py", None)
+
+    def test_render(self):
+        assert lint.Diagnostic("a.py", 1, 8, "F401", "warning", "unused").render() == "a.py:1:8: warning: unused [F401]"
+        assert lint.Diagnostic("a.py", None, None, None, "error", "bad").render() == "a.py: error: bad"
+
+    @pytest.fixture
+    def fake_ruff(self, tmp_path, monkeypatch):
+        """A ruff that prints RUFF_JSON when asked for JSON and plain text otherwise."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        (tmp_path / "report.json").write_text(RUFF_JSON)
+        (bin_dir / "ruff").write_text(
+            "#!/bin/sh\n"
+            '[ "$1" = format ] && exit 0\n'
+            f'case "$*" in *--output-format\\ json*) cat {tmp_path}/report.json;; *) echo "a.py:1:8: F401";; esac\n'
+            "exit 1\n"
+        )
+        (bin_dir / "ruff").chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:/usr/bin:/bin")
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\n")
+        (tmp_path / "a.py").write_text("import os\n")
+        return tmp_path
+
+    def test_run_tool_structured(self, fake_ruff):
+        file_path = str(fake_ruff / "a.py")
+        result = lint.run_tool(file_path, "ruff", fake_ruff, structured=True)
+        assert result.status == lint.Status.WARNING
+        assert [d.rule for d in result.diagnostics] == ["F401", None]
+        assert result.output.splitlines()[0] == f"{file_path}:1:8: warning: `os` imported but unused [F401]"
+
+    def test_run_tool_plain_by_default(self, fake_ruff):
+        result = lint.run_tool(str(fake_ruff / "a.py"), "ruff", fake_ruff)
+        assert result.diagnostics is None
+        assert result.output == "a.py:1:8: F401"
+
+    def test_unparseable_report_keeps_raw_output(self, fake_ruff):
+        (fake_ruff / "report.json").write_text("ruff crashed\n")
+        result = lint.run_tool(str(fake_ruff / "a.py"), "ruff", fake_ruff, structured=True)
+        assert result.diagnostics is None
+        assert result.output == "ruff crashed"
+
+    def test_json_output_includes_diagnostics(self, fake_ruff):
+        output, code = lint.lint_file(str(fake_ruff / "a.py"), output_format="json", structured=True)
+        result = json.loads(output)["results"][0]
+        assert code == 1
+        assert result["diagnostics"][0] == {
+            "path": str(fake_ruff / "a.py"),
+            "line": 1,
+            "col": 8,
+            "rule": "F401",
+            "severity": "warning",
+            "message": "`os` imported but unused",
+        }
+
+    def test_config_enables_diagnostics_for_hook(self, fake_ruff):
+        (fake_ruff / ".claude").mkdir()
+        (fake_ruff / ".claude" / "mr-sparkle.config.yml").write_text(
+            "lint_on_write:\n  output:\n    claude: true\n    diagnostics: true\n"
+        )
+        assert lint.load_config(fake_ruff).output.diagnostics is True
+        output, _ = lint.lint_file(str(fake_ruff / "a.py"), output_format="hook")
+        context = json.loads(output)["hookSpecificOutput"]["additionalContext"]
+        assert "warning: `os` imported but unused [F401]" in context
+
+    def test_format_sarif(self):
+        results = [
+            (
+                "/p/a.py",
+                lint.ToolResult(
+                    "ruff",
+                    lint.Status.WARNING,
+                    version="0.6.9",
+                    diagnostics=[
+                        lint.Diagnostic("/p/a.py", 1, 8, "F401", "warning", "unused"),
+                        lint.Diagnostic("/p/a.py", 2, None, "F401", "info", "unused again"),
+                    ],
+                ),
+            ),
+            ("/p/b.md", lint.ToolResult("markdownlint-cli2", lint.Status.WARNING, "b.md:1 MD041")),
+            ("/p/c.md", lint.ToolResult("markdownlint-cli2", lint.Status.OK)),
+            ("/p/d.yml", lint.ToolResult("prettier", lint.Status.SKIPPED, "worktree differs")),
+        ]
+        log = json.loads(lint.format_sarif(results))
+        assert log["version"] == "2.1.0"
+        ruff, markdownlint = log["runs"]
+        assert ruff["tool"]["driver"] == {"name": "ruff", "rules": [{"id": "F401"}], "version": "0.6.9"}
+        first, second = ruff["results"]
+        assert first["ruleId"] == "F401"
+        assert first["level"] == "warning"
+        assert first["locations"][0]["physicalLocation"] == {
+            "artifactLocation": {"uri": "file:///p/a.py"},
+            "region": {"startLine": 1, "startColumn": 8},
+        }
+        assert second["level"] == "note"
+        assert second["locations"][0]["physicalLocation"]["region"] == {"startLine": 2}
+        assert markdownlint["results"] == [
+            {
+                "level": "warning",
+                "message": {"text": "b.md:1 MD041"},
+                "locations": [{"physicalLocation": {"artifactLocation": {"uri": "file:///p/b.md"}}}],
+            }
+        ]
+
+    def test_cli_sarif(self, fake_ruff):
+        script_path = Path(__file__).parent.parent / "skills" / "lint" / "scripts" / "lint.py"
+        result = subprocess.run(
+            [sys.executable, str(script_path), str(fake_ruff / "a.py"), "--format", "sarif"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "TMPDIR": str(fake_ruff)},
+        )
+        assert result.returncode == 1
+        (run,) = json.loads(result.stdout)["runs"]
+        assert [r.get("ruleId") for r in run["results"]] == ["F401", None]
+
+
+# =============================================================================
+# Tests: exclude config and discovery
+# =============================================================================
+
+
+class TestExclude:
+    def test_load_config_parses_exclude(self, tmp_path):
+        (tmp_path / ".claude").mkdir()
+        (tmp_path / ".claude" / "mr-sparkle.config.yml").write_text("lint_on_write:\n  exclude:\n    - dist/\n")
+        config = lint.load_config(tmp_path)
+        assert config.use_default
+        assert config.exclude == ["dist/"]
+
+    def test_excluded_file_not_linted(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".claude").mkdir()
+        (tmp_path / ".claude" / "mr-sparkle.config.yml").write_text("lint_on_write:\n  exclude: [dist/, '*.gen.py']\n")
+        for name in ["dist/app.py", "src/m.gen.py", "src/m.py"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text("x = 1\n")
+
+        config = lint.load_config(tmp_path)
+        assert lint.is_excluded(config, str(tmp_path / "dist" / "app.py"), tmp_path)
+        assert lint.is_excluded(config, str(tmp_path / "src" / "m.gen.py"), tmp_path)
+        assert not lint.is_excluded(config, str(tmp_path / "src" / "m.py"), tmp_path)
+        with patch.object(lint, "run_tool") as run_tool:
+            assert lint.lint_file(str(tmp_path / "dist" / "app.py")) == ("", 0)
+        run_tool.assert_not_called()
+
+
+class TestDiscover:
+    @pytest.fixture
+    def project(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("dist/\n")
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\n")
+        for name in ["a.py", "b.py", "README.md", "dist/bundle.js", "node_modules/x/i.js"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text("")
+        return tmp_path
+
+    def test_survey(self, project):
+        survey = lint.discover(str(project))
+        assert survey["files"] == 5
+        assert survey["toolsets"]["python"]["files"] == 2
+        assert survey["toolsets"]["python"]["configured"] == ["ruff"]
+        assert survey["linter_configs"]["ruff"] == ["pyproject.toml [tool.ruff]"]
+        assert survey["generated_dirs"] == ["dist", "node_modules"]
+
+    def test_default_tools_when_a_toolset_is_unconfigured(self, project):
+        config = lint.discover(str(project))["config"]
+        assert config == {"tools": ["default"], "exclude": ["dist/", "node_modules/"]}
+
+    def test_explicit_tools_when_all_configured(self, project):
+        (project / "README.md").unlink()
+        config = lint.discover(str(project))["config"]
+        assert config["tools"] == [{"file_ext": [".py"], "commands": ["ruff check --fix", "ruff format"]}]
+
+    def test_recommended_yaml_round_trips(self, project):
+        import yaml
+
+        survey = lint.discover(str(project))
+        parsed = yaml.safe_load(lint.recommended_config_yaml(survey))
+        assert parsed == {"lint_on_write": survey["config"]}
+
+
+# =============================================================================
+# Tests: Watch mode
+# =============================================================================
+
+
+class TestWatch:
+    def test_parse_inotify_events(self):
+        data = lint.INOTIFY_EVENT.pack(1, lint.IN_CLOSE_WRITE, 0, 8) + b"a.py\0\0\0\0"
+        data += lint.INOTIFY_EVENT.pack(2, lint.IN_CREATE | lint.IN_ISDIR, 0, 0)
+        assert list(lint.parse_inotify_events(data)) == [
+            (1, lint.IN_CLOSE_WRITE, "a.py"),
+            (2, lint.IN_CREATE | lint.IN_ISDIR, ""),
+        ]
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_sees_writes_and_new_directories(self, tmp_path):
+        watcher = lint.InotifyWatcher(str(tmp_path))
+        try:
+            (tmp_path / "a.py").write_text("x = 1\n")
+            (tmp_path / "new" / "deep").mkdir(parents=True)
+            assert str(tmp_path / "a.py") in watcher.changes(1.0)
+            watcher.changes(0.2)
+            (tmp_path / "new" / "deep" / "b.py").write_text("x = 1\n")
+            assert watcher.changes(1.0) == {str(tmp_path / "new" / "deep" / "b.py")}
+        finally:
+            watcher.close()
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_skips_new_ignored_directories(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("dist/\n")
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / ".gitignore").write_text("gen/\n")
+        watcher = lint.InotifyWatcher(str(tmp_path))
+        try:
+            (tmp_path / "dist" / "sub").mkdir(parents=True)
+            (tmp_path / "src" / "gen").mkdir()
+            (tmp_path / "src" / "ok").mkdir()
+            (tmp_path / "dist" / "app.js").write_text("x\n")
+            (tmp_path / "dist" / "sub" / "bundle.js").write_text("x\n")
+            (tmp_path / "src" / "gen" / "out.js").write_text("x\n")
+            (tmp_path / "src" / "ok" / "a.js").write_text("x\n")
+            changed = watcher.changes(1.0) | watcher.changes(0.2)
+            assert changed == {str(tmp_path / "src" / "ok" / "a.js")}
+        finally:
+            watcher.close()
+
+    def test_ignore_rules_above(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("dist/\n*.log\n")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / ".gitignore").write_text("gen/\n")
+        root = str(tmp_path)
+        assert lint.ignore_rules_above(str(tmp_path / "dist" / "sub" / "a.js"), root, is_dir=False) is None
+        assert lint.ignore_rules_above(str(tmp_path / "pkg" / "gen"), root, is_dir=True) is None
+        assert lint.ignore_rules_above(str(tmp_path / "pkg" / "x.log"), root, is_dir=False) is None
+        assert lint.ignore_rules_above(str(tmp_path / "node_modules" / "a.js"), root, is_dir=False) is None
+        rules = lint.ignore_rules_above(str(tmp_path / "pkg" / "new"), root, is_dir=True)
+        assert [base for base, _ in rules] == [root, str(tmp_path / "pkg")]
+
+    def test_batches_drop_ignored_and_excluded_files(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("dist/\n")
+        (tmp_path / ".claude").mkdir()
+        (tmp_path / ".claude" / "mr-sparkle.config.yml").write_text("lint_on_write:\n  exclude: ['*.gen.py']\n")
+        paths = [tmp_path / "dist" / "a.py", tmp_path / "m.gen.py", tmp_path / "m.py"]
+        for path in paths:
+            path.parent.mkdir(exist_ok=True)
+            path.write_text("x = 1\n")
+        watcher = self.FakeWatcher([[str(p) for p in paths]])
+        batches = lint.watch_batches(watcher, debounce=0.01, root=str(tmp_path))
+        assert next(batches) == [str(tmp_path / "m.py")]
+
+    def test_config_lookups_refreshed_between_batches(self, tmp_path, monkeypatch):
+        (tmp_path / ".git").mkdir()
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+        seen = []
+
+        def lint_paths(batch, **kwargs):
+            seen.append(lint.find_tool_config_dir("ruff", tmp_path, tmp_path))
+            (tmp_path / "ruff.toml").write_text("")
+            return iter([])
+
+        def user_edit():
+            os.utime(path, ns=(10**18, 10**18))
+            return [str(path)]
+
+        class Watcher(self.FakeWatcher):
+            def changes(self, timeout):
+                if not self.rounds and timeout is None:
+                    raise KeyboardInterrupt  # Ctrl-C ends watch()
+                return super().changes(timeout)
+
+            def close(self):
+                pass
+
+        watcher = Watcher([[str(path)], [], user_edit, []])
+        monkeypatch.setattr(lint, "make_watcher", lambda root, poll: watcher)
+        monkeypatch.setattr(lint, "lint_paths", lint_paths)
+        lint.watch(str(tmp_path), debounce=0.01)
+        assert seen == [None, tmp_path]
+
+    def test_polling_watcher(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\n")
+        watcher = lint.PollingWatcher(str(tmp_path), interval=0.01)
+        assert watcher.changes(0.01) == set()
+        (tmp_path / "a.py").write_text("x = 22\n")
+        (tmp_path / "b.py").write_text("y = 1\n")
+        assert watcher.changes(0.01) == {str(tmp_path / "a.py"), str(tmp_path / "b.py")}
+
+    class FakeWatcher:
+        """Replays scripted rounds; each changes() call pops one (a list of paths, or a callable returning one)."""
+
+        def __init__(self, rounds):
+            self.rounds = list(rounds)
+
+        def changes(self, timeout):
+            if self.rounds:
+                round = self.rounds.pop(0)
+                return set(round() if callable(round) else round)
+            if timeout is None:
+                raise StopIteration
+            return set()
+
+    def test_burst_coalesces_into_one_batch(self, tmp_path):
+        paths = [str(tmp_path / f"f{i}.py") for i in range(20)]
+        for path in paths:
+            Path(path).write_text("x = 1\n")
+        watcher = self.FakeWatcher([paths[:5], paths[5:12], paths[12:], [str(tmp_path / "notes.txt")]])
+        batches = lint.watch_batches(watcher, debounce=0.01)
+        assert next(batches) == sorted(paths)
+
+    def test_own_rewrites_do_not_retrigger(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x=1\n")
+
+        def user_edit():
+            stamp = lint.file_stamp(str(path))
+            os.utime(path, ns=(stamp[0] + 10**9, stamp[0] + 10**9))
+            return [str(path)]
+
+        # Batch, then the formatter's own write event, then a real edit
+        watcher = self.FakeWatcher([[str(path)], [], [str(path)], [], user_edit, []])
+        batches = lint.watch_batches(watcher, debounce=0.01)
+        assert next(batches) == [str(path)]
+        # Linting rewrote the file before the consumer asked for more
+        path.write_text("x = 1\n")
+        assert next(batches) == [str(path)]
+        assert watcher.rounds == []
@@ -71,6 +71,28 @@ class TestThinWrapper:
             data = json.loads(result.stdout)
             assert "systemMessage" in data
 
+    def test_lint_errors_reported_on_stderr(self, monkeypatch, capsys):
+        """A lint.py bug still exits 0, but its traceback reaches stderr."""
+        import io
+
+        sys.path.insert(0, str(HOOK_PATH.parent))
+        sys.path.insert(0, str(HOOK_PATH.parent.parent / "skills" / "lint" / "scripts"))
+        import lint
+        import lint_on_write
+
+        def broken(hook_input):
+            raise KeyError("tool_input")
+
+        monkeypatch.setattr(lint, "handle_hook_input", broken)
+        monkeypatch.setattr(sys, "stdin", io.StringIO(json.dumps({"tool_input": {}})))
+        with pytest.raises(SystemExit) as exit_info:
+            lint_on_write.main()
+        assert exit_info.value.code == 0
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "lint.py failed" in captured.err
+        assert "KeyError: 'tool_input'" in captured.err
+
     def test_exits_zero_on_invalid_json(self, hook_script):
         """Hook should exit 0 even on invalid JSON (silent skip)."""
         result = subprocess.run(
@@ -0,0 +1,117 @@
+"""Tests for the run_python.sh hook launcher and the provision_env.sh environment it runs."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+LAUNCHER = Path(__file__).parent.parent / "hooks" / "run_python.sh"
+
+
+@pytest.fixture
+def probe_script(tmp_path):
+    """Script that reports which interpreter ran it and its pycache prefix."""
+    script = tmp_path / "probe.py"
+    script.write_text("import os, sys\nprint(sys.executable)\nprint(os.environ.get('PYTHONPYCACHEPREFIX', ''))\nprint(sys.argv[1:])\n")
+    return script
+
+
+def run_launcher(script: Path, data_dir: Path, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "CLAUDE_PLUGIN_DATA": str(data_dir)}
+    return subprocess.run(
+        ["bash", str(LAUNCHER), str(script), *args],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+class TestPinnedInterpreter:
+    def test_execs_pinned_python(self, tmp_path, probe_script):
+        data_dir = tmp_path / "data"
+        (data_dir / "pycache").mkdir(parents=True)
+        (data_dir / "python").symlink_to(sys.executable)
+
+        result = run_launcher(probe_script, data_dir, "--flag", "value")
+        assert result.returncode == 0
+        executable, pycache, argv = result.stdout.splitlines()
+        assert executable == str(data_dir / "python")
+        assert pycache == str(data_dir / "pycache")
+        assert argv == "['--flag', 'value']"
+
+    def test_dangling_pin_falls_back(self, tmp_path, probe_script):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "python").symlink_to(tmp_path / "gone" / "python")
+
+        result = run_launcher(probe_script, data_dir)
+        assert result.returncode == 0
+        assert result.stdout.splitlines()[0] != str(data_dir / "python")
+
+    def test_no_pycache_prefix_without_dir(self, tmp_path, probe_script):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "python").symlink_to(sys.executable)
+
+        result = run_launcher(probe_script, data_dir)
+        assert result.stdout.splitlines()[1] == ""
+
+
+PROVISION = Path(__file__).parent.parent / "hooks" / "provision_env.sh"
+
+
+class TestProvisionEnv:
+    @pytest.fixture
+    def fake_uv(self, tmp_path):
+        """A uv whose `venv` links bin/python to this interpreter and whose `pip install` does nothing."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        uv = bin_dir / "uv"
+        uv.write_text(
+            '#!/bin/sh\nif [ "$1" = venv ]; then\n'
+            f'  for a; do env="$a"; done; mkdir -p "$env/bin" && ln -s {sys.executable} "$env/bin/python"\nfi\n'
+        )
+        uv.chmod(0o755)
+        return bin_dir
+
+    @staticmethod
+    def old_env(data_dir: Path, name: str, days: int, ready: bool = True) -> Path:
+        env = data_dir / name
+        (env / "bin").mkdir(parents=True)
+        marker = env / ".ready" if ready else env
+        if ready:
+            marker.touch()
+        stamp = time.time() - days * 86400
+        os.utime(marker, (stamp, stamp))
+        return env
+
+    def provision(self, data_dir: Path, fake_uv: Path) -> Path:
+        env = {**os.environ, "CLAUDE_PLUGIN_DATA": str(data_dir), "PATH": f"{fake_uv}:{os.environ['PATH']}"}
+        subprocess.run(["bash", str(PROVISION)], env=env, check=True)
+        # Provisioning runs in the background; wait for the pin and the prune
+        pin = data_dir / "python"
+        deadline = time.time() + 10
+        while time.time() < deadline and not (pin.is_symlink() and not (data_dir / "provision.lock").exists()):
+            time.sleep(0.05)
+        return Path(os.readlink(pin)).parent.parent
+
+    def test_prunes_only_envs_unused_for_a_week(self, tmp_path, fake_uv):
+        data_dir = tmp_path / "data"
+        stale = self.old_env(data_dir, "env-111", days=30)
+        recent = self.old_env(data_dir, "env-222", days=1)
+        killed = self.old_env(data_dir, "env-333", days=30, ready=False)
+
+        pinned = self.provision(data_dir, fake_uv)
+        assert (pinned / ".ready").is_file()
+        assert sorted(p.name for p in data_dir.glob("env-*")) == sorted([pinned.name, recent.name])
+        assert not stale.exists() and not killed.exists()
+
+    def test_session_start_marks_pinned_env_used(self, tmp_path, fake_uv):
+        data_dir = tmp_path / "data"
+        pinned = self.provision(data_dir, fake_uv)
+        os.utime(pinned / ".ready", (0, 0))
+        assert self.provision(data_dir, fake_uv) == pinned
+        assert time.time() - (pinned / ".ready").stat().st_mtime < 60
@@ -0,0 +1,268 @@
+"""Tests for hooks/shell_parse.py command parser."""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+from shell_parse import git_subcommand, parse
+
+
+def argvs(command: str) -> list[tuple[str, ...]]:
+    return [cmd.argv for cmd in parse(command).commands]
+
+
+# =============================================================================
+# Tests: Lists and pipelines
+# =============================================================================
+
+
+class TestLists:
+    @pytest.mark.parametrize("separator", [";", "&&", "||", "&", "\n"])
+    def test_splits_commands(self, separator):
+        assert argvs(f"git add -A {separator} git status") == [("git", "add", "-A"), ("git", "status")]
+
+    def test_pipeline_groups_commands(self):
+        script = parse("git log | grep fix | head -5; ls")
+        assert [[cmd.name for cmd in p] for p in script.pipelines] == [["git", "grep", "head"], ["ls"]]
+
+    def test_subshell_commands_are_flattened(self):
+        assert argvs("(cd src && make)") == [("cd", "src"), ("make",)]
+
+    def test_command_text_is_source(self):
+        script = parse("ls -la  >out 2>&1 && echo 'done'")
+        assert [cmd.text for cmd in script.commands] == ["ls -la  >out 2>&1", "echo 'done'"]
+
+
+class TestWords:
+    def test_quote_removal(self):
+        assert argvs("""echo 'a b' "c d" e\\ f""") == [("echo", "a b", "c d", "e f")]
+
+    def test_operators_inside_quotes_are_text(self):
+        assert argvs('git commit -m "fix; sudo rm -rf / | sh"') == [("git", "commit", "-m", "fix; sudo rm -rf / | sh")]
+
+    def test_comment(self):
+        assert argvs("ls # sudo ls") == [("ls",)]
+
+    def test_hash_inside_word(self):
+        assert argvs("echo a#b") == [("echo", "a#b")]
+
+    def test_redirections_are_not_arguments(self):
+        assert argvs("sort < in 2> err >> out") == [("sort",)]
+
+    def test_leading_assignments_stripped(self):
+        assert argvs("FOO=1 BAR=2 make test") == [("make", "test")]
+
+    def test_wrappers_stripped(self):
+        assert [cmd.name for cmd in parse("env -u X FOO=1 nohup sudo ls").commands] == ["sudo"]
+
+    def test_command_lookup_runs_nothing(self):
+        assert argvs("command -v sudo") == [()]
+
+    @pytest.mark.parametrize(
+        "wrapper", ["timeout 10", "timeout -s KILL -k 5 1m", "stdbuf -oL -e 0", "ionice -c 3 -n 7", "nice -n 5 --"]
+    )
+    def test_wrapper_options_and_operands_stripped(self, wrapper):
+        assert argvs(f"{wrapper} rm -rf /") == [("rm", "-rf", "/")]
+
+
+class TestArgumentScripts:
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "bash -c 'rm -rf /'",
+            'sh -ec -- "rm -rf /"',
+            "zsh -o errexit -c 'rm -rf /'",
+            "eval rm '-rf /'",
+            "ssh -p 22 -tt host 'rm -rf /'",
+            "ssh host rm -rf /",
+            "watch -n 5 'rm -rf /'",
+        ],
+    )
+    def test_script_commands_are_flattened(self, command):
+        assert argvs(command)[1:] == [("rm", "-rf", "/")]
+
+    def test_doas_runs_its_arguments(self):
+        assert argvs("doas -u root sh -c 'ls; sudo ls'")[1:] == [("sh", "-c", "ls; sudo ls"), ("ls",), ("sudo", "ls")]
+
+    @pytest.mark.parametrize("command", ["bash script.sh", "ssh host", "bash -c", "eval"])
+    def test_no_script(self, command):
+        assert len(argvs(command)) == 1
+
+    def test_quoted_script_adds_no_permission_constructs(self):
+        script = parse("bash -c 'for f in $(ls); do echo $f; done'")
+        assert [cmd.name for cmd in script.commands] == ["bash", "ls", "echo"]
+        assert script.keywords == () and script.substitutions == ()
+
+    def test_deep_nesting_is_flagged(self):
+        assert parse("eval " * 80 + "ls").too_deep
+
+
+# =============================================================================
+# Tests: Substitutions and expansions
+# =============================================================================
+
+
+class TestSubstitutions:
+    def test_dollar_paren(self):
+        script = parse("echo $(whoami)")
+        assert [(s.kind, s.text) for s in script.substitutions] == [("$(", "$(whoami)")]
+        assert argvs("echo $(whoami)") == [("whoami",), ("echo", "$(whoami)")]
+
+    def test_inside_double_quotes(self):
+        assert parse('echo "user: $(whoami)"').substitutions[0].text == "$(whoami)"
+
+    def test_inside_single_quotes_is_text(self):
+        script = parse("grep '$(' file")
+        assert script.substitutions == ()
+        assert argvs("grep '$(' file") == [("grep", "$(", "file")]
+
+    def test_escaped_dollar_is_text(self):
+        assert parse('echo "\\$(x)"').substitutions == ()
+
+    def test_backticks(self):
+        script = parse("echo `date`")
+        assert [s.kind for s in script.substitutions] == ["`"]
+        assert script.commands[0].argv == ("date",)
+
+    def test_nested(self):
+        script = parse("echo $(dirname $(pwd))")
+        assert [s.text for s in script.substitutions] == ["$(pwd)", "$(dirname $(pwd))"]
+
+    def test_arithmetic_is_not_parsed_as_commands(self):
+        script = parse("echo $((dd + 1))")
+        assert [s.kind for s in script.substitutions] == ["$(("]
+        assert argvs("echo $((dd + 1))") == [("echo", "$((dd + 1))")]
+
+    def test_substitution_inside_arithmetic(self):
+        assert argvs("echo $(( $(sudo ls) + 1 ))") == [("sudo", "ls"), ("echo", "$(( $(sudo ls) + 1 ))")]
+        assert argvs("(( n = `id -u` ))") == [("id", "-u")]
+        assert argvs("for ((i=0; i<$(nproc); i++)); do :; done") == [("nproc",), (":",)]
+
+    def test_process_substitution(self):
+        script = parse("diff <(ls a) <(ls b)")
+        assert [s.kind for s in script.substitutions] == ["<(", "<("]
+        assert argvs("diff <(ls a) <(ls b)")[-1] == ("diff", "<(ls a)", "<(ls b)")
+
+    def test_braced_expansion(self):
+        assert parse('cat "${HOME}/x" $PATH').expansions == ("${HOME}",)
+
+    def test_braced_expansion_in_single_quotes_is_text(self):
+        assert parse("echo '${HOME}'").expansions == ()
+
+
+# =============================================================================
+# Tests: Heredocs
+# =============================================================================
+
+
+class TestHeredocs:
+    def test_body_attached_to_command(self):
+        script = parse("cat <<'EOF' > notes.txt\nsudo rm -rf /\nEOF\necho done")
+        assert argvs("cat <<'EOF' > notes.txt\nsudo rm -rf /\nEOF\necho done") == [("cat",), ("echo", "done")]
+        heredoc = script.commands[0].heredocs[0]
+        assert (heredoc.delimiter, heredoc.quoted, heredoc.body) == ("EOF", True, "sudo rm -rf /\n")
+
+    def test_commit_message_idiom(self):
+        command = 'git commit -m "$(cat <<\'EOF\'\nfix: thing\n\nfor loop; do it\nEOF\n)"'
+        script = parse(command)
+        assert script.keywords == ()
+        cat = script.commands[0]
+        assert cat.name == "cat"
+        assert cat.heredocs[0].body == "fix: thing\n\nfor loop; do it\n"
+        assert script.commands[1].argv[:3] == ("git", "commit", "-m")
+
+    def test_unquoted_delimiter_expands(self):
+        script = parse("cat <<EOF\n$(whoami)\nEOF")
+        assert [s.text for s in script.substitutions] == ["$(whoami)"]
+
+    def test_quoted_delimiter_does_not_expand(self):
+        assert parse("cat <<'EOF'\n$(whoami)\nEOF").substitutions == ()
+
+    def test_strip_tabs(self):
+        heredoc = parse("cat <<-END\n\tindented\n\tEND").commands[0].heredocs[0]
+        assert heredoc.body == "indented\n"
+
+
+# =============================================================================
+# Tests: Compound commands
+# =============================================================================
+
+
+class TestCompound:
+    def test_for_loop(self):
+        script = parse('for f in *.py; do wc -l "$f"; done')
+        assert script.keywords == ("for",)
+        assert argvs('for f in *.py; do wc -l "$f"; done') == [("wc", "-l", "$f")]
+
+    def test_arithmetic_for(self):
+        assert argvs("for ((i=0; i<3; i++)); do echo $i; done") == [("echo", "$i")]
+
+    def test_while_condition_is_a_command(self):
+        script = parse("cat f | while read -r l; do echo; done")
+        assert script.keywords == ("while",)
+        assert argvs("cat f | while read -r l; do echo; done") == [("cat", "f"), ("read", "-r", "l"), ("echo",)]
+
+    def test_keyword_in_argument_is_text(self):
+        assert parse("git commit -m 'refactor for loop; do it later'").keywords == ()
+        assert parse("echo for while until").keywords == ()
+
+    def test_if_and_group(self):
+        assert argvs("if test -f x; then { rm x; }; fi") == [("test", "-f", "x"), ("rm", "x")]
+
+    def test_case_patterns_are_not_commands(self):
+        assert argvs("case $1 in start) run;; stop|halt) halt;; esac") == [("run",), ("halt",)]
+
+    @pytest.mark.parametrize("wrapper", ["time", "time -p", "nice -n 5", "FOO=1 time"])
+    def test_keyword_after_wrapper(self, wrapper):
+        script = parse(f"{wrapper} for x in 1; do sudo ls; done")
+        assert script.keywords == ("for",)
+        assert argvs(f"{wrapper} while true; do ls; done") == [("true",), ("ls",)]
+
+    def test_keyword_after_command_is_an_argument(self):
+        assert parse("echo for x").keywords == ()
+        assert parse("command -v for").keywords == ()
+
+    def test_function_definition(self):
+        assert argvs("f() { make; }; function g { ls; }") == [("make",), ("ls",)]
+
+
+class TestGitSubcommand:
+    @pytest.mark.parametrize(
+        "args,expected",
+        [
+            (("commit", "-m", "x"), ("commit", ("-m", "x"))),
+            (("-C", "repo", "-c", "user.name=x", "commit"), ("commit", ())),
+            (("--no-pager", "log"), ("log", ())),
+            (("-C",), ("", ())),
+        ],
+    )
+    def test_skips_global_options(self, args, expected):
+        assert git_subcommand(args) == expected
+
+
+class TestRobustness:
+    @pytest.mark.parametrize("command", ["echo 'open", 'echo "open $(ls', "echo `open", "cat <<EOF\nno end", "(((", "${", "))) ;; &&"])
+    def test_unterminated_input_never_raises(self, command):
+        parse(command)
+
+    def test_random_input_never_raises(self):
+        rng = random.Random(0)
+        alphabet = "ab $(){}`'\"\\|&;<>#\n\t=-"
+        for _ in range(2000):
+            parse("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))))
+
+    @pytest.mark.parametrize("opener,closer", [("$(", ")"), ("( ", " )"), ("<(", ")"), ("$((", "))"), ('"$(', ')"')])
+    def test_deep_nesting_is_flagged_not_raised(self, opener, closer):
+        script = parse("echo " + opener * 1000 + "sudo ls" + closer * 1000)
+        assert script.too_deep
+
+    def test_shallow_nesting_is_parsed(self):
+        script = parse("echo " + "$(" * 20 + "sudo ls" + ")" * 20)
+        assert not script.too_deep
+        assert script.commands[0].argv == ("sudo", "ls")
+
+    def test_parse_is_cached(self):
+        assert parse("git status") is parse("git status")
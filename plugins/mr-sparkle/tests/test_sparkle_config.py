@@ -0,0 +1,197 @@
+"""Tests for skills/lint/scripts/sparkle_config.py shared config loader."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills" / "lint" / "scripts"))
+import sparkle_config
+
+SCRIPT_PATH = Path(__file__).parent.parent / "skills" / "lint" / "scripts" / "sparkle_config.py"
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep caches and the in-process memo out of the real plugin data dir."""
+    cache_root = tmp_path / "data"
+    monkeypatch.setenv("CLAUDE_PLUGIN_DATA", str(cache_root))
+    sparkle_config._MEMO.clear()
+    return cache_root
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A project with a mr-sparkle config."""
+    project_dir = tmp_path / "project"
+    (project_dir / ".claude").mkdir(parents=True)
+    (project_dir / ".claude" / "mr-sparkle.config.yml").write_text("validate_commit_message: false\n")
+    return project_dir
+
+
+def write_config(project_dir: Path, text: str) -> None:
+    """Rewrite the config with a distinct mtime so cache keys change."""
+    path = project_dir / ".claude" / "mr-sparkle.config.yml"
+    old = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(old + 1_000_000_000, old + 1_000_000_000))
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+
+class TestLoad:
+    def test_missing_project_root(self):
+        assert sparkle_config.load(None) == {}
+
+    def test_missing_config_file(self, tmp_path):
+        assert sparkle_config.load(tmp_path) == {}
+
+    def test_parses_config(self, project):
+        assert sparkle_config.load(project) == {"validate_commit_message": False}
+
+    def test_malformed_config_returns_empty(self, project):
+        write_config(project, "key: [unclosed\n")
+        assert sparkle_config.load(project) == {}
+
+    def test_non_mapping_returns_empty(self, project):
+        write_config(project, "- just\n- a list\n")
+        assert sparkle_config.load(project) == {}
+
+    def test_reloads_after_change(self, project):
+        assert sparkle_config.load(project) == {"validate_commit_message": False}
+        write_config(project, "block_direct: []\n")
+        assert sparkle_config.load(project) == {"block_direct": []}
+
+
+class TestSnapshot:
+    def test_parse_writes_snapshot_to_user_cache(self, project, isolated_cache):
+        sparkle_config.load(project)
+        snapshot = sparkle_config.snapshot_path(project / ".claude" / "mr-sparkle.config.yml")
+        assert isolated_cache in snapshot.parents
+        assert json.loads(snapshot.read_text())["config"] == {"validate_commit_message": False}
+        # Nothing is written into the project
+        assert [p.name for p in (project / ".claude").iterdir()] == ["mr-sparkle.config.yml"]
+
+    def test_snapshot_is_the_only_cache(self, project, isolated_cache):
+        sparkle_config.load_for_hook({"cwd": str(project), "session_id": "abc-123"})
+        assert [f.parent.name for f in isolated_cache.rglob("*.json")] == ["snapshots"]
+
+    def test_snapshots_are_keyed_by_config_path(self, tmp_path):
+        paths = [tmp_path / name / ".claude" / "mr-sparkle.config.yml" for name in ("a", "b")]
+        assert sparkle_config.snapshot_path(paths[0]) != sparkle_config.snapshot_path(paths[1])
+
+    def test_fresh_snapshot_skips_yaml(self, project, monkeypatch):
+        sparkle_config.load(project)
+        sparkle_config._MEMO.clear()
+
+        def fail(path):
+            raise ImportError("no yaml here")
+
+        monkeypatch.setattr(sparkle_config, "parse_yaml_file", fail)
+        assert sparkle_config.load_strict(project) == {"validate_commit_message": False}
+
+    def test_stale_snapshot_reparses(self, project):
+        sparkle_config.load(project)
+        write_config(project, "block_direct: []\n")
+        sparkle_config._MEMO.clear()
+        assert sparkle_config.load(project) == {"block_direct": []}
+        snapshot = sparkle_config.snapshot_path(project / ".claude" / "mr-sparkle.config.yml")
+        assert json.loads(snapshot.read_text())["config"] == {"block_direct": []}
+
+    def test_compile_snapshot(self, project):
+        snapshot = sparkle_config.compile_snapshot(project)
+        assert snapshot == sparkle_config.snapshot_path(project / ".claude" / "mr-sparkle.config.yml")
+        assert snapshot.is_file()
+
+    def test_compile_without_config(self, tmp_path):
+        assert sparkle_config.compile_snapshot(tmp_path) is None
+
+    def test_compile_cli(self, project, isolated_cache):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), "--compile", str(project)],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0
+        config = project / ".claude" / "mr-sparkle.config.yml"
+        assert Path(result.stdout.strip()) == sparkle_config.snapshot_path(config)
+
+
+class TestCacheDir:
+    def test_private_directory_in_plugin_data(self, isolated_cache):
+        directory = sparkle_config.cache_dir()
+        assert directory == isolated_cache / "cache"
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    def test_falls_back_to_xdg_cache(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CLAUDE_PLUGIN_DATA")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        assert sparkle_config.cache_dir() == tmp_path / "xdg" / "mr-sparkle" / "cache"
+
+    def test_refuses_shared_directory(self, project, isolated_cache):
+        (isolated_cache / "cache").mkdir(parents=True, mode=0o700)
+        (isolated_cache / "cache").chmod(0o777)
+        assert sparkle_config.cache_dir() is None
+        # Loading still works, it just isn't cached
+        assert sparkle_config.load(project) == {"validate_commit_message": False}
+        assert not list(isolated_cache.rglob("*.json"))
+
+    def test_refuses_symlink(self, tmp_path, isolated_cache):
+        target = tmp_path / "elsewhere"
+        target.mkdir(mode=0o700)
+        isolated_cache.mkdir()
+        (isolated_cache / "cache").symlink_to(target)
+        assert sparkle_config.cache_dir() is None
+
+    def test_planted_snapshot_is_not_read(self, project, isolated_cache, monkeypatch):
+        config = project / ".claude" / "mr-sparkle.config.yml"
+        snapshot = sparkle_config.snapshot_path(config)
+        st = config.stat()
+        snapshot.parent.mkdir()
+        snapshot.write_text(json.dumps({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "config": {"planted": True}}))
+        (isolated_cache / "cache").chmod(0o755)
+        assert sparkle_config.load(project) == {"validate_commit_message": False}
+
+
+class TestLoadForHook:
+    def test_uses_cwd(self, project):
+        assert sparkle_config.load_for_hook({"cwd": str(project)}) == {"validate_commit_message": False}
+
+    def test_no_cwd(self):
+        assert sparkle_config.load_for_hook({}) == {}
+
+
+class TestHookGetCli:
+    def run_cli(self, hook_input: dict, key: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), "--hook-get", key],
+            input=json.dumps(hook_input),
+            capture_output=True,
+            text=True,
+        )
+
+    def test_prints_value_as_json(self, project):
+        write_config(project, "block_direct: []\n")
+        result = self.run_cli({"cwd": str(project)}, "block_direct")
+        assert result.returncode == 0
+        assert result.stdout.strip() == "[]"
+
+    def test_prints_null_when_unset(self, project):
+        result = self.run_cli({"cwd": str(project)}, "block_direct")
+        assert result.returncode == 0
+        assert result.stdout.strip() == "null"
+
+    def test_usage_error(self):
+        result = subprocess.run([sys.executable, str(SCRIPT_PATH)], capture_output=True, text=True)
+        assert result.returncode == 2
@@ -5,58 +5,139 @@
 """
 Auto-bump plugin versions with Claude analysis.
 
-Detects plugins with staged changes, asks Claude to determine appropriate
-semver bump level (major/minor/patch), and stages the version updates.
+Detects plugins with staged changes, determines the semver bump level
+(major/minor/patch), and stages the version updates. Obvious cases (added
+or removed components, markdown-only edits) are classified locally; the
+rest are sent to Claude.
 """
 
+import hashlib
 import json
 import os
 import re
 import subprocess
 import sys
-from pathlib import Path
+import time
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
 
 
-def get_staged_plugins() -> dict[str, bool]:
+# Files that don't affect plugin functionality (developer docs, not user-facing)
+IGNORED_FILES = {"CLAUDE.md", "CLAUDE.local.md"}
+
+
+@dataclass
+class StagedPlugin:
+    """Staged changes to one plugin."""
+
+    name: str
+    files: list[str] = field(default_factory=list)
+    added: set[str] = field(default_factory=set)
+    deleted: set[str] = field(default_factory=set)
+    diff: list[str] = field(default_factory=list)
+    # plugin.json was staged - user is managing version manually
+    manual: bool = False
+
+
+# Single-character escapes in git's C-quoted paths
+_C_ESCAPES = {"a": "\a", "b": "\b", "t": "\t", "n": "\n", "v": "\v", "f": "\f", "r": "\r", '"': '"', "\\": "\\"}
+
+
+def _unquote_path(quoted: str) -> str:
+    """The path in a C-quoted header word ("a/x\\303\\251.md" ...), up to its closing quote."""
+    raw = bytearray()
+    index = 1
+    while index < len(quoted) and quoted[index] != '"':
+        char = quoted[index]
+        if char == "\\" and quoted[index + 1 : index + 4].isdigit():
+            # Octal escape for one byte of a UTF-8 sequence
+            raw.append(int(quoted[index + 1 : index + 4], 8) & 0xFF)
+            index += 4
+            continue
+        if char == "\\" and index + 1 < len(quoted):
+            char = _C_ESCAPES.get(quoted[index + 1], quoted[index + 1])
+            index += 1
+        raw += char.encode()
+        index += 1
+    return raw.decode(errors="replace")
+
+
+def _diff_path(header: str) -> str:
+    """Path from a "diff --git a/<path> b/<path>" header (renames disabled, so both match)."""
+    rest = header[len("diff --git ") :].rstrip("\n")
+    if rest.startswith('"'):
+        # Quoted for quotes, backslashes or control characters (and non-ASCII
+        # unless core.quotePath is off)
+        return _unquote_path(rest)[2:]
+    return rest[2 : 2 + (len(rest) - 5) // 2]
+
+
+def get_staged_plugins() -> dict[str, StagedPlugin]:
     """
-    Find plugins with staged changes.
+    Find plugins with staged changes, with their files and diffs.
 
-    Returns {plugin_name: plugin_json_was_staged}
-    If plugin.json was staged, user is managing version manually.
+    Runs a single `git diff --cached` and partitions its output by plugin
+    directory as it streams, so cost doesn't grow with the number of plugins.
     """
-    result = subprocess.run(
-        ["git", "diff", "--cached", "--name-only"],
-        capture_output=True,
+    process = subprocess.Popen(
+        ["git", "-c", "core.quotePath=false", "diff", "--cached", "--no-renames", "--", "plugins/"],
+        stdout=subprocess.PIPE,
         text=True,
+        errors="replace",
     )
-    files = result.stdout.strip().split("\n") if result.stdout.strip() else []
-
-    # Files that don't affect plugin functionality (developer docs, not user-facing)
-    ignored_files = {"CLAUDE.md", "CLAUDE.local.md"}
-
-    plugins = {}
-    for f in files:
-        if match := re.match(r"plugins/([^/]+)/", f):
+    plugins: dict[str, StagedPlugin] = {}
+    current = None
+    for line in process.stdout:
+        if line.startswith("diff --git "):
+            path = _diff_path(line)
+            match = re.match(r"plugins/([^/]+)/", path)
             # Skip developer documentation files
-            filename = Path(f).name
-            if filename in ignored_files:
+            if not match or Path(path).name in IGNORED_FILES:
+                current = None
                 continue
-
-            name = match.group(1)
-            plugins.setdefault(name, False)
-            if ".claude-plugin/plugin.json" in f:
-                plugins[name] = True
+            current = plugins.setdefault(match.group(1), StagedPlugin(match.group(1)))
+            current.files.append(path)
+            if path.endswith(".claude-plugin/plugin.json"):
+                current.manual = True
+        elif current is not None and line.startswith("new file mode"):
+            current.added.add(current.files[-1])
+        elif current is not None and line.startswith("deleted file mode"):
+            current.deleted.add(current.files[-1])
+        if current is not None:
+            current.diff.append(line)
+    process.wait()
     return plugins
 
 
-def get_diff(plugin_name: str) -> str:
-    """Get staged diff for a specific plugin."""
-    result = subprocess.run(
-        ["git", "diff", "--cached", "--", f"plugins/{plugin_name}/"],
-        capture_output=True,
-        text=True,
+# Plugin components - adding one is a feature, removing one breaks users
+COMPONENT_PATTERNS = ("skills/*/SKILL.md", "agents/*.md", "commands/*.md")
+
+
+def _is_component(plugin: StagedPlugin, path: str) -> bool:
+    relative = PurePosixPath(path).relative_to(f"plugins/{plugin.name}")
+    # match() anchors at the right; the part count anchors it at the plugin root
+    return any(
+        len(relative.parts) == pattern.count("/") + 1 and relative.match(pattern) for pattern in COMPONENT_PATTERNS
     )
-    return result.stdout
+
+
+def classify(plugin: StagedPlugin) -> str | None:
+    """
+    Bump level for the obvious cases, from the staged file list alone.
+
+    - a component (skill, agent, command) deleted: major
+    - a component added: minor
+    - only existing markdown files edited: patch
+
+    Returns None when the change needs a closer look.
+    """
+    if any(_is_component(plugin, path) for path in plugin.deleted):
+        return "major"
+    if any(_is_component(plugin, path) for path in plugin.added):
+        return "minor"
+    if not plugin.added and not plugin.deleted and all(path.endswith(".md") for path in plugin.files):
+        return "patch"
+    return None
 
 
 def prompt_user() -> bool:
@@ -83,20 +164,184 @@ def prompt_user() -> bool:
     return response in ("", "y", "yes")
 
 
-def analyze_with_claude(plugins_and_diffs: dict[str, str]) -> dict[str, str]:
+TOP_HUNKS = 3
+HUNK_LINES = 40
+HOOKS_LINES = 20
+FRONTMATTER_FIELD = re.compile(r"([A-Za-z][\w-]*):")
+HEADING = re.compile(r"#{1,6}\s+\S")
+HUNK_HEADER = re.compile(r"@@ -(\d+)(?:,\d+)? \+(\d+)")
+
+
+@dataclass
+class FileDiff:
+    """One file's section of a unified diff."""
+
+    path: str
+    status: str = "M"
+    added: int = 0
+    removed: int = 0
+    binary: bool = False
+    # [header, line, ...] per hunk
+    hunks: list[list[str]] = field(default_factory=list)
+
+
+def parse_diff(lines: list[str]) -> list[FileDiff]:
+    """Split diff lines into per-file sections with line counts and hunks."""
+    files: list[FileDiff] = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("diff --git "):
+            files.append(FileDiff(_diff_path(line)))
+        elif not files:
+            continue
+        elif files[-1].hunks:
+            if line.startswith("@@"):
+                files[-1].hunks.append([line])
+            else:
+                files[-1].hunks[-1].append(line)
+                if line.startswith("+"):
+                    files[-1].added += 1
+                elif line.startswith("-"):
+                    files[-1].removed += 1
+        elif line.startswith("new file mode"):
+            files[-1].status = "A"
+        elif line.startswith("deleted file mode"):
+            files[-1].status = "D"
+        elif line.startswith("Binary files"):
+            files[-1].binary = True
+        elif line.startswith("@@"):
+            files[-1].hunks.append([line])
+    return files
+
+
+def _frontmatter_changes(file: FileDiff) -> list[str]:
+    """+field / -field / ~field for YAML frontmatter keys changed in a markdown file."""
+    added, removed = set(), set()
+    for hunk in file.hunks:
+        match = HUNK_HEADER.match(hunk[0])
+        # Frontmatter opens on line 1, so only a hunk starting there can touch it
+        if not match or min(int(match.group(1)), int(match.group(2))) > 1:
+            continue
+        delimiters = 0
+        for line in hunk[1:]:
+            if line[1:].rstrip() == "---":
+                delimiters += 1
+                if delimiters == 2:
+                    break
+            elif delimiters == 1 and (field_match := FRONTMATTER_FIELD.match(line[1:])):
+                if line.startswith("+"):
+                    added.add(field_match.group(1))
+                elif line.startswith("-"):
+                    removed.add(field_match.group(1))
+    changed = added & removed
+    return (
+        [f"~{name}" for name in sorted(changed)]
+        + [f"+{name}" for name in sorted(added - changed)]
+        + [f"-{name}" for name in sorted(removed - changed)]
+    )
+
+
+def _changed_lines(file: FileDiff, predicate) -> list[str]:
+    return [
+        line for hunk in file.hunks for line in hunk[1:] if line[:1] in ("+", "-") and predicate(line[1:].strip())
+    ]
+
+
+def _starts_fenced(lines: list[str]) -> bool:
+    """Whether one side of a hunk starts inside a code fence.
+
+    Fences alternate open/close and "```lang" only opens, so a language fence
+    at an odd position, or else an odd number of bare fences, means the hunk
+    began mid-fence.
     """
-    Ask Claude to determine bump levels for all plugins at once.
+    fences = [text.strip() != "```" for text in lines if text.lstrip().startswith("```")]
+    for index, has_language in enumerate(fences):
+        if has_language:
+            return index % 2 == 1
+    return len(fences) % 2 == 1
+
+
+def _changed_headings(file: FileDiff) -> list[str]:
+    """Added/removed markdown headings, skipping "#" lines inside code fences."""
+    headings = []
+    for hunk in file.hunks:
+        # Fence state per side: the new file ("+") sees context and added
+        # lines, the old one ("-") context and removed lines
+        body = hunk[1:]
+        fenced = {side: _starts_fenced([line[1:] for line in body if line[:1] in (side, " ", "")]) for side in "+-"}
+        for line in body:
+            marker, text = line[:1], line[1:]
+            sides = (marker,) if marker in ("+", "-") else ("+", "-")
+            if text.lstrip().startswith("```"):
+                for side in sides:
+                    fenced[side] = not fenced[side]
+            elif marker in ("+", "-") and not fenced[marker] and HEADING.match(text):
+                headings.append(line)
+    return headings
+
+
+def compact_diff(lines: list[str]) -> str:
+    """
+    Summarize a plugin diff for the bump-analysis prompt.
 
-    Returns {plugin_name: "major"|"minor"|"patch"}
-    Falls back to "patch" for all if Claude unavailable.
+    Instead of the first N characters, the summary covers the whole change:
+    per-file stats, changed frontmatter fields and headings in markdown,
+    changed hooks.json entries, then the largest few hunks (changed lines
+    only).
     """
-    # Build combined prompt
+    files = parse_diff(lines)
+    root = re.compile(r"plugins/[^/]+/")
+    out = ["Files:"]
+    for file in files:
+        stats = "binary" if file.binary else f"+{file.added} -{file.removed}"
+        out.append(f"  {file.status} {root.sub('', file.path, count=1)} ({stats})")
+
+    frontmatter, headings, hooks = [], [], []
+    for file in files:
+        path = root.sub("", file.path, count=1)
+        if file.path.endswith(".md"):
+            if fields := _frontmatter_changes(file):
+                frontmatter.append(f"  {path}: {', '.join(fields)}")
+            headings.extend(f"  {path}: {line}" for line in _changed_headings(file))
+        elif file.path.endswith("hooks.json"):
+            entries = _changed_lines(file, lambda text: text not in ("", "{", "}", "},", "[", "]", "],"))
+            hooks.extend(f"  {path}: {line}" for line in entries[:HOOKS_LINES])
+    for title, section in (("Frontmatter fields:", frontmatter), ("Headings:", headings), ("hooks.json:", hooks)):
+        if section:
+            out += [title, *section]
+
+    ranked = sorted(
+        ((file, hunk) for file in files for hunk in file.hunks),
+        key=lambda item: sum(line[:1] in ("+", "-") for line in item[1]),
+        reverse=True,
+    )
+    if ranked:
+        out.append("Largest hunks:")
+        for file, hunk in ranked[:TOP_HUNKS]:
+            changed = [line for line in hunk[1:] if line[:1] in ("+", "-")]
+            out.append(f"--- {root.sub('', file.path, count=1)} {hunk[0]}")
+            out += changed[:HUNK_LINES]
+            if len(changed) > HUNK_LINES:
+                out.append(f"... {len(changed) - HUNK_LINES} more changed lines")
+    return "\n".join(out)
+
+
+# Bump when the prompt or response handling changes, so cached levels from
+# the old prompt aren't reused
+PROMPT_VERSION = 2
+DIFF_LIMIT = 6000
+CACHE_MAX_ENTRIES = 64
+CACHE_MAX_AGE = 30 * 24 * 3600
+
+
+def build_prompt(plugins_and_summaries: dict[str, str]) -> str:
+    """The analysis prompt, with each plugin's diff summary capped at DIFF_LIMIT."""
     plugin_sections = []
-    for name, diff in plugins_and_diffs.items():
-        truncated = diff[:6000] if len(diff) > 6000 else diff
-        plugin_sections.append(f"## Plugin: {name}\n```diff\n{truncated}\n```")
+    for name, summary in plugins_and_summaries.items():
+        truncated = summary[:DIFF_LIMIT] if len(summary) > DIFF_LIMIT else summary
+        plugin_sections.append(f"## Plugin: {name}\n```\n{truncated}\n```")
 
-    prompt = f"""Analyze these Claude Code plugin diffs and determine the semantic version bump for each.
+    return f"""Analyze these Claude Code plugin change summaries and determine the semantic version bump for each.
 
 Guidelines:
 - major: Breaking changes, removed features, incompatible API changes
@@ -108,6 +353,80 @@ Respond with ONLY a JSON object mapping plugin names to bump levels:
 
 {chr(10).join(plugin_sections)}"""
 
+
+def cache_path() -> Path | None:
+    """Bump cache file inside the git dir, or None outside a repo."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-path", "bump-plugin-versions-cache.json"],
+        capture_output=True,
+        text=True,
+    )
+    return Path(result.stdout.strip()) if result.returncode == 0 and result.stdout.strip() else None
+
+
+def cache_key(prompt: str) -> str:
+    """Hash of the prompt version and the exact prompt (which holds the diff summaries)."""
+    return hashlib.sha256(f"{PROMPT_VERSION}\0{prompt}".encode()).hexdigest()
+
+
+def load_cache(path: Path | None) -> dict:
+    """Cached {key: {"levels": ..., "time": ...}}, minus entries past CACHE_MAX_AGE."""
+    if path is None:
+        return {}
+    try:
+        entries = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, dict):
+        return {}
+    cutoff = time.time() - CACHE_MAX_AGE
+    return {key: entry for key, entry in entries.items() if _valid_entry(entry, cutoff)}
+
+
+def _valid_entry(entry, cutoff: float) -> bool:
+    """A well-formed entry newer than cutoff; anything else is a cache miss."""
+    if not isinstance(entry, dict):
+        return False
+    levels, stamp = entry.get("levels"), entry.get("time")
+    return (
+        isinstance(levels, dict)
+        and all(isinstance(level, str) for level in levels.values())
+        and isinstance(stamp, (int, float))
+        and not isinstance(stamp, bool)
+        and stamp >= cutoff
+    )
+
+
+def save_cache(path: Path | None, entries: dict) -> None:
+    """Write entries, keeping the CACHE_MAX_ENTRIES most recent."""
+    if path is None:
+        return
+    newest = sorted(entries.items(), key=lambda item: item[1]["time"], reverse=True)[:CACHE_MAX_ENTRIES]
+    try:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(dict(newest)))
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def analyze_with_claude(plugins_and_summaries: dict[str, str]) -> dict[str, str]:
+    """
+    Ask Claude to determine bump levels for all plugins at once.
+
+    Returns {plugin_name: "major"|"minor"|"patch"}
+    Results are cached by diff hash, so a retried commit with the same
+    staged content doesn't re-run the analysis.
+    Falls back to "patch" for all if Claude unavailable.
+    """
+    prompt = build_prompt(plugins_and_summaries)
+    path = cache_path()
+    cache = load_cache(path)
+    key = cache_key(prompt)
+    if key in cache:
+        print("  (cached analysis)", flush=True)
+        return cache[key]["levels"]
+
     try:
         result = subprocess.run(
             ["claude", "-p", prompt, "--output-format", "json", "--max-turns", "1"],
@@ -121,13 +440,17 @@ Respond with ONLY a JSON object mapping plugin names to bump levels:
 
         # Extract JSON from response (Claude might wrap in markdown)
         if match := re.search(r"\{[^{}]+\}", result_text):
-            return json.loads(match.group())
+            levels = json.loads(match.group())
+            # Only real answers are cached; the fallback should retry next time
+            cache[key] = {"levels": levels, "time": time.time()}
+            save_cache(path, cache)
+            return levels
 
     except (subprocess.TimeoutExpired, json.JSONDecodeError, KeyError, FileNotFoundError):
         print("  (Claude unavailable, defaulting to patch)", flush=True)
 
     # Fallback: patch for everything
-    return {name: "patch" for name in plugins_and_diffs}
+    return {name: "patch" for name in plugins_and_summaries}
 
 
 def bump_version(version: str, level: str) -> str:
@@ -143,7 +466,7 @@ def bump_version(version: str, level: str) -> str:
 def main():
     # Find plugins with staged changes (excluding manual plugin.json edits)
     plugins = get_staged_plugins()
-    plugins_to_bump = {name: get_diff(name) for name, was_manual in plugins.items() if not was_manual and get_diff(name).strip()}
+    plugins_to_bump = {name: p for name, p in plugins.items() if not p.manual and p.diff}
 
     if not plugins_to_bump:
         print("  No plugins changed; no version bump needed")
@@ -154,9 +477,12 @@ def main():
         print("  Skipping version bump")
         sys.exit(0)
 
-    # Analyze with Claude
-    print(f"  Analyzing {len(plugins_to_bump)} plugin(s)...", flush=True)
-    bump_levels = analyze_with_claude(plugins_to_bump)
+    # Decide the obvious cases locally; only ambiguous plugins go to Claude
+    bump_levels = {name: level for name, p in plugins_to_bump.items() if (level := classify(p))}
+    ambiguous = {name: compact_diff(p.diff) for name, p in plugins_to_bump.items() if name not in bump_levels}
+    if ambiguous:
+        print(f"  Analyzing {len(ambiguous)} plugin(s)...", flush=True)
+        bump_levels.update(analyze_with_claude(ambiguous))
 
     # Apply bumps
     for plugin in plugins_to_bump:
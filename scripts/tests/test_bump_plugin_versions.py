@@ -0,0 +1,274 @@
+"""Tests for bump_plugin_versions.py: diff partitioning, local classification, diff summaries and the cache."""
+
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import bump_plugin_versions as bump  # noqa: E402
+
+SKILL_DIFF = """\
+diff --git a/plugins/demo/skills/lint/SKILL.md b/plugins/demo/skills/lint/SKILL.md
+index f7744b4..93d35f5 100644
+--- a/plugins/demo/skills/lint/SKILL.md
++++ b/plugins/demo/skills/lint/SKILL.md
+@@ -1,4 +1,5 @@
+ ---
+-description: Lint files
++description: Lint files and directories
++argument-hint: <path>
+ ---
+ # Lint
+@@ -49,8 +50,13 @@ ${CLAUDE_SKILL_DIR}/scripts/lint.py /path/to/file.py --format json
+
+ # Text output (default, human-readable)
+ ${CLAUDE_SKILL_DIR}/scripts/lint.py /path/to/file.py --format text
++
++# Several files or whole directories, linted in parallel
++${CLAUDE_SKILL_DIR}/scripts/lint.py src/ docs/ README.md
+ ```
+
++## Batch Mode
++
+ ### Output Formats
+"""
+
+HOOKS_DIFF = """\
+diff --git a/plugins/demo/hooks/hooks.json b/plugins/demo/hooks/hooks.json
+index 1111111..2222222 100644
+--- a/plugins/demo/hooks/hooks.json
++++ b/plugins/demo/hooks/hooks.json
+@@ -3,6 +3,9 @@
+     "PreToolUse": [
+       {
+         "matcher": "Bash",
++        "hooks": [{"type": "command", "command": "guard.py"}]
++      },
++      {
+       }
+     ]
+"""
+
+
+def plugin(name="demo", files=(), added=(), deleted=()) -> bump.StagedPlugin:
+    paths = [f"plugins/{name}/{path}" for path in files]
+    return bump.StagedPlugin(
+        name,
+        files=paths,
+        added={f"plugins/{name}/{path}" for path in added},
+        deleted={f"plugins/{name}/{path}" for path in deleted},
+    )
+
+
+def hunk_file(*lines: str) -> bump.FileDiff:
+    return bump.FileDiff("plugins/demo/README.md", hunks=[["@@ -10,5 +10,6 @@", *lines]])
+
+
+# =============================================================================
+# Tests: diff partitioning
+# =============================================================================
+
+
+class TestDiffPath:
+    @pytest.mark.parametrize(
+        "header,path",
+        [
+            ("diff --git a/plugins/x/README.md b/plugins/x/README.md\n", "plugins/x/README.md"),
+            ("diff --git a/a b/c/a b/c b/a b/c/a b/c", "a b/c/a b/c"),
+            ('diff --git "a/plugins/x/\\303\\251.md" "b/plugins/x/\\303\\251.md"', "plugins/x/é.md"),
+            ('diff --git "a/plugins/x/say \\"hi\\".md" "b/plugins/x/say \\"hi\\".md"\n', 'plugins/x/say "hi".md'),
+            ('diff --git "a/plugins/x/a\\tb\\\\c" "b/plugins/x/a\\tb\\\\c"', "plugins/x/a\tb\\c"),
+            ("diff --git a/plugins/x/é y.md b/plugins/x/é y.md", "plugins/x/é y.md"),
+        ],
+    )
+    def test_path(self, header, path):
+        assert bump._diff_path(header) == path
+
+
+class TestGetStagedPlugins:
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        subprocess.run(["git", "init", "-q"], check=True)
+        for path in ("plugins/alpha/skills/a/SKILL.md", "plugins/beta/README.md", "plugins/beta/old.md"):
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / path).write_text("# Old\n")
+        subprocess.run(["git", "add", "-A"], check=True)
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init"], check=True)
+        return tmp_path
+
+    @staticmethod
+    def write(repo, path, text):
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text(text)
+
+    def test_partitions_one_diff_by_plugin(self, repo):
+        self.write(repo, "plugins/alpha/skills/a/SKILL.md", "# New\n")
+        self.write(repo, "plugins/alpha/skills/b/SKILL.md", "# B\n")
+        self.write(repo, "plugins/beta/README.md", "# New\n")
+        (repo / "plugins/beta/old.md").unlink()
+        self.write(repo, "plugins/beta/CLAUDE.md", "dev notes\n")
+        self.write(repo, "README.md", "outside plugins\n")
+        subprocess.run(["git", "add", "-A"], check=True)
+
+        plugins = bump.get_staged_plugins()
+        assert sorted(plugins) == ["alpha", "beta"]
+        alpha, beta = plugins["alpha"], plugins["beta"]
+        assert alpha.files == ["plugins/alpha/skills/a/SKILL.md", "plugins/alpha/skills/b/SKILL.md"]
+        assert alpha.added == {"plugins/alpha/skills/b/SKILL.md"}
+        assert beta.files == ["plugins/beta/README.md", "plugins/beta/old.md"]
+        assert beta.deleted == {"plugins/beta/old.md"}
+        # Each plugin's diff holds only its own files; CLAUDE.md is skipped
+        assert [line for line in beta.diff if line.startswith("diff --git")] == [
+            "diff --git a/plugins/beta/README.md b/plugins/beta/README.md\n",
+            "diff --git a/plugins/beta/old.md b/plugins/beta/old.md\n",
+        ]
+        assert "+# B\n" in alpha.diff and "+# B\n" not in beta.diff
+        assert not alpha.manual and not beta.manual
+
+    def test_unusual_file_names(self, repo):
+        for path in ("plugins/alpha/café notes.md", 'plugins/beta/say "hi".md'):
+            self.write(repo, path, "x\n")
+        subprocess.run(["git", "add", "-A"], check=True)
+        plugins = bump.get_staged_plugins()
+        assert plugins["alpha"].added == {"plugins/alpha/café notes.md"}
+        assert plugins["beta"].added == {'plugins/beta/say "hi".md'}
+
+    def test_staged_plugin_json_is_manual(self, repo):
+        self.write(repo, "plugins/alpha/.claude-plugin/plugin.json", '{"version": "1.0.0"}\n')
+        subprocess.run(["git", "add", "-A"], check=True)
+        assert bump.get_staged_plugins()["alpha"].manual
+
+
+# =============================================================================
+# Tests: classification
+# =============================================================================
+
+
+class TestClassify:
+    @pytest.mark.parametrize(
+        "staged,level",
+        [
+            (plugin(files=["skills/x/SKILL.md"], deleted=["skills/x/SKILL.md"]), "major"),
+            (plugin(files=["agents/a.md", "README.md"], deleted=["agents/a.md"]), "major"),
+            (plugin(files=["commands/c.md"], added=["commands/c.md"]), "minor"),
+            (plugin(files=["skills/x/SKILL.md", "skills/x/scripts/run.py"], added=["skills/x/SKILL.md"]), "minor"),
+            (plugin(files=["README.md", "skills/x/SKILL.md"]), "patch"),
+            (plugin(files=["skills/x/scripts/run.py"]), None),
+            (plugin(files=["README.md", "docs/new.md"], added=["docs/new.md"]), None),
+            # Only components at their place in the plugin root count
+            (plugin(files=["skills/x/docs/agents/a.md"], deleted=["skills/x/docs/agents/a.md"]), None),
+            (plugin(files=["skills/x/ref/SKILL.md"], added=["skills/x/ref/SKILL.md"]), None),
+        ],
+    )
+    def test_level(self, staged, level):
+        assert bump.classify(staged) == level
+
+
+# =============================================================================
+# Tests: diff summaries
+# =============================================================================
+
+
+class TestChangedHeadings:
+    def test_reports_headings_outside_fences(self):
+        file = hunk_file(" text", "+## Added", "-# Removed", " more")
+        assert bump._changed_headings(file) == ["+## Added", "-# Removed"]
+
+    def test_skips_comments_in_a_fence_the_hunk_opens(self):
+        file = hunk_file(" ```bash", "+# a comment", "+ls", " ```", "+## Real")
+        assert bump._changed_headings(file) == ["+## Real"]
+
+    def test_skips_comments_when_the_hunk_starts_mid_fence(self):
+        # The fence opened above the hunk; only its closing ``` is visible
+        file = hunk_file(" lint.py a", "+", "+# Several files", "+lint.py a b", " ```", " ", "+## Batch Mode")
+        assert bump._changed_headings(file) == ["+## Batch Mode"]
+
+    def test_language_fence_fixes_the_starting_state(self):
+        # bare, ```lang: the bare fence must close one opened above the hunk
+        file = hunk_file("+# inside", " ```", "+# outside", " ```python", "+# code", " ```")
+        assert bump._changed_headings(file) == ["+# outside"]
+
+    def test_sides_are_tracked_separately(self):
+        # The old side closes a fence here, the new side opens one
+        file = hunk_file("-# old code", "-```", "+```sh", "+# new code", "+```", "-# Old heading")
+        assert bump._changed_headings(file) == ["-# Old heading"]
+
+
+class TestCompactDiff:
+    def test_summarizes_skill_diff(self):
+        summary = bump.compact_diff(SKILL_DIFF.splitlines(keepends=True))
+        assert summary.splitlines()[:2] == ["Files:", "  M skills/lint/SKILL.md (+7 -1)"]
+        assert "Frontmatter fields:\n  skills/lint/SKILL.md: ~description, +argument-hint" in summary
+        assert "Headings:\n  skills/lint/SKILL.md: +## Batch Mode\nLargest hunks:" in summary
+        assert "Several files" not in summary.split("Largest hunks:")[0]
+
+    def test_hooks_json_lines_and_hunk_order(self):
+        summary = bump.compact_diff((HOOKS_DIFF + SKILL_DIFF).splitlines(keepends=True))
+        assert '  hooks/hooks.json: +        "hooks": [{"type": "command", "command": "guard.py"}]' in summary
+        assert "  hooks/hooks.json: +      {" not in summary
+        hunks = [re.match(r"--- \S+ @@ [^@]+@@", line).group() for line in summary.splitlines() if line[:4] == "--- "]
+        assert hunks == [
+            "--- skills/lint/SKILL.md @@ -49,8 +50,13 @@",
+            # Ties keep diff order
+            "--- hooks/hooks.json @@ -3,6 +3,9 @@",
+            "--- skills/lint/SKILL.md @@ -1,4 +1,5 @@",
+        ]
+
+    def test_long_hunks_are_cut(self):
+        lines = ["diff --git a/plugins/demo/a.py b/plugins/demo/a.py", "@@ -1,0 +1,50 @@"]
+        lines += [f"+line {i}" for i in range(50)]
+        summary = bump.compact_diff(lines)
+        assert "+line 39" in summary and "+line 40" not in summary
+        assert summary.endswith("... 10 more changed lines")
+
+
+# =============================================================================
+# Tests: analysis cache
+# =============================================================================
+
+
+class TestCache:
+    def test_key_covers_prompt_and_version(self, monkeypatch):
+        key = bump.cache_key("prompt")
+        assert key == bump.cache_key("prompt") != bump.cache_key("prompt!")
+        monkeypatch.setattr(bump, "PROMPT_VERSION", bump.PROMPT_VERSION + 1)
+        assert bump.cache_key("prompt") != key
+
+    def test_round_trip_keeps_newest(self, tmp_path, monkeypatch):
+        path = tmp_path / "cache.json"
+        monkeypatch.setattr(bump, "CACHE_MAX_ENTRIES", 2)
+        now = time.time()
+        entries = {key: {"levels": {"demo": "patch"}, "time": now - age} for key, age in (("a", 3), ("b", 2), ("c", 1))}
+        bump.save_cache(path, entries)
+        assert sorted(bump.load_cache(path)) == ["b", "c"]
+
+    @pytest.mark.parametrize(
+        "entry",
+        [
+            {"levels": {"demo": "patch"}, "time": "yesterday"},
+            {"levels": {"demo": "patch"}, "time": None},
+            {"levels": {"demo": "patch"}, "time": True},
+            {"levels": {"demo": "patch"}},
+            {"levels": {"demo": 1}, "time": 0},
+            {"levels": ["patch"], "time": 0},
+            {"levels": {"demo": "patch"}, "time": 1.0},
+            "patch",
+        ],
+    )
+    def test_malformed_or_expired_entries_are_misses(self, tmp_path, entry):
+        path = tmp_path / "cache.json"
+        path.write_text(json.dumps({"bad": entry, "good": {"levels": {"demo": "minor"}, "time": time.time()}}))
+        assert list(bump.load_cache(path)) == ["good"]
+
+    @pytest.mark.parametrize("content", ["not json", "[]", '"text"'])
+    def test_unreadable_cache_is_empty(self, tmp_path, content):
+        path = tmp_path / "cache.json"
+        path.write_text(content)
+        assert bump.load_cache(path) == {}
+        assert bump.load_cache(None) == {}